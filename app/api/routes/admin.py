@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Callable, Sequence
+
+from app.db.database import read_session
+from app.crud import listings as listings_crud
+from app.crud import users as users_crud
+from app.schemas.admin import ProfileRequest, ProfileStatus
+from app.core import streaming
+from app.core.config import settings
+from app.core.profiling import request_profiler
+from app.core.request_timing import TimedRoute
+from app.core.security import get_current_admin_user
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(get_current_admin_user)],
+    route_class=TimedRoute,
+)
+
+EXPORT_FORMAT_PATTERN = f"^({streaming.FORMAT_NDJSON}|{streaming.FORMAT_CSV})$"
+
+@router.get("/export/listings")
+async def export_listings(
+    request: Request,
+    format: str = Query(streaming.FORMAT_NDJSON, pattern=EXPORT_FORMAT_PATTERN),
+    after_id: int = 0
+):
+    """
+    Stream every listing ordered by id as NDJSON or CSV (gzip with Accept-Encoding: gzip).
+    To resume an interrupted export, pass the last id received as `after_id`.
+    """
+    columns = [column.key for column in listings_crud.LISTING_EXPORT_COLUMNS]
+    return _export_response(request, "listings", listings_crud.stream_listings, columns, format, after_id)
+
+@router.get("/export/users")
+async def export_users(
+    request: Request,
+    format: str = Query(streaming.FORMAT_NDJSON, pattern=EXPORT_FORMAT_PATTERN),
+    after_id: int = 0
+):
+    """
+    Stream every user ordered by id as NDJSON or CSV (gzip with Accept-Encoding: gzip).
+    To resume an interrupted export, pass the last id received as `after_id`.
+    """
+    columns = [column.key for column in users_crud.USER_EXPORT_COLUMNS]
+    return _export_response(request, "users", users_crud.stream_users, columns, format, after_id)
+
+@router.get("/profile", response_model=ProfileStatus)
+async def read_profile_status():
+    """The route being profiled, if any, and the saved profiles"""
+    return _profile_status()
+
+@router.post("/profile", response_model=ProfileStatus)
+async def start_profile(profile: ProfileRequest):
+    """
+    Sample the next `requests` requests to a route template (e.g. `/api/listings/{listing_id}`)
+    on this worker, saving collapsed stacks for flame graphs to PROFILE_OUTPUT_DIR.
+    """
+    await run_in_threadpool(request_profiler.arm, profile.route, profile.method, profile.requests, profile.interval_ms / 1000)
+    return _profile_status()
+
+@router.delete("/profile", response_model=ProfileStatus)
+async def stop_profile():
+    """Stop profiling before the requested number of requests is reached"""
+    request_profiler.disarm()
+    return _profile_status()
+
+def _profile_status() -> ProfileStatus:
+    target = request_profiler.target
+    status = ProfileStatus(output_dir=request_profiler.output_dir, profiles=request_profiler.profiles())
+    if target is not None:
+        status.route = target.route
+        status.method = target.method
+        status.remaining = target.remaining
+        status.interval_ms = target.interval * 1000
+    return status
+
+def _export_response(
+    request: Request,
+    name: str,
+    stream: Callable,
+    columns: Sequence[str],
+    record_format: str,
+    after_id: int
+) -> StreamingResponse:
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    encoder = streaming.RowEncoder(record_format, columns, compress=compress)
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{record_format}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        _export_body(stream, encoder, after_id),
+        media_type=streaming.MEDIA_TYPES[record_format],
+        headers=headers,
+    )
+
+async def _export_body(stream: Callable, encoder: streaming.RowEncoder, after_id: int) -> AsyncIterator[bytes]:
+    """Run an export on its own session, which has to outlive the request handler"""
+    async with read_session() as db:
+        async for batch in stream(db, after_id=after_id, batch_size=settings.EXPORT_BATCH_SIZE):
+            # Encoding and compressing a batch is CPU-bound; keep it off the event loop
+            chunk = await run_in_threadpool(encoder.encode, batch)
+            if chunk:
+                yield chunk
+    yield encoder.finish()
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Header, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.db.database import get_db
+from app.schemas.bookings import BookingCreate, BookingUpdate, BookingResponse
+from app.crud import bookings as bookings_crud
+from app.core.principals import Principal
+from app.core.request_timing import TimedRoute
+from app.core.security import get_current_user
+
+router = APIRouter(
+    prefix="/bookings",
+    tags=["bookings"],
+    route_class=TimedRoute,
+)
+
+@router.post("/", response_model=BookingResponse, status_code=201)
+async def create_booking(
+    booking: BookingCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Book a listing for a date range.
+    Send an `Idempotency-Key` header to retry safely: a repeated request with the
+    same key returns the booking the first one created, with status 200.
+    """
+    db_booking, created = await bookings_crud.create_booking(
+        db=db, booking=booking, renter_id=current_user.id, idempotency_key=idempotency_key
+    )
+    if not created:
+        response.status_code = 200
+    return db_booking
+
+@router.get("/", response_model=List[BookingResponse])
+async def read_bookings(
+    response: Response,
+    role: str = Query("renter", pattern="^(renter|host)$"),
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get the current user's bookings, or with `role=host` the bookings of their listings.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    """
+    bookings = await bookings_crud.get_bookings(
+        db, user_id=current_user.id, as_host=role == "host", limit=limit, cursor=cursor
+    )
+    next_cursor = bookings_crud.next_bookings_cursor(bookings, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return bookings
+
+@router.get("/{booking_id}", response_model=BookingResponse)
+async def read_booking(
+    booking_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Get a booking (renter, host or admin only)"""
+    db_booking, _ = await bookings_crud.get_booking_for_user(db, booking_id, current_user)
+    return db_booking
+
+@router.put("/{booking_id}", response_model=BookingResponse)
+async def update_booking(
+    booking_id: int,
+    booking: BookingUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Update a booking. The host confirms or completes it; either side may cancel it.
+    """
+    return await bookings_crud.update_booking(db=db, booking_id=booking_id, booking_update=booking, principal=current_user)
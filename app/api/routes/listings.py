@@ -1,23 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from datetime import date
+from pydantic import TypeAdapter, ValidationError
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.models import User, Listing
-from app.schemas.listings import ListingCreate, ListingResponse, ListingUpdate, ListingFilters, ListingCreateFromFrontend
+from app.schemas.listings import (
+    ListingCreate, ListingResponse, ListingUpdate, ListingFilters, ListingCreateFromFrontend,
+    LocationSuggestion, ListingFacets, ListingSummary, BulkImportError, BulkImportResult,
+)
 from app.crud import listings as listings_crud
+from app.crud import users as users_crud
+from app.core import streaming
+from app.core.principals import Principal
 from app.core.security import get_current_user
+from app.core.cache import search_cache, facets_cache, filters_cache_key
+from app.core.config import settings
+from app.core.location_index import location_index
+from app.core.request_timing import TimedRoute
 
 router = APIRouter(
     prefix="/listings",
     tags=["listings"],
+    route_class=TimedRoute,
 )
 
+listing_list_adapter = TypeAdapter(List[ListingResponse])
+summary_list_adapter = TypeAdapter(List[ListingSummary])
+
 @router.post("/", response_model=ListingResponse, status_code=201)
-def create_listing(
+async def create_listing(
     listing: ListingCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create a new listing (requires authentication)"""
     if not current_user.is_host:
@@ -25,13 +41,13 @@ def create_listing(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is not registered as a host"
         )
-    return listings_crud.create_listing(db=db, listing=listing, host_id=current_user.id)
+    return await listings_crud.create_listing(db=db, listing=listing, host_id=current_user.id)
 
 @router.post("/from-frontend", response_model=ListingResponse, status_code=201)
-def create_listing_from_frontend(
+async def create_listing_from_frontend(
     listing_data: ListingCreateFromFrontend,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create a new listing from frontend form data (requires authentication)"""
     if not current_user.is_host:
@@ -40,44 +56,114 @@ def create_listing_from_frontend(
             detail="User is not registered as a host"
         )
     
-    # Convert frontend data to a ListingCreate object
     try:
-        size = int(listing_data.sizeSqFt)
-        price_per_month = int(float(listing_data.pricePerMonthDollars) * 100)  # Convert to cents
-        features = listing_data.featuresInput.split(',') if listing_data.featuresInput else []
-        features = [feature.strip() for feature in features if feature.strip()]
-    except (ValueError, AttributeError) as e:
+        listing = listing_data.to_listing_create()
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid data format: {str(e)}"
         )
     
-    listing = ListingCreate(
-        title=listing_data.title,
-        description=listing_data.description,
-        space_type=listing_data.space_type,
-        size=size,
-        price_per_month=price_per_month,
-        address=listing_data.address,
-        city=listing_data.city,
-        state=listing_data.state,
-        zip_code=listing_data.zip_code,
-        country=listing_data.country,
-        latitude=listing_data.latitude,
-        longitude=listing_data.longitude,
-        images=listing_data.imageUrls,
-        features=features,
-        access_instructions=listing_data.access_instructions,
-        access_type=listing_data.access_type,
-        available_from=listing_data.available_from,
-        available_to=listing_data.available_to,
-        is_active=listing_data.is_active
-    )
+    return await listings_crud.create_listing(db=db, listing=listing, host_id=current_user.id)
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_import_listings(
+    request: Request,
+    host_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Import listings from a streamed CSV (text/csv) or NDJSON (application/x-ndjson) body.
+    Rows use either the ListingCreate fields or the frontend form fields; in CSV,
+    list columns (images, imageUrls, features) are separated by "|".
+    Admins can import for another host with `host_id`.
+    """
+    if not current_user.is_host:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User is not registered as a host"
+        )
+    if host_id is None:
+        host_id = current_user.id
+    elif host_id != current_user.id:
+        if not current_user.is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only admins can import listings for another host"
+            )
+        if await users_crud.get_user(db, host_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Host not found"
+            )
     
-    return listings_crud.create_listing(db=db, listing=listing, host_id=current_user.id)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    record_format = streaming.CONTENT_TYPES.get(content_type)
+    if record_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be one of {list(streaming.CONTENT_TYPES)}"
+        )
+    
+    result = BulkImportResult(created=0, failed=0, errors=[])
+    
+    def record_error(line: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < settings.BULK_IMPORT_MAX_ERRORS:
+            result.errors.append(BulkImportError(line=line, error=error))
+    
+    async def insert_batch(batch: List[ListingCreate], lines: List[int]) -> None:
+        created, errors = await listings_crud.bulk_create_listings(db, batch, host_id)
+        result.created += created
+        for index, error in errors:
+            record_error(lines[index], error)
+    
+    # Only one batch of validated rows is held at a time
+    batch, lines = [], []
+    async for record in streaming.iter_records(record_format, request.stream()):
+        if record.error:
+            record_error(record.line, record.error)
+            continue
+        try:
+            batch.append(_bulk_listing(record.data, split_lists=record_format == streaming.FORMAT_CSV))
+            lines.append(record.line)
+        except ValueError as e:
+            record_error(record.line, _error_message(e))
+            continue
+        if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+            await insert_batch(batch, lines)
+            batch, lines = [], []
+    if batch:
+        await insert_batch(batch, lines)
+    
+    return result
+
+# CSV cells holding lists
+_LIST_FIELDS = ("images", "imageUrls", "features")
 
-@router.get("/", response_model=List[ListingResponse])
-def read_listings(
+def _bulk_listing(data: dict, split_lists: bool) -> ListingCreate:
+    """Validate one imported row in either the API or the frontend form format"""
+    if split_lists:
+        data = {
+            name: [item.strip() for item in value.split("|") if item.strip()]
+            if name in _LIST_FIELDS else value
+            for name, value in data.items()
+        }
+    if "pricePerMonthDollars" in data:
+        return ListingCreateFromFrontend(**data).to_listing_create()
+    return ListingCreate(**data)
+
+def _error_message(error: ValueError) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    return f"Invalid data format: {error}"
+
+def listing_filters(
+    q: Optional[str] = None,
     location: Optional[str] = None,
     space_type: Optional[str] = None,
     min_price: Optional[int] = None,
@@ -87,12 +173,12 @@ def read_listings(
     latitude: Optional[float] = None,
     longitude: Optional[float] = None,
     radius: Optional[float] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
-):
-    """Get all listings with optional filters"""
-    filters = ListingFilters(
+    available_start: Optional[date] = None,
+    available_end: Optional[date] = None,
+) -> ListingFilters:
+    """Search filters shared by the listing search and facet endpoints"""
+    return ListingFilters(
+        q=q,
         location=location,
         space_type=space_type,
         min_price=min_price,
@@ -101,36 +187,112 @@ def read_listings(
         max_size=max_size,
         latitude=latitude,
         longitude=longitude,
-        radius=radius
+        radius=radius,
+        available_start=available_start,
+        available_end=available_end
+    )
+
+@router.get("/", response_model=Union[List[ListingResponse], List[ListingSummary]])
+async def read_listings(
+    filters: ListingFilters = Depends(listing_filters),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get all listings with optional filters.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    `view=summary` returns only the fields shown in the results grid.
+    """
+    cache_key = filters_cache_key(
+        filters, view=view, sort=sort, cursor=cursor, include_total=include_total, skip=skip, limit=limit
     )
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached.body, media_type="application/json", headers=cached.headers)
+    generation = search_cache.generation
     
-    return listings_crud.get_listings(db=db, filters=filters, skip=skip, limit=limit)
+    sort = listings_crud.resolve_sort(filters, sort)
+    summary = view == "summary"
+    db_listings = await listings_crud.get_listings(
+        db=db, filters=filters, skip=skip, limit=limit, sort=sort, cursor=cursor, summary=summary
+    )
+    
+    headers = {}
+    next_cursor = listings_crud.next_listings_cursor(db_listings, limit, sort)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        headers["X-Total-Count"] = str(await listings_crud.estimate_listings_count(db, filters))
+    
+    adapter = summary_list_adapter if summary else listing_list_adapter
+    body = adapter.dump_json(adapter.validate_python(db_listings, from_attributes=True))
+    search_cache.set(cache_key, body, headers, generation)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/facets", response_model=ListingFacets)
+async def read_listing_facets(
+    filters: ListingFilters = Depends(listing_filters),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Listing counts per space type, price bucket, size bucket and access type for a search"""
+    cache_key = filters_cache_key(filters)
+    cached = facets_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached.body, media_type="application/json", headers=cached.headers)
+    generation = facets_cache.generation
+    
+    facets = await listings_crud.get_listing_facets(db, filters)
+    body = ListingFacets.model_validate(facets).model_dump_json().encode()
+    facets_cache.set(cache_key, body, {}, generation)
+    return Response(content=body, media_type="application/json")
 
 @router.get("/my-listings", response_model=List[ListingResponse])
-def read_user_listings(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def read_user_listings(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Get the listings owned by the current user, paged by cursor"""
+    db_listings = await listings_crud.get_listings_by_host(
+        db=db, host_id=current_user.id, limit=limit, cursor=cursor
+    )
+    next_cursor = listings_crud.next_listings_cursor(db_listings, limit, "id")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return db_listings
+
+@router.get("/locations/suggest", response_model=List[LocationSuggestion])
+async def suggest_locations(
+    q: str,
+    limit: int = Query(settings.LOCATION_SUGGEST_MAX_RESULTS, ge=1, le=settings.LOCATION_SUGGEST_MAX_RESULTS)
 ):
-    """Get all listings owned by the current user"""
-    return listings_crud.get_listings_by_host(db=db, host_id=current_user.id)
+    """Type-ahead suggestions for the location filter, served from an in-memory index"""
+    return [suggestion._asdict() for suggestion in location_index.suggest(q, limit)]
 
 @router.get("/{listing_id}", response_model=ListingResponse)
-def read_listing(listing_id: int, db: Session = Depends(get_db)):
+async def read_listing(listing_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific listing by ID"""
-    db_listing = listings_crud.get_listing(db, listing_id=listing_id)
+    db_listing = await listings_crud.get_listing(db, listing_id=listing_id)
     if db_listing is None:
         raise HTTPException(status_code=404, detail="Listing not found")
     return db_listing
 
 @router.put("/{listing_id}", response_model=ListingResponse)
-def update_listing(
+async def update_listing(
     listing_id: int,
     listing: ListingUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update a specific listing (only by owner or admin)"""
-    db_listing = listings_crud.get_listing(db, listing_id=listing_id)
+    db_listing = await listings_crud.get_listing(db, listing_id=listing_id)
     if db_listing is None:
         raise HTTPException(status_code=404, detail="Listing not found")
     
@@ -140,16 +302,16 @@ def update_listing(
             detail="Not enough permissions to update this listing"
         )
     
-    return listings_crud.update_listing(db=db, listing_id=listing_id, listing_update=listing, user_id=current_user.id)
+    return await listings_crud.update_listing(db=db, listing_id=listing_id, listing_update=listing, user_id=current_user.id)
 
 @router.delete("/{listing_id}", status_code=204)
-def delete_listing(
+async def delete_listing(
     listing_id: int, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete a listing (only by owner or admin)"""
-    db_listing = listings_crud.get_listing(db, listing_id=listing_id)
+    db_listing = await listings_crud.get_listing(db, listing_id=listing_id)
     if db_listing is None:
         raise HTTPException(status_code=404, detail="Listing not found")
     
@@ -159,5 +321,5 @@ def delete_listing(
             detail="Not enough permissions to delete this listing"
         )
     
-    listings_crud.delete_listing(db=db, listing_id=listing_id, user_id=current_user.id)
+    await listings_crud.delete_listing(db=db, listing_id=listing_id, user_id=current_user.id)
     return None
\ No newline at end of file
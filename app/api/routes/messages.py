@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, WebSocket, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.db.database import AsyncSessionLocal, get_db
+from app.schemas.messages import ConversationGroup, MessageCreate, MessageResponse, MessageUpdate, UnreadCount
+from app.crud import messages as messages_crud
+from app.core.principals import Principal
+from app.core.realtime import message_hub
+from app.core.request_timing import TimedRoute
+from app.core.security import authenticate_token, get_current_user
+
+router = APIRouter(
+    prefix="/messages",
+    tags=["messages"],
+    route_class=TimedRoute,
+)
+
+@router.post("/", response_model=MessageResponse, status_code=201)
+async def send_message(
+    message: MessageCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Send a message to another user"""
+    return await messages_crud.create_message(db=db, message=message, sender_id=current_user.id)
+
+@router.get("/conversations", response_model=List[ConversationGroup])
+async def read_conversations(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get the current user's inbox, most recent conversation first.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    """
+    conversations = await messages_crud.get_conversations(db, user_id=current_user.id, limit=limit, cursor=cursor)
+    next_cursor = messages_crud.next_conversations_cursor(conversations, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return conversations
+
+@router.get("/unread-count", response_model=UnreadCount)
+async def read_unread_count(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Get the number of unread messages across all conversations"""
+    return UnreadCount(unread_count=await messages_crud.get_unread_count(db, current_user.id))
+
+@router.get("/conversations/{other_user_id}", response_model=List[MessageResponse])
+async def read_conversation(
+    other_user_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get the messages between the current user and another user, newest first.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch older messages.
+    """
+    messages = await messages_crud.get_conversation_messages(
+        db, user_id=current_user.id, other_user_id=other_user_id, limit=limit, cursor=cursor
+    )
+    next_cursor = messages_crud.next_messages_cursor(messages, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return messages
+
+@router.post("/conversations/{other_user_id}/read", status_code=204)
+async def mark_conversation_read(
+    other_user_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Mark every message received from another user as read"""
+    await messages_crud.mark_conversation_read(db, user_id=current_user.id, other_user_id=other_user_id)
+    return Response(status_code=204)
+
+@router.put("/{message_id}", response_model=MessageResponse)
+async def update_message(
+    message_id: int,
+    message: MessageUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Mark a received message as read"""
+    if not message.is_read:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Messages cannot be marked unread"
+        )
+    return await messages_crud.mark_message_read(db, message_id=message_id, user_id=current_user.id)
+
+@router.websocket("/ws")
+async def message_events(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Stream the current user's new messages and read receipts as JSON events.
+    Authenticate with the `token` query parameter or an Authorization: Bearer header.
+    """
+    authorization = websocket.headers.get("authorization", "")
+    if token is None and authorization.lower().startswith("bearer "):
+        token = authorization[len("bearer "):]
+    try:
+        if not token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        # Only held while authenticating, not for the life of the connection
+        async with AsyncSessionLocal() as db:
+            principal = await authenticate_token(token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    await message_hub.serve(websocket, principal.id)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.db.database import get_read_db
+from app.schemas.bookings import QuoteBatchRequest, QuoteResponse
+from app.crud import quotes as quotes_crud
+from app.core.request_timing import TimedRoute
+
+router = APIRouter(
+    prefix="/quotes",
+    tags=["quotes"],
+    route_class=TimedRoute,
+)
+
+@router.post("/batch", response_model=List[QuoteResponse])
+async def quote_batch(batch: QuoteBatchRequest, db: AsyncSession = Depends(get_read_db)):
+    """
+    Price many stays in one call, e.g. totals for a page of search results.
+    Quotes come back in request order; stays at missing or inactive listings get an `error`.
+    """
+    return await quotes_crud.get_quotes(db, batch.quotes)
@@ -1,54 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.db.database import get_db
-from app.models.models import User
+from app.db.database import get_db, get_read_db
 from app.schemas.users import UserCreate, UserResponse, UserUpdate, Token
 from app.crud import users as users_crud
-from app.core.security import authenticate_user, create_access_token, get_current_user
+from app.core.principals import Principal
+from app.core.request_timing import TimedRoute
+from app.core.security import create_user_access_token, get_current_user
 
 router = APIRouter(
     prefix="/users",
     tags=["users"],
+    route_class=TimedRoute,
 )
 
 @router.post("/", response_model=UserResponse, status_code=201)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Create a new user"""
-    return users_crud.create_user(db=db, user=user)
+    return await users_crud.create_user(db=db, user=user)
 
 @router.get("/", response_model=List[UserResponse])
-def read_users(
+async def read_users(
+    response: Response,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get all users (requires authentication)"""
-    users = users_crud.get_users(db, skip=skip, limit=limit)
+    """
+    Get all users (requires authentication).
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    """
+    users = await users_crud.get_users(db, skip=skip, limit=limit, cursor=cursor)
+    next_cursor = users_crud.next_users_cursor(users, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        response.headers["X-Total-Count"] = str(await users_crud.estimate_users_count(db))
     return users
 
 @router.get("/me", response_model=UserResponse)
-def read_user_me(current_user: User = Depends(get_current_user)):
+async def read_user_me(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Get current user information"""
-    return current_user
+    db_user = await users_crud.get_user(db, user_id=current_user.id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
 
 @router.get("/{user_id}", response_model=UserResponse)
-def read_user(user_id: int, db: Session = Depends(get_db)):
+async def read_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific user by ID"""
-    db_user = users_crud.get_user(db, user_id=user_id)
+    db_user = await users_crud.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: int,
     user: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update a user (can only update own profile unless admin)"""
     if current_user.id != user_id and not current_user.is_admin:
@@ -56,13 +72,13 @@ def update_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to update other user's profile"
         )
-    updated_user = users_crud.update_user(db=db, user_id=user_id, user_update=user)
+    updated_user = await users_crud.update_user(db=db, user_id=user_id, user_update=user)
     return updated_user
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """Get an access token using username and password"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await users_crud.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -71,6 +87,6 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
         )
     
     # Create access token with user ID as the subject
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_user_access_token(user)
     
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+In-process cache for serialized API responses.
+
+Entries are evicted least-recently-used once the entry or byte budget is
+exceeded. Writes invalidate every entry at once by bumping a generation
+counter; a TTL bounds staleness for writes handled by other processes.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, NamedTuple, Optional
+
+from prometheus_client import Counter, Gauge
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+cache_hits = Counter('cache_hits_total', 'Number of response cache hits', ['cache'])
+cache_misses = Counter('cache_misses_total', 'Number of response cache misses', ['cache'])
+cache_evictions = Counter(
+    'cache_evictions_total', 'Number of response cache entries evicted', ['cache', 'reason']
+)
+cache_entries = Gauge(
+    'cache_entries', 'Number of entries in the response cache', ['cache'], multiprocess_mode='livesum'
+)
+cache_bytes = Gauge(
+    'cache_bytes', 'Approximate size of the response cache in bytes', ['cache'], multiprocess_mode='livesum'
+)
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: Dict[str, str]
+
+class _Entry(NamedTuple):
+    generation: int
+    expires_at: float
+    size: int
+    response: CachedResponse
+
+class ResponseCache:
+    """Thread-safe LRU cache of serialized responses with generation-based invalidation"""
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int, ttl_seconds: float, enabled: bool = True):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Read before running a query and pass to ``set`` so racing writes are not cached"""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                cache_misses.labels(cache=self.name).inc()
+                return None
+            if entry.generation != self._generation or entry.expires_at < time.monotonic():
+                self._remove(key, "stale")
+                cache_misses.labels(cache=self.name).inc()
+                return None
+            self._entries.move_to_end(key)
+        cache_hits.labels(cache=self.name).inc()
+        return entry.response
+
+    def set(self, key: Hashable, body: bytes, headers: Dict[str, str], generation: int) -> None:
+        if not self.enabled:
+            return
+        size = len(body) + sum(len(k) + len(v) for k, v in headers.items())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # A write landed while this response was being built
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key, "replaced")
+            self._entries[key] = _Entry(
+                generation, time.monotonic() + self.ttl_seconds, size, CachedResponse(body, headers)
+            )
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)), "capacity")
+            self._update_gauges()
+
+    def invalidate(self) -> None:
+        """Invalidate every entry; stale entries are dropped as they are touched or evicted"""
+        with self._lock:
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._update_gauges()
+
+    def _remove(self, key: Hashable, reason: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        cache_evictions.labels(cache=self.name, reason=reason).inc()
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        cache_entries.labels(cache=self.name).set(len(self._entries))
+        cache_bytes.labels(cache=self.name).set(self._bytes)
+
+def filters_cache_key(filters: BaseModel, **params) -> str:
+    """Cache key for a filter model plus paging parameters"""
+    values = filters.model_dump(mode="json", exclude_none=True)
+    values.update({name: value for name, value in params.items() if value is not None})
+    return json.dumps(values, sort_keys=True, separators=(",", ":"))
+
+# Cache for GET /api/listings search results
+search_cache = ResponseCache(
+    "listings_search",
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+    enabled=settings.SEARCH_CACHE_ENABLED,
+)
+
+# Cache for GET /api/listings/facets counts
+facets_cache = ResponseCache(
+    "listings_facets",
+    max_entries=settings.FACETS_CACHE_MAX_ENTRIES,
+    max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+    ttl_seconds=settings.FACETS_CACHE_TTL_SECONDS,
+    enabled=settings.SEARCH_CACHE_ENABLED,
+)
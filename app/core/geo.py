@@ -0,0 +1,68 @@
+"""
+Geo helpers for indexed proximity search.
+
+Listings are bucketed into latitude bands (``geo_cell``) so that a radius
+search can be narrowed with an index range scan on ``(geo_cell, longitude)``
+before the exact great-circle distance is computed on the remaining rows.
+"""
+import math
+from typing import List, Optional, Tuple
+
+EARTH_RADIUS_MILES = 3959.0
+MILES_PER_DEGREE_LAT = 69.0
+
+# Number of latitude bands per degree (0.1 degree, roughly 7 miles per band).
+# Changing this requires re-running the geo_cell backfill migration.
+GEO_CELLS_PER_DEGREE = 10
+
+
+def geo_cell(latitude: Optional[float]) -> Optional[int]:
+    """Return the latitude band for a coordinate (must match the migration backfill)"""
+    if latitude is None:
+        return None
+    return math.floor((latitude + 90.0) * GEO_CELLS_PER_DEGREE)
+
+
+def bounding_box(
+    latitude: float, longitude: float, radius_miles: float
+) -> Tuple[float, float, List[Tuple[float, float]]]:
+    """
+    Compute the bounding box around a point.
+
+    Returns ``(min_lat, max_lat, lon_ranges)`` where ``lon_ranges`` holds one
+    range, or two when the box crosses the antimeridian.
+    """
+    lat_delta = radius_miles / MILES_PER_DEGREE_LAT
+    min_lat = max(latitude - lat_delta, -90.0)
+    max_lat = min(latitude + lat_delta, 90.0)
+
+    # Near the poles the box covers every longitude
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if min_lat <= -90.0 or max_lat >= 90.0 or cos_lat <= 1e-9:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+
+    lon_delta = radius_miles / (MILES_PER_DEGREE_LAT * cos_lat)
+    if lon_delta >= 180.0:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+
+    min_lon = longitude - lon_delta
+    max_lon = longitude + lon_delta
+    if min_lon < -180.0:
+        return min_lat, max_lat, [(min_lon + 360.0, 180.0), (-180.0, max_lon)]
+    if max_lon > 180.0:
+        return min_lat, max_lat, [(min_lon, 180.0), (-180.0, max_lon - 360.0)]
+    return min_lat, max_lat, [(min_lon, max_lon)]
+
+
+def cells_between(min_lat: float, max_lat: float) -> List[int]:
+    """Return every latitude band touched by a latitude range"""
+    return list(range(geo_cell(min_lat), geo_cell(max_lat) + 1))
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in miles"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
@@ -0,0 +1,80 @@
+"""
+Prometheus request metrics as a plain ASGI middleware.
+
+Requests are labelled with the matched route template (``/api/listings/{listing_id}``)
+rather than the raw path, so the number of series is bounded by the number
+of routes. The router records the matched route in the ASGI scope, which
+the middleware reads once the request has been handled. The response is
+observed through ``send`` only; its body passes through untouched.
+"""
+import time
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Label for requests that matched no route, e.g. 404s when no static files are mounted
+UNMATCHED = "<unmatched>"
+
+request_counter = Counter(
+    'http_requests_total', 'Total number of requests', ['method', 'endpoint', 'status']
+)
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Request duration in seconds', ['method', 'endpoint'],
+    buckets=settings.HTTP_REQUEST_DURATION_BUCKETS,
+)
+active_requests = Gauge(
+    'http_requests_active', 'Number of active requests', ['method'], multiprocess_mode='livesum'
+)
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that handled the request"""
+    template: Optional[str] = getattr(scope.get("route"), "path", None)
+    if template is not None:
+        # Newer FastAPI versions keep included routers intact, so the route's path
+        # is relative to the router; the request path supplies the static prefix
+        depth = scope["path"].count("/") - template.count("/")
+        if depth > 0:
+            template = "/".join(scope["path"].split("/")[:depth + 1]) + template
+        return template
+    # Plain Starlette routes (docs, OpenAPI schema) and mounts only record their endpoint
+    endpoint = scope.get("endpoint")
+    if endpoint is not None and "app" in scope:
+        for route in scope["app"].router.routes:
+            if getattr(route, "endpoint", None) is endpoint or getattr(route, "app", None) is endpoint:
+                # Mounts (static files) match with an empty path at the root
+                return route.path or "/"
+    return UNMATCHED
+
+class PrometheusMiddleware:
+    """Counts requests and times them by method, route template and status"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+        active = active_requests.labels(method=method)
+        active.inc()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            endpoint = route_template(scope)
+            request_duration.labels(method=method, endpoint=endpoint).observe(time.perf_counter() - start)
+            request_counter.labels(method=method, endpoint=endpoint, status=status_code).inc()
+            active.dec()
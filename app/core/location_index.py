@@ -0,0 +1,122 @@
+"""
+In-memory prefix index for location autocomplete.
+
+Holds the distinct city/state/zip values of active listings with their
+listing counts in a trie. Each node caches its top-k entries by count, so
+a lookup costs O(len(prefix)) plus a merge over the nodes touched since
+the last lookup. The index is built at startup, kept current by the
+listing CRUD write paths and rebuilt periodically to pick up writes made
+by other processes.
+"""
+import heapq
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from app.core import locations
+from app.core.config import settings
+
+KIND_CITY = "city"
+KIND_STATE = "state"
+KIND_ZIP = "zip"
+
+class Suggestion(NamedTuple):
+    value: str  # what to pass as the `location` search filter
+    label: str
+    kind: str
+    count: int
+
+# (kind, value, label) identifies an entry; heap items are (count, entry)
+_EntryKey = Tuple[str, str, str]
+
+class _Node:
+    __slots__ = ("children", "entries", "top", "dirty")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: Dict[_EntryKey, int] = {}
+        self.top: List[Tuple[int, _EntryKey]] = []
+        self.dirty = False
+
+class LocationIndex:
+    """Thread-safe trie of location terms with cached top-k suggestions per node"""
+
+    def __init__(self, top_k: int = 10):
+        self.top_k = top_k
+        self._root = _Node()
+        self._lock = threading.Lock()
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        prefix = locations.normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            node = self._root
+            for char in prefix:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            top = self._refresh(node)
+        return [
+            Suggestion(value=value, label=label, kind=kind, count=count)
+            for count, (kind, value, label) in top[:limit]
+        ]
+
+    def add_location(self, city: str, state: str, zip_code: str, delta: int = 1) -> None:
+        """Add (or with a negative delta, remove) one listing's location"""
+        with self._lock:
+            for term, key in _location_terms(city, state, zip_code):
+                self._add(self._root, term, key, delta)
+
+    def rebuild(self, counts: Iterable[Tuple[str, str, str, int]]) -> None:
+        """Replace the index from (city, state, zip_code, listing count) rows"""
+        root = _Node()
+        for city, state, zip_code, count in counts:
+            for term, key in _location_terms(city, state, zip_code):
+                self._add(root, term, key, count)
+        # Warm every node's top-k before the new index starts serving lookups
+        self._refresh(root)
+        with self._lock:
+            self._root = root
+
+    def _add(self, root: _Node, term: str, key: _EntryKey, delta: int) -> None:
+        node = root
+        node.dirty = True
+        for char in term:
+            node = node.children.setdefault(char, _Node())
+            node.dirty = True
+        count = node.entries.get(key, 0) + delta
+        if count > 0:
+            node.entries[key] = count
+        else:
+            node.entries.pop(key, None)
+
+    def _refresh(self, node: _Node) -> List[Tuple[int, _EntryKey]]:
+        """Recompute the cached top-k of dirty nodes below ``node``"""
+        if node.dirty:
+            candidates = [(count, key) for key, count in node.entries.items()]
+            for child in node.children.values():
+                candidates.extend(self._refresh(child))
+            # The same entry can be reachable through several terms of one node's subtree
+            merged: Dict[_EntryKey, int] = {}
+            for count, key in candidates:
+                merged[key] = max(count, merged.get(key, 0))
+            node.top = heapq.nlargest(self.top_k, ((count, key) for key, count in merged.items()))
+            node.dirty = False
+        return node.top
+
+def _location_terms(city: str, state: str, zip_code: str) -> List[Tuple[str, _EntryKey]]:
+    """Trie terms and entries for one listing location"""
+    city_value = locations.normalize(f"{city} {state}")
+    state_value = locations.normalize(state)
+    terms = [
+        (city_value, (KIND_CITY, city_value, f"{city}, {state}")),
+        (state_value, (KIND_STATE, state_value, state)),
+        (locations.normalize(zip_code), (KIND_ZIP, locations.normalize(zip_code), zip_code)),
+    ]
+    # Let "oreg" find listings stored with the state code "OR"
+    state_name = locations.US_STATES.get(state_value)
+    if state_name:
+        terms.append((state_name, (KIND_STATE, state_value, state)))
+    return terms
+
+location_index = LocationIndex(top_k=settings.LOCATION_SUGGEST_MAX_RESULTS)
@@ -0,0 +1,56 @@
+"""
+Location query normalization and classification.
+
+``location_key`` is the lowercased, whitespace-collapsed "city state zip"
+string stored on each listing. It is what substring and prefix matches run
+against (backed by a pg_trgm index). Queries that look like a zip code or a
+US state code short-circuit to equality lookups instead.
+"""
+import re
+from typing import Optional
+
+US_STATES = {
+    "al": "alabama", "ak": "alaska", "az": "arizona", "ar": "arkansas",
+    "ca": "california", "co": "colorado", "ct": "connecticut", "de": "delaware",
+    "dc": "district of columbia", "fl": "florida", "ga": "georgia", "hi": "hawaii",
+    "id": "idaho", "il": "illinois", "in": "indiana", "ia": "iowa",
+    "ks": "kansas", "ky": "kentucky", "la": "louisiana", "me": "maine",
+    "md": "maryland", "ma": "massachusetts", "mi": "michigan", "mn": "minnesota",
+    "ms": "mississippi", "mo": "missouri", "mt": "montana", "ne": "nebraska",
+    "nv": "nevada", "nh": "new hampshire", "nj": "new jersey", "nm": "new mexico",
+    "ny": "new york", "nc": "north carolina", "nd": "north dakota", "oh": "ohio",
+    "ok": "oklahoma", "or": "oregon", "pa": "pennsylvania", "ri": "rhode island",
+    "sc": "south carolina", "sd": "south dakota", "tn": "tennessee", "tx": "texas",
+    "ut": "utah", "vt": "vermont", "va": "virginia", "wa": "washington",
+    "wv": "west virginia", "wi": "wisconsin", "wy": "wyoming", "pr": "puerto rico",
+}
+
+ZIP_CODE_PATTERN = re.compile(r"\d{5}(-\d{4})?")
+
+QUERY_ZIP = "zip"
+QUERY_STATE = "state"
+QUERY_TEXT = "text"
+
+
+def normalize(value: Optional[str]) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join((value or "").split()).lower()
+
+
+def location_key(city: Optional[str], state: Optional[str], zip_code: Optional[str]) -> str:
+    """Build the stored location_key (must match the migration backfill)"""
+    return normalize(f"{city or ''} {state or ''} {zip_code or ''}")
+
+
+def classify(query: str) -> str:
+    """Classify a normalized location query as a zip code, a state code or free text"""
+    if ZIP_CODE_PATTERN.fullmatch(query):
+        return QUERY_ZIP
+    if query in US_STATES:
+        return QUERY_STATE
+    return QUERY_TEXT
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally (escape character is backslash)"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
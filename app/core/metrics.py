@@ -0,0 +1,54 @@
+"""
+Prometheus exposition for single- and multi-worker deployments.
+
+With several gunicorn/uvicorn workers per pod, each worker has its own
+metric values, and a scrape would only see the worker that answered it.
+Setting PROMETHEUS_MULTIPROC_DIR before the workers start makes
+prometheus_client keep every value in per-process mmap files in that
+directory, and ``/metrics`` then merges the files of all workers. Gauges
+declare how they merge (``multiprocess_mode``); ``live*`` modes drop the
+values of workers that have exited, whose files are removed at each scrape.
+
+The directory must be emptied before the server starts (start.sh does this),
+otherwise counters carry over from the previous run.
+"""
+import glob
+import os
+from typing import Optional
+
+import prometheus_client
+from prometheus_client import CollectorRegistry, multiprocess
+
+def multiprocess_dir() -> Optional[str]:
+    """The shared metrics directory, or None when each process reports its own metrics"""
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or None
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def remove_dead_worker_files(path: str) -> None:
+    """Drop live-gauge values of workers that are no longer running"""
+    pids = set()
+    for filename in glob.glob(os.path.join(path, "gauge_live*_*.db")):
+        pid = os.path.basename(filename)[:-len(".db")].rsplit("_", 1)[1]
+        if pid.isdigit():
+            pids.add(int(pid))
+    for pid in pids:
+        if not _is_running(pid):
+            multiprocess.mark_process_dead(pid, path)
+
+def render_metrics() -> bytes:
+    """Metrics in the Prometheus text format, merged across workers in multiprocess mode"""
+    path = multiprocess_dir()
+    if path is None:
+        return prometheus_client.generate_latest()
+    remove_dead_worker_files(path)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=path)
+    return prometheus_client.generate_latest(registry)
@@ -0,0 +1,101 @@
+"""
+Password hashing on a bounded process pool.
+
+bcrypt is deliberately slow (a few hundred ms per hash at cost 12). Running it
+in the request workers lets a burst of logins take every thread and stall
+unrelated endpoints, so hashes run on a small dedicated process pool
+instead. The number of hashes waiting for or running on the pool is
+capped: past PASSWORD_HASH_MAX_PENDING, requests are answered 503 with
+Retry-After immediately instead of queueing behind the burst.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.config import settings
+
+# Password hashing configuration
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS)
+
+password_hash_duration = Histogram(
+    'password_hash_duration_seconds', 'Time to hash or verify a password, including queueing',
+    ['operation'], buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+password_hash_pending = Gauge(
+    'password_hash_pending', 'Password hashes waiting for or running on the hashing pool',
+    multiprocess_mode='livesum',
+)
+password_hash_rejections = Counter(
+    'password_hash_rejections_total', 'Password hashes refused because the hashing pool was saturated'
+)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
+    """Generate a password hash, with the configured bcrypt cost unless ``rounds`` is given"""
+    if rounds is None:
+        return pwd_context.hash(password)
+    return pwd_context.hash(password, rounds=rounds)
+
+class PasswordHasher:
+    """Runs password hashing on a process pool with a cap on pending work"""
+
+    def __init__(self, workers: int, max_pending: int, retry_after_seconds: int = 1):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after_seconds = retry_after_seconds
+        self._executor: Optional[Executor] = None
+        self._pending = 0  # only touched from the event loop
+
+    def start(self) -> None:
+        """Create the worker pool; with 0 workers hashing runs on the request threadpool"""
+        if self.workers > 0 and self._executor is None:
+            # Forking a process that runs an event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    async def _run(self, operation: str, func: Callable, *args):
+        if self._pending >= self.max_pending:
+            password_hash_rejections.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password operations in progress, try again shortly",
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+        self._pending += 1
+        password_hash_pending.set(self._pending)
+        start = time.perf_counter()
+        try:
+            self.start()
+            if self._executor is None:
+                return await run_in_threadpool(func, *args)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            password_hash_duration.labels(operation=operation).observe(time.perf_counter() - start)
+            self._pending -= 1
+            password_hash_pending.set(self._pending)
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    retry_after_seconds=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
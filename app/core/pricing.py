@@ -0,0 +1,66 @@
+"""
+Booking prices, computed on the server from the listing's monthly price.
+
+A stay is charged the monthly price for each whole calendar month from its
+start date, plus the remaining days at a daily rate of 12/365 of the monthly
+price. Open-ended stays are charged their first month up front. The platform
+fee is PLATFORM_FEE_PERCENT of the total. Amounts are integer cents, rounded
+half up.
+
+Only the calendar arithmetic depends on the dates, so quotes for many
+listings over the same dates (a page of search results) work it out once and
+then price every listing with two integer multiplications.
+"""
+import calendar
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Sequence
+
+from app.core.config import settings
+
+DAYS_PER_YEAR = 365
+
+class Term(NamedTuple):
+    """Length of a stay in whole calendar months plus remaining days"""
+    months: int
+    days: int
+
+class Quote(NamedTuple):
+    total_price: int  # in cents
+    platform_fee: int  # in cents
+    months: int
+    days: int
+
+def add_months(value: datetime, months: int) -> datetime:
+    """``value`` moved by whole calendar months, clamped to the end of shorter months"""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
+def stay_term(start_date: datetime, end_date: Optional[datetime]) -> Term:
+    """Whole months from ``start_date``, and the days left over (a started day counts)"""
+    if end_date is None:
+        return Term(1, 0)
+    months = (end_date.year - start_date.year) * 12 + end_date.month - start_date.month
+    if months > 0 and add_months(start_date, months) > end_date:
+        months -= 1
+    months = max(months, 0)
+    remainder = end_date - add_months(start_date, months)
+    days = remainder.days + (1 if remainder % timedelta(days=1) else 0)
+    return Term(months, days)
+
+def _round_div(numerator: int, denominator: int) -> int:
+    return (numerator + denominator // 2) // denominator
+
+def price_for_term(price_per_month: int, term: Term) -> Quote:
+    """Price a stay of ``term`` at ``price_per_month``"""
+    total_price = price_per_month * term.months + _round_div(price_per_month * 12 * term.days, DAYS_PER_YEAR)
+    return Quote(total_price, _round_div(total_price * settings.PLATFORM_FEE_PERCENT, 100), term.months, term.days)
+
+def quote(price_per_month: int, start_date: datetime, end_date: Optional[datetime]) -> Quote:
+    """Price a stay at one listing"""
+    return price_for_term(price_per_month, stay_term(start_date, end_date))
+
+def quote_many(prices_per_month: Sequence[int], start_date: datetime, end_date: Optional[datetime]) -> List[Quote]:
+    """Price the same stay at several listings"""
+    term = stay_term(start_date, end_date)
+    return [price_for_term(price, term) for price in prices_per_month]
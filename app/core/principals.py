@@ -0,0 +1,105 @@
+"""
+Authenticated-user principals for authorization checks.
+
+``get_current_user`` resolves a token to a small detached Principal instead
+of a full User row. Principals are cached per process by user id; a TTL
+bounds staleness from writes on other replicas and user updates drop the
+local entry. With AUTH_TOKEN_CLAIMS the role flags are carried in the
+access token itself and no lookup is needed.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from app.core.cache import cache_entries, cache_evictions, cache_hits, cache_misses
+from app.core.config import settings
+
+class Principal(NamedTuple):
+    id: int
+    username: str
+    is_host: bool
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(user.id, user.username, bool(user.is_host), bool(user.is_admin))
+
+    @classmethod
+    def from_claims(cls, user_id: int, payload: Mapping[str, Any]) -> Optional["Principal"]:
+        """Principal from access token claims, or None if the token predates claims"""
+        if not all(name in payload for name in ("username", "is_host", "is_admin")):
+            return None
+        return cls(user_id, payload["username"], bool(payload["is_host"]), bool(payload["is_admin"]))
+
+    def claims(self) -> Dict[str, Any]:
+        return {"username": self.username, "is_host": self.is_host, "is_admin": self.is_admin}
+
+class PrincipalCache:
+    """Thread-safe LRU cache of principals by user id with a TTL"""
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float, enabled: bool = True):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Read before loading a user and pass to ``set`` so racing updates are not cached"""
+        return self._generation
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(user_id, "stale")
+                entry = None
+            if entry is None:
+                cache_misses.labels(cache=self.name).inc()
+                return None
+            self._entries.move_to_end(user_id)
+        cache_hits.labels(cache=self.name).inc()
+        return entry[1]
+
+    def set(self, principal: Principal, generation: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            # The user was updated while it was being loaded
+            if generation != self._generation:
+                return
+            self._entries[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)), "capacity")
+            cache_entries.labels(cache=self.name).set(len(self._entries))
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop one user's entry, and any load of it already in flight"""
+        with self._lock:
+            self._generation += 1
+            if user_id in self._entries:
+                self._remove(user_id, "invalidated")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            cache_entries.labels(cache=self.name).set(0)
+
+    def _remove(self, user_id: int, reason: str) -> None:
+        del self._entries[user_id]
+        cache_evictions.labels(cache=self.name, reason=reason).inc()
+        cache_entries.labels(cache=self.name).set(len(self._entries))
+
+principal_cache = PrincipalCache(
+    "principals",
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+)
@@ -0,0 +1,198 @@
+"""
+On-demand sampling profiler for live requests.
+
+An admin arms the profiler for a route template through
+``POST /api/admin/profile``; the next N requests to that route are sampled
+and each one is written to PROFILE_OUTPUT_DIR as collapsed stacks
+(``frame;frame;frame count`` per line), the input format of flamegraph.pl,
+speedscope and most other flame graph viewers.
+
+While a profiled request runs, a sampler thread reads the event loop
+thread's stack every interval. Samples taken while the request's task is
+running record where CPU time goes; while it is suspended, the task's
+coroutine stack is recorded with an ``[await]`` leaf, so time spent waiting
+on the database or the hashing pool shows up too. Work the request hands to
+the threadpool is not sampled. When the profiler is not armed the middleware
+costs one attribute check per request.
+
+Profiles are per process: with several workers, only the worker that
+received the arming request profiles.
+"""
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.http_metrics import route_template
+
+# Path prefixes stripped from frame labels, to keep them short and stable across installs
+_PATH_MARKERS = ("site-packages" + os.sep, os.getcwd() + os.sep)
+
+def _frame_label(filename: str, name: str, lineno: int) -> str:
+    for marker in _PATH_MARKERS:
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    return f"{name} ({filename}:{lineno})"
+
+def _thread_stack(thread_id: int) -> List[str]:
+    frame = sys._current_frames().get(thread_id)
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame.f_code.co_filename, frame.f_code.co_name, frame.f_code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+def _task_stack(task: asyncio.Task) -> List[str]:
+    # Task.get_stack() only returns the outermost frame of a suspended task;
+    # follow the chain of awaited coroutines down to where it is waiting
+    stack = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "ag_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(_frame_label(frame.f_code.co_filename, frame.f_code.co_name, frame.f_code.co_firstlineno))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "ag_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return stack + ["[await]"]
+
+class _Sampler(threading.Thread):
+    def __init__(self, task: asyncio.Task, loop: asyncio.AbstractEventLoop, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.task = task
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                if asyncio.current_task(self.loop) is self.task:
+                    stack = _thread_stack(self.loop_thread_id)
+                else:
+                    stack = _task_stack(self.task)
+            except (RuntimeError, ValueError):
+                # The task's frames changed under us; skip the sample
+                continue
+            self.stacks[";".join(stack)] += 1
+
+    def stop(self) -> Counter:
+        self._stopped.set()
+        self.join()
+        return self.stacks
+
+class ProfileTarget:
+    """Route template, and optionally method, whose next requests are profiled"""
+
+    def __init__(self, route: str, method: Optional[str], requests: int, interval: float):
+        self.route = route
+        self.method = method.upper() if method else None
+        self.remaining = requests
+        self.interval = interval
+        self.armed_at = time.time()
+        self._path_regex = compile_path(route)[0]
+
+    def matches(self, scope: Scope) -> bool:
+        return (self.method is None or scope["method"] == self.method) and bool(self._path_regex.match(scope["path"]))
+
+class RequestProfiler:
+    """Arms sampling for the next requests to a route and writes their profiles"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.target: Optional[ProfileTarget] = None
+        self._lock = threading.Lock()
+
+    def arm(self, route: str, method: Optional[str], requests: int, interval: float) -> ProfileTarget:
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.target = ProfileTarget(route, method, requests, interval)
+        return self.target
+
+    def disarm(self) -> None:
+        self.target = None
+
+    @property
+    def armed(self) -> bool:
+        target = self.target
+        return target is not None and target.remaining > 0
+
+    def claim(self, scope: Scope) -> Optional[ProfileTarget]:
+        """The armed target if this request should be profiled, using up one of its requests"""
+        target = self.target
+        if target is None or not target.matches(scope):
+            return None
+        with self._lock:
+            if target.remaining <= 0:
+                return None
+            target.remaining -= 1
+        return target
+
+    def release(self, target: ProfileTarget) -> None:
+        """Give back a request claimed for a path that turned out to belong to another route"""
+        with self._lock:
+            target.remaining += 1
+
+    def profiles(self, limit: int = 50) -> List[str]:
+        """Most recent profile files, newest first"""
+        if not os.path.isdir(self.output_dir):
+            return []
+        names = [name for name in os.listdir(self.output_dir) if name.endswith(".collapsed")]
+        return sorted(names, reverse=True)[:limit]
+
+    def save(self, scope: Scope, sampler: "_Sampler", duration: float) -> str:
+        """Stop sampling and write the request's collapsed stacks"""
+        stacks = sampler.stop()
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route_template(scope)).strip("_") or "root"
+        timestamp = datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+        name = f"{timestamp}-{scope['method']}-{slug}-{duration * 1000:.0f}ms.collapsed"
+        path = os.path.join(self.output_dir, name)
+        with open(path, "w") as f:
+            for stack, count in stacks.items():
+                f.write(f"{stack} {count}\n")
+        return path
+
+class ProfilingMiddleware:
+    """Samples requests claimed from the profiler"""
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.profiler.armed or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        target = self.profiler.claim(scope)
+        if target is None:
+            await self.app(scope, receive, send)
+            return
+
+        sampler = _Sampler(asyncio.current_task(), asyncio.get_running_loop(), target.interval)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            duration = time.perf_counter() - start
+            if route_template(scope) == target.route:
+                # Joining the sampler and writing the file stay off the event loop
+                await run_in_threadpool(self.profiler.save, scope, sampler, duration)
+            else:
+                sampler.stop()
+                self.profiler.release(target)
+
+# Global profiler of this process
+request_profiler = RequestProfiler(settings.PROFILE_OUTPUT_DIR)
@@ -0,0 +1,190 @@
+"""
+Real-time delivery of new messages and read receipts over WebSockets.
+
+Each process keeps a MessageHub of its open connections by user. Events are
+published after the database transaction that produced them commits. With
+REALTIME_BROKER=postgres the hub sends them with ``NOTIFY`` on
+REALTIME_CHANNEL and every process, this one included, receives them through
+its own ``LISTEN`` connection and delivers them to the recipients connected
+to it; that is how an event reaches users connected to other replicas or
+workers. While the listener is down (or with REALTIME_BROKER=local) events
+are only delivered in this process.
+
+Every connection has a bounded queue drained by its own send loop, so a slow
+client never blocks the publisher. A client that falls WS_SEND_QUEUE_SIZE
+events behind is disconnected; on reconnecting it catches up through the
+REST inbox and history endpoints. Delivery is best effort: events published
+while a client is disconnected are not replayed.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional, Set
+
+import asyncpg
+from prometheus_client import Counter, Gauge
+from sqlalchemy.engine import make_url
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay under 8000 bytes
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+# Close code sent to clients that fall too far behind (1013: try again later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+websocket_connections = Gauge(
+    'websocket_connections', 'Open WebSocket connections', multiprocess_mode='livesum'
+)
+websocket_events = Counter(
+    'websocket_events_total', 'Events queued for WebSocket connections', ['type']
+)
+websocket_slow_disconnects = Counter(
+    'websocket_slow_disconnects_total', 'Connections closed because their send queue was full'
+)
+
+class Connection:
+    """One client connection and its bounded queue of events to send"""
+
+    def __init__(self, websocket: WebSocket, user_id: int, queue_size: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, message: str) -> bool:
+        """Queue a serialized event without waiting; False once the client has fallen behind"""
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.end()
+            return False
+        return True
+
+    def end(self) -> None:
+        """Drop the queued events and wake the send loop to finish"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+class MessageHub:
+    """Connections of this process by user, and delivery of events to them"""
+
+    def __init__(self, queue_size: int, channel: str):
+        self.queue_size = queue_size
+        self.channel = channel
+        self.connections: Dict[int, Set[Connection]] = {}
+        self._listener: Optional[asyncpg.Connection] = None
+        self._notify_lock = asyncio.Lock()
+
+    def connect(self, websocket: WebSocket, user_id: int) -> Connection:
+        connection = Connection(websocket, user_id, self.queue_size)
+        self.connections.setdefault(user_id, set()).add(connection)
+        websocket_connections.inc()
+        return connection
+
+    def disconnect(self, connection: Connection) -> None:
+        user_connections = self.connections.get(connection.user_id)
+        if user_connections is not None and connection in user_connections:
+            user_connections.discard(connection)
+            if not user_connections:
+                del self.connections[connection.user_id]
+            websocket_connections.dec()
+
+    def deliver(self, user_ids: Iterable[int], message: str, event_type: str = "event") -> None:
+        """Queue a serialized event for every connection of ``user_ids`` in this process"""
+        for user_id in set(user_ids):
+            for connection in list(self.connections.get(user_id, ())):
+                if connection.offer(message):
+                    websocket_events.labels(type=event_type).inc()
+                elif connection.overflowed:
+                    websocket_slow_disconnects.inc()
+                    self.disconnect(connection)
+
+    async def publish(self, user_ids: Iterable[int], event: Dict[str, Any]) -> None:
+        """Send an event to every connection of ``user_ids``, across processes when the broker is up"""
+        user_ids = sorted(set(user_ids))
+        message = json.dumps(event, separators=(",", ":"), default=str)
+        listener = self._listener
+        if listener is None or listener.is_closed():
+            self.deliver(user_ids, message, event["type"])
+            return
+        payload = json.dumps({"u": user_ids, "t": event["type"], "e": message}, separators=(",", ":"))
+        if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT:
+            # Too large for NOTIFY; tell the clients to refetch instead
+            resync = json.dumps({"type": "resync"}, separators=(",", ":"))
+            payload = json.dumps({"u": user_ids, "t": "resync", "e": resync}, separators=(",", ":"))
+        try:
+            # One connection carries LISTEN and NOTIFY; asyncpg runs one query at a time on it
+            async with self._notify_lock:
+                await listener.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        except (asyncpg.PostgresError, OSError, asyncpg.InterfaceError):
+            logger.warning("NOTIFY failed, delivering in this process only", exc_info=True)
+            self.deliver(user_ids, message, event["type"])
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        try:
+            notification = json.loads(payload)
+            self.deliver(notification["u"], notification["e"], notification["t"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed notification on %s", channel)
+
+    async def run_listener(self, database_url: str, retry_seconds: float = 5.0) -> None:
+        """Keep a LISTEN connection open, reconnecting when it drops (run as a background task)"""
+        dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                listener = await asyncpg.connect(dsn)
+            except (asyncpg.PostgresError, OSError) as e:
+                logger.warning("Could not open the realtime listener connection: %s", e)
+                await asyncio.sleep(retry_seconds)
+                continue
+            closed = asyncio.Event()
+            listener.add_termination_listener(lambda _: closed.set())
+            try:
+                await listener.add_listener(self.channel, self._on_notification)
+                self._listener = listener
+                await closed.wait()
+                logger.warning("Realtime listener connection closed, reconnecting")
+            except (asyncpg.PostgresError, OSError, asyncpg.InterfaceError):
+                logger.warning("Realtime listener failed, reconnecting", exc_info=True)
+            finally:
+                self._listener = None
+                if not listener.is_closed():
+                    await listener.close()
+            await asyncio.sleep(retry_seconds)
+
+    async def serve(self, websocket: WebSocket, user_id: int) -> None:
+        """Send queued events to an accepted WebSocket until either side closes it"""
+        connection = self.connect(websocket, user_id)
+        receiver = asyncio.create_task(self._receive(connection))
+        try:
+            while (message := await connection.queue.get()) is not None:
+                await websocket.send_text(message)
+            if connection.overflowed:
+                await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except (WebSocketDisconnect, RuntimeError, OSError):
+            # The client went away while we were sending
+            return
+        finally:
+            receiver.cancel()
+            self.disconnect(connection)
+
+    async def _receive(self, connection: Connection) -> None:
+        # Clients only send keepalives; answer them through the queue so that
+        # only the send loop writes to the socket, and end it when the client leaves
+        try:
+            while True:
+                if await connection.websocket.receive_text() == "ping":
+                    connection.offer('{"type":"pong"}')
+        except (WebSocketDisconnect, RuntimeError):
+            connection.end()
+
+# Global hub of this process
+message_hub = MessageHub(settings.WS_SEND_QUEUE_SIZE, settings.REALTIME_CHANNEL)
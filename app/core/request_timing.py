@@ -0,0 +1,164 @@
+"""
+Per-request query counts and phase timings.
+
+RequestTimingMiddleware gives each request a RequestTimings object in a
+context variable. The SQL hooks in app/db/query_metrics.py add every
+statement to it; ``phase`` times other work (authentication), and routes
+built with TimedRoute note when the endpoint returns so that response
+serialization can be timed. The totals go out in a ``Server-Timing`` header,
+which browsers show in their network panel, and into per-route histograms.
+
+A request that runs the same statement more than
+SQL_REPEATED_STATEMENT_THRESHOLD times (usually a query in a loop, the N+1
+pattern) is logged, or fails with RepeatedStatementError when
+SQL_REPEATED_STATEMENT_STRICT is set, so tests catch it.
+"""
+import asyncio
+import functools
+import logging
+import time
+from collections import Counter as StatementCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from fastapi.routing import APIRoute
+from prometheus_client import Histogram
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.http_metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+db_queries_per_request = Histogram(
+    'db_queries_per_request', 'SQL statements executed per request', ['endpoint'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+db_seconds_per_request = Histogram(
+    'db_seconds_per_request', 'Time spent executing SQL per request', ['endpoint'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+
+class RepeatedStatementError(RuntimeError):
+    """Raised in strict mode when a request repeats a statement too often"""
+
+class RequestTimings:
+    """Queries and phase durations of one request"""
+
+    def __init__(self, label: str = "", threshold: int = 0, strict: bool = False):
+        self.label = label
+        self.threshold = threshold
+        self.strict = strict
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: StatementCounter = StatementCounter()
+        self.phases: Dict[str, float] = {}
+        self.endpoint_finished: Optional[float] = None
+
+    def record_query(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.db_seconds += seconds
+        self.statements[statement] += 1
+        # Report each repeated statement once, as it crosses the threshold
+        if self.threshold and self.statements[statement] == self.threshold + 1:
+            message = f"{self.label} ran the same statement more than {self.threshold} times: {statement[:200]}"
+            if self.strict:
+                raise RepeatedStatementError(message)
+            logger.warning(message)
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def server_timing(self, now: float) -> str:
+        """``Server-Timing`` header value, with durations in milliseconds"""
+        entries = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"']
+        entries += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()]
+        if self.endpoint_finished is not None:
+            entries.append(f"serialize;dur={(now - self.endpoint_finished) * 1000:.1f}")
+        return ", ".join(entries)
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled, or None outside of a request"""
+    return _current.get()
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Add the duration of the block to the current request's ``name`` phase"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_phase(name, time.perf_counter() - start)
+
+@contextmanager
+def collect_queries(label: str = "block", threshold: Optional[int] = None, strict: bool = True) -> Iterator[RequestTimings]:
+    """Count the queries run inside the block, e.g. to assert on them in tests"""
+    if threshold is None:
+        threshold = settings.SQL_REPEATED_STATEMENT_THRESHOLD
+    token = _current.set(RequestTimings(label, threshold, strict))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+def _mark_endpoint_finished(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    if not asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timings = _current.get()
+            if timings is not None:
+                timings.endpoint_finished = time.perf_counter()
+
+    return wrapper
+
+class TimedRoute(APIRoute):
+    """APIRoute that records when its endpoint returns, to time serialization"""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _mark_endpoint_finished(endpoint), **kwargs)
+
+class RequestTimingMiddleware:
+    """Collects RequestTimings for each request and reports them"""
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(
+            f'{scope["method"]} {scope["path"]}',
+            settings.SQL_REPEATED_STATEMENT_THRESHOLD,
+            settings.SQL_REPEATED_STATEMENT_STRICT,
+        )
+        token = _current.set(timings)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing(time.perf_counter()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            endpoint = route_template(scope)
+            db_queries_per_request.labels(endpoint=endpoint).observe(timings.queries)
+            db_seconds_per_request.labels(endpoint=endpoint).observe(timings.db_seconds)
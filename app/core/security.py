@@ -1,31 +1,21 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union, Any
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 import secrets
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
 from app.crud import users as users_crud
 from app.core.config import settings
+from app.core.principals import Principal, principal_cache
+from app.core.request_timing import phase
 from app.models.models import User
 
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 token URL
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/users/login")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Generate a password hash"""
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -40,31 +30,65 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     
     return encoded_jwt
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current user from the token"""
+def create_user_access_token(user: User) -> str:
+    """Create an access token for a user, with role claims if AUTH_TOKEN_CLAIMS is set"""
+    data = {"sub": str(user.id)}
+    if settings.AUTH_TOKEN_CLAIMS:
+        data.update(Principal.from_user(user).claims())
+    return create_access_token(data)
+
+async def authenticate_token(token: str, db: AsyncSession) -> Principal:
+    """The user an access token belongs to, from its claims or the principal cache when possible"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
         user_id: str = payload.get("sub")
-        
+    
         if user_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = users_crud.get_user(db=db, user_id=int(user_id))
-    
+
+    user_id = int(user_id)
+    if settings.AUTH_TOKEN_CLAIMS:
+        principal = Principal.from_claims(user_id, payload)
+        if principal is not None:
+            return principal
+
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    generation = principal_cache.generation
+    user = await users_crud.get_user(db=db, user_id=user_id)
+
     if user is None:
         raise credentials_exception
-    
-    return user
\ No newline at end of file
+
+    principal = Principal.from_user(user)
+    principal_cache.set(principal, generation)
+    return principal
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), 
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """Get the current user from the request's bearer token"""
+    with phase("auth"):
+        return await authenticate_token(token, db)
+
+async def get_current_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
+    """Get the current user, requiring admin privileges"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
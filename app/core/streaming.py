@@ -0,0 +1,177 @@
+"""
+Incremental CSV and NDJSON readers for request bodies and writers for
+streamed responses.
+
+Records are parsed as the body arrives, so memory use is bounded by the
+longest record rather than by the size of the upload; a CSV record that
+grows past BULK_IMPORT_MAX_RECORD_SIZE (a stray quote makes the rest of the
+file one quoted field) is reported and skipped. Malformed records are
+reported with their line number instead of aborting the stream.
+Writers encode rows a batch at a time, optionally gzip-compressed on the fly.
+"""
+import codecs
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator, Dict, Iterable, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+
+# Request Content-Type -> record format
+CONTENT_TYPES = {
+    "text/csv": FORMAT_CSV,
+    "application/x-ndjson": FORMAT_NDJSON,
+    "application/jsonl": FORMAT_NDJSON,
+}
+
+MEDIA_TYPES = {
+    FORMAT_CSV: "text/csv",
+    FORMAT_NDJSON: "application/x-ndjson",
+}
+
+# List cells in CSV files are joined with this separator
+CSV_LIST_SEPARATOR = "|"
+
+class Record(NamedTuple):
+    line: int  # line the record starts on
+    data: Optional[Dict[str, object]]
+    error: Optional[str] = None
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Decode a UTF-8 byte stream into numbered lines (line endings kept)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield line_number + 1, buffer
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    async for line_number, line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield Record(line_number, None, f"Invalid JSON: {e}")
+            continue
+        if not isinstance(data, dict):
+            yield Record(line_number, None, "Expected a JSON object")
+            continue
+        yield Record(line_number, data)
+
+async def iter_csv_records(chunks: AsyncIterator[bytes], max_record_size: Optional[int] = None) -> AsyncIterator[Record]:
+    """Rows of a CSV file with a header line; empty cells are left out of the record"""
+    if max_record_size is None:
+        max_record_size = settings.BULK_IMPORT_MAX_RECORD_SIZE
+    header = None
+    pending = []
+    pending_size = 0
+    in_quotes = False
+    start = 0
+    async for line_number, line in iter_lines(chunks):
+        if not pending:
+            start = line_number
+        pending.append(line)
+        pending_size += len(line)
+        # An odd number of quotes leaves a quoted field open on the next line
+        if line.count('"') % 2:
+            in_quotes = not in_quotes
+        if in_quotes:
+            if pending_size > max_record_size:
+                yield Record(start, None, f"Record longer than {max_record_size} characters (unterminated quoted field?)")
+                pending, pending_size, in_quotes = [], 0, False
+            continue
+        text = "".join(pending)
+        pending, pending_size = [], 0
+        if not text.strip():
+            continue
+
+        try:
+            values = next(csv.reader(io.StringIO(text)))
+        except csv.Error as e:
+            yield Record(start, None, f"Invalid CSV: {e}")
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield Record(start, None, f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield Record(start, {name: value for name, value in zip(header, values) if value != ""})
+
+    if pending:
+        yield Record(start, None, "Unterminated quoted field")
+
+def iter_records(record_format: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    if record_format == FORMAT_CSV:
+        return iter_csv_records(chunks)
+    return iter_ndjson_records(chunks)
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return CSV_LIST_SEPARATOR.join(str(item) for item in value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def ndjson_bytes(rows: Iterable[Mapping]) -> bytes:
+    return b"".join(
+        (json.dumps(dict(row), default=_json_default, separators=(",", ":")) + "\n").encode()
+        for row in rows
+    )
+
+def csv_bytes(rows: Iterable[Mapping], columns: Sequence[str], header: bool = False) -> bytes:
+    """CSV lines, optionally preceded by a header; list cells are joined with CSV_LIST_SEPARATOR"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_csv_value(row[column]) for column in columns] for row in rows)
+    return buffer.getvalue().encode()
+
+class RowEncoder:
+    """
+    Encode successive batches of rows as one NDJSON or CSV document,
+    optionally gzip-compressed on the fly
+    """
+
+    def __init__(self, record_format: str, columns: Sequence[str], compress: bool = False):
+        self.record_format = record_format
+        self.columns = columns
+        self._header = record_format == FORMAT_CSV
+        # wbits=16+MAX_WBITS writes the gzip header and trailer
+        self._compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+
+    def encode(self, rows: Sequence[Mapping]) -> bytes:
+        if self.record_format == FORMAT_CSV:
+            data = csv_bytes(rows, self.columns, header=self._header)
+            self._header = False
+        else:
+            data = ndjson_bytes(rows)
+        return self._compressor.compress(data) if self._compressor else data
+
+    def finish(self) -> bytes:
+        """Bytes that end the document (the CSV header if no rows were encoded, the gzip trailer)"""
+        data = self.encode([]) if self._header else b""
+        if self._compressor:
+            data += self._compressor.flush()
+        return data
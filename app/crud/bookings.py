@@ -0,0 +1,251 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException, status
+from typing import Optional, List, Tuple
+from datetime import datetime
+
+from app.core import pricing
+from app.core.cache import search_cache, facets_cache
+from app.core.config import settings
+from app.core.principals import Principal
+from app.crud import pagination
+from app.crud.listings import BLOCKING_BOOKING_STATUSES
+from app.models.models import Booking, Listing
+from app.schemas.bookings import BookingCreate, BookingUpdate
+
+# SQLSTATEs raised by the bookings constraints
+UNIQUE_VIOLATION = "23505"
+EXCLUSION_VIOLATION = "23P01"
+
+RENTER = "renter"
+HOST = "host"
+
+# Allowed status changes and who may make them; admins may make any of them
+BOOKING_TRANSITIONS = {
+    ("pending", "confirmed"): {HOST},
+    ("pending", "cancelled"): {RENTER, HOST},
+    ("confirmed", "cancelled"): {RENTER, HOST},
+    ("confirmed", "completed"): {HOST},
+}
+
+def booking_roles(booking: Booking, listing: Listing, principal: Principal) -> set:
+    """The parts ``principal`` plays in a booking: renter, host, both or neither"""
+    roles = set()
+    if booking.renter_id == principal.id:
+        roles.add(RENTER)
+    if listing.host_id == principal.id:
+        roles.add(HOST)
+    return roles
+
+def check_transition(current: str, new: str, roles: set, is_admin: bool = False) -> None:
+    """Raise unless a user with ``roles`` may move a booking from ``current`` to ``new``"""
+    allowed = BOOKING_TRANSITIONS.get((current, new))
+    if allowed is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"A {current} booking cannot become {new}"
+        )
+    if not is_admin and not allowed & roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Only the {' or '.join(sorted(allowed))} can make a {current} booking {new}"
+        )
+
+def check_offered(listing: Listing, start_date: datetime, end_date: Optional[datetime]) -> None:
+    """Raise unless the host offers ``listing`` for the whole of [start_date, end_date); None is open-ended"""
+    if (listing.available_from is not None and start_date < listing.available_from) or (
+        listing.available_to is not None and (end_date is None or end_date > listing.available_to)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The listing is not offered for these dates"
+        )
+
+def _error_code(error: IntegrityError) -> Optional[str]:
+    return getattr(error.orig, "pgcode", None)
+
+def _invalidate_search() -> None:
+    # Bookings change which listings availability searches return
+    search_cache.invalidate()
+    facets_cache.invalidate()
+
+async def get_booking(db: AsyncSession, booking_id: int) -> Optional[Booking]:
+    """Get a booking by ID"""
+    return await db.get(Booking, booking_id)
+
+async def get_booking_for_user(db: AsyncSession, booking_id: int, principal: Principal) -> Tuple[Booking, Listing]:
+    """Get a booking and its listing, if ``principal`` is its renter, its host or an admin"""
+    db_booking = await get_booking(db, booking_id)
+    if db_booking is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking not found"
+        )
+    listing = await db.get(Listing, db_booking.listing_id)
+    if not principal.is_admin and not booking_roles(db_booking, listing, principal):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to access this booking"
+        )
+    return db_booking, listing
+
+async def get_bookings(
+    db: AsyncSession, user_id: int, as_host: bool = False, limit: int = 100, cursor: Optional[str] = None
+) -> List[Booking]:
+    """Get a page of a renter's bookings, or with ``as_host`` the bookings of a host's listings"""
+    if as_host:
+        query = select(Booking).join(Listing, Listing.id == Booking.listing_id).where(Listing.host_id == user_id)
+    else:
+        query = select(Booking).where(Booking.renter_id == user_id)
+    if cursor:
+        values = pagination.decode_cursor(cursor, "id", [int])
+        query = query.where(pagination.keyset_filter([Booking.id], values))
+    result = await db.execute(query.order_by(Booking.id).limit(limit))
+    return result.scalars().all()
+
+def next_bookings_cursor(bookings: List[Booking], limit: int) -> Optional[str]:
+    """Cursor for the page after ``bookings``, or None on the last page"""
+    return pagination.next_cursor(bookings, limit, "id", ["id"])
+
+async def _get_by_idempotency_key(db: AsyncSession, renter_id: int, idempotency_key: str) -> Optional[Booking]:
+    result = await db.execute(
+        select(Booking).where(Booking.renter_id == renter_id, Booking.idempotency_key == idempotency_key)
+    )
+    return result.scalars().first()
+
+def _check_replay(db_booking: Booking, booking: BookingCreate) -> Booking:
+    if (db_booking.listing_id, db_booking.start_date, db_booking.end_date) != (
+        booking.listing_id, booking.start_date, booking.end_date
+    ):
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different booking"
+        )
+    return db_booking
+
+async def create_booking(
+    db: AsyncSession, booking: BookingCreate, renter_id: int, idempotency_key: Optional[str] = None
+) -> Tuple[Booking, bool]:
+    """
+    Create a pending booking, or return the one an earlier request with the same
+    idempotency key created. Returns the booking and whether it was created now.
+    Overlaps are rejected by the database's exclusion constraint, so concurrent
+    requests for the same dates cannot both succeed.
+    """
+    if idempotency_key:
+        db_booking = await _get_by_idempotency_key(db, renter_id, idempotency_key)
+        if db_booking is not None:
+            return _check_replay(db_booking, booking), False
+
+    listing = await db.get(Listing, booking.listing_id)
+    if listing is None or not listing.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Listing not found"
+        )
+    if listing.host_id == renter_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Hosts cannot book their own listings"
+        )
+    check_offered(listing, booking.start_date, booking.end_date)
+
+    quote = pricing.quote(listing.price_per_month, booking.start_date, booking.end_date)
+    db_booking = Booking(
+        listing_id=booking.listing_id,
+        renter_id=renter_id,
+        start_date=booking.start_date,
+        end_date=booking.end_date,
+        total_price=quote.total_price,
+        platform_fee=quote.platform_fee,
+        status="pending",
+        payment_status="pending",
+        idempotency_key=idempotency_key,
+    )
+    db.add(db_booking)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if _error_code(e) == EXCLUSION_VIOLATION:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The listing is already booked for some of these dates"
+            )
+        if _error_code(e) == UNIQUE_VIOLATION and idempotency_key:
+            # A concurrent retry with the same key committed first
+            db_booking = await _get_by_idempotency_key(db, renter_id, idempotency_key)
+            return _check_replay(db_booking, booking), False
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not create booking: {str(e.orig)}"
+        )
+    _invalidate_search()
+    await db.refresh(db_booking)
+    return db_booking, True
+
+async def update_booking(db: AsyncSession, booking_id: int, booking_update: BookingUpdate, principal: Principal) -> Booking:
+    """
+    Update a booking's status, payment status or end date (which reprices it).
+    The write only applies if the status is still the one the change was checked
+    against; when another request changed it first, the booking is re-read and the
+    change checked again, up to BOOKING_UPDATE_MAX_RETRIES times.
+    """
+    values = booking_update.model_dump(exclude_unset=True)
+    for _ in range(settings.BOOKING_UPDATE_MAX_RETRIES + 1):
+        db_booking, listing = await get_booking_for_user(db, booking_id, principal)
+        roles = booking_roles(db_booking, listing, principal)
+        if values.get("status", db_booking.status) != db_booking.status:
+            check_transition(db_booking.status, values["status"], roles, principal.is_admin)
+        if "payment_status" in values and not principal.is_admin and HOST not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only the host can change the payment status"
+            )
+        if values.get("end_date") is not None and values["end_date"] <= db_booking.start_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="end_date must be after start_date"
+            )
+        if "end_date" in values:
+            check_offered(listing, db_booking.start_date, values["end_date"])
+        changes = dict(values)
+        if "end_date" in values:
+            quote = pricing.quote(listing.price_per_month, db_booking.start_date, values["end_date"])
+            changes.update(total_price=quote.total_price, platform_fee=quote.platform_fee)
+
+        try:
+            result = await db.execute(
+                update(Booking)
+                .where(Booking.id == booking_id, Booking.status == db_booking.status)
+                .values(**changes)
+                .returning(Booking.id)
+            )
+            updated = result.scalar() is not None
+            if updated:
+                await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if _error_code(e) == EXCLUSION_VIOLATION:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="The listing is already booked for some of these dates"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not update booking: {str(e.orig)}"
+            )
+        if updated:
+            was_blocking = db_booking.status in BLOCKING_BOOKING_STATUSES
+            if "end_date" in values or was_blocking != (values.get("status", db_booking.status) in BLOCKING_BOOKING_STATUSES):
+                _invalidate_search()
+            await db.refresh(db_booking)
+            return db_booking
+        # The status changed since it was read; rollback expires the stale booking
+        await db.rollback()
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="The booking kept changing while it was being updated; try again"
+    )
@@ -1,92 +1,548 @@
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy import or_, func, asc, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy import (
+    String, Text, and_, or_, case, cast, func, asc, desc, bindparam, insert, literal_column, select, true, tuple_
+)
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION
 from fastapi import HTTPException, status
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from datetime import date, datetime
+import math
 
-from app.models.models import Listing
+from app.core import geo, locations
+from app.core.cache import search_cache, facets_cache
+from app.core.location_index import location_index
+from app.crud import pagination
+from app.models.models import Booking, Listing
 from app.schemas.listings import ListingCreate, ListingUpdate, ListingFilters
 
-def get_listing(db: Session, listing_id: int) -> Optional[Listing]:
+async def get_listing(db: AsyncSession, listing_id: int) -> Optional[Listing]:
     """Get a listing by ID"""
-    return db.query(Listing).filter(Listing.id == listing_id).first()
+    return await db.get(Listing, listing_id)
 
-def get_listings_by_host(db: Session, host_id: int) -> List[Listing]:
-    """Get all listings by a specific host"""
-    return db.query(Listing).filter(Listing.host_id == host_id).all()
+async def get_location_counts(db: AsyncSession) -> List[tuple]:
+    """Active listing counts per distinct (city, state, zip_code)"""
+    result = await db.execute(
+        select(Listing.city, Listing.state, Listing.zip_code, func.count(Listing.id))
+        .where(Listing.is_active == True)
+        .group_by(Listing.city, Listing.state, Listing.zip_code)
+    )
+    return result.all()
 
-def get_listings(db: Session, filters: Optional[ListingFilters] = None, skip: int = 0, limit: int = 100) -> List[Listing]:
-    """Get listings with optional filters"""
-    query = db.query(Listing).filter(Listing.is_active == True)
+# Columns included in exports; the derived search columns are left out
+LISTING_EXPORT_COLUMNS = [
+    column for column in Listing.__table__.columns
+    if column.key not in ("geo_cell", "location_key", "search_vector")
+]
+
+def stream_listings(db: AsyncSession, after_id: int = 0, batch_size: int = 1000):
+    """Yield every listing as batches of row mappings, ordered by id, after ``after_id``"""
+    return pagination.stream_rows(db, LISTING_EXPORT_COLUMNS, Listing.id, after_id, batch_size)
+
+async def get_listings_by_host(db: AsyncSession, host_id: int, limit: int = 100, cursor: Optional[str] = None) -> List[Listing]:
+    """Get a page of listings by a specific host"""
+    query = select(Listing).where(Listing.host_id == host_id)
+    if cursor:
+        values = pagination.decode_cursor(cursor, "id", [int])
+        query = query.where(pagination.keyset_filter([Listing.id], values))
+    result = await db.execute(query.order_by(asc(Listing.id)).limit(limit))
+    return result.scalars().all()
+
+# Sort orders as (sort key attributes, descending). Every key ends with id so the
+# order is total and keyset seeks stay stable while new listings are inserted.
+LISTING_SORTS = {
+    "id": (["id"], False),
+    "newest": (["created_at", "id"], True),
+    "price_asc": (["price_per_month", "id"], False),
+    "price_desc": (["price_per_month", "id"], True),
+    "distance": (["distance", "id"], False),
+    "location_match": (["location_rank", "id"], False),
+    "relevance": (["relevance", "id"], True),
+}
+
+# Types of the sort key values a cursor may carry
+LISTING_SORT_KEY_TYPES = {
+    "id": int,
+    "created_at": datetime,
+    "price_per_month": int,
+    "distance": float,
+    "location_rank": int,
+    "relevance": float,
+}
+
+# Text search configuration, typed so the driver never has to guess the overload
+TEXT_SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+# Columns behind the search results grid (ListingSummary)
+LISTING_SUMMARY_COLUMNS = [
+    Listing.id,
+    Listing.title,
+    Listing.price_per_month,
+    Listing.size,
+    Listing.city,
+    Listing.state,
+    Listing.space_type,
+    Listing.images[1].label("image"),
+]
+LISTING_SUMMARY_COLUMN_NAMES = {column.key for column in LISTING_SUMMARY_COLUMNS}
+
+def _is_proximity_search(filters: Optional[ListingFilters]) -> bool:
+    return filters is not None and None not in (filters.latitude, filters.longitude, filters.radius)
+
+def _is_location_text_search(filters: Optional[ListingFilters]) -> bool:
+    return bool(filters and filters.location) and locations.classify(filters.location) == locations.QUERY_TEXT
+
+def _computed_keys(filters: Optional[ListingFilters]) -> List[str]:
+    """Computed (non-column) sort keys available for a search"""
+    keys = []
+    if filters is not None and filters.q:
+        keys.append("relevance")
+    if _is_proximity_search(filters):
+        keys.append("distance")
+    if _is_location_text_search(filters):
+        keys.append("location_rank")
+    return keys
+
+def resolve_sort(filters: Optional[ListingFilters], sort: Optional[str] = None) -> str:
+    """Get the effective sort order for a search"""
+    computed_keys = _computed_keys(filters)
+    if sort is None:
+        if "relevance" in computed_keys:
+            return "relevance"
+        if "distance" in computed_keys:
+            return "distance"
+        if "location_rank" in computed_keys:
+            return "location_match"
+        return "id"
+    if sort not in LISTING_SORTS or any(
+        not hasattr(Listing, key) and key not in computed_keys for key in LISTING_SORTS[sort][0]
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Sort must be one of {list(LISTING_SORTS)} (distance requires latitude, "
+                "longitude and radius; location_match requires a location; relevance requires q)"
+            )
+        )
+    return sort
+
+def next_listings_cursor(listings: List[Listing], limit: int, sort: str) -> Optional[str]:
+    """Cursor for the page after ``listings``, or None on the last page"""
+    keys, _ = LISTING_SORTS[sort]
+    return pagination.next_cursor(listings, limit, sort, keys)
+
+# Bookings that hold a listing's dates
+BLOCKING_BOOKING_STATUSES = ("pending", "confirmed")
+
+def _availability_filter(start: Optional[date], end: Optional[date]):
+    """Listings open for the whole of [start, end) with no blocking booking overlapping it"""
+    if start is None or end is None or end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="available_start and available_end must be given together, with available_end after available_start"
+        )
+    start = datetime.combine(start, datetime.min.time())
+    end = datetime.combine(end, datetime.min.time())
+    # Statuses are inlined rather than bound so the planner can match the
+    # partial index on active bookings in generic (prepared) plans too
+    statuses = bindparam("blocking_statuses", BLOCKING_BOOKING_STATUSES, expanding=True, literal_execute=True)
+    # An anti-join that probes ix_bookings_listing_id_start_date_active per
+    # candidate listing; an open-ended booking (no end_date) blocks every later date
+    overlapping = select(Booking.id).where(
+        Booking.listing_id == Listing.id,
+        Booking.status.in_(statuses),
+        Booking.start_date < end,
+        or_(Booking.end_date.is_(None), Booking.end_date > start),
+    )
+    return and_(
+        or_(Listing.available_from.is_(None), Listing.available_from <= start),
+        or_(Listing.available_to.is_(None), Listing.available_to >= end),
+        ~overlapping.exists(),
+    )
+
+def _filtered_query(filters: Optional[ListingFilters]):
+    """Build the filtered listings select and the computed columns it can sort by"""
+    query = select(Listing).where(Listing.is_active == True)
+    computed = {}
     
     if filters:
+        # Full-text search, served by the GIN index on search_vector
+        if filters.q:
+            ts_query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, filters.q)
+            query = query.where(Listing.search_vector.op("@@")(ts_query))
+            # ts_rank_cd returns real; compare as double so cursor values round-trip exactly
+            computed["relevance"] = cast(func.ts_rank_cd(Listing.search_vector, ts_query), DOUBLE_PRECISION)
+        
         # Location filter (city, state, or zip)
         if filters.location:
-            query = query.filter(
-                or_(
-                    Listing.city.ilike(f"%{filters.location}%"),
-                    Listing.state.ilike(f"%{filters.location}%"),
-                    Listing.zip_code.ilike(f"%{filters.location}%")
-                )
-            )
+            query = query.where(_location_filter(filters.location))
+            if _is_location_text_search(filters):
+                computed["location_rank"] = _location_rank(filters.location)
         
         # Space type filter
         if filters.space_type:
-            query = query.filter(Listing.space_type == filters.space_type)
+            query = query.where(Listing.space_type == filters.space_type)
         
         # Price range filters
         if filters.min_price is not None:
-            query = query.filter(Listing.price_per_month >= filters.min_price)
+            query = query.where(Listing.price_per_month >= filters.min_price)
         if filters.max_price is not None:
-            query = query.filter(Listing.price_per_month <= filters.max_price)
+            query = query.where(Listing.price_per_month <= filters.max_price)
         
         # Size range filters
         if filters.min_size is not None:
-            query = query.filter(Listing.size >= filters.min_size)
+            query = query.where(Listing.size >= filters.min_size)
         if filters.max_size is not None:
-            query = query.filter(Listing.size <= filters.max_size)
+            query = query.where(Listing.size <= filters.max_size)
         
         # Proximity search (if latitude, longitude, and radius are provided)
-        if all([filters.latitude, filters.longitude, filters.radius]):
-            # Calculate distance in miles (approximate)
-            # Using Haversine formula via SQL
-            earth_radius_miles = 3959  # Earth radius in miles
-            distance = (
-                earth_radius_miles * 
-                func.acos(
-                    func.cos(func.radians(filters.latitude)) * 
-                    func.cos(func.radians(Listing.latitude)) * 
-                    func.cos(func.radians(Listing.longitude) - func.radians(filters.longitude)) + 
-                    func.sin(func.radians(filters.latitude)) * 
-                    func.sin(func.radians(Listing.latitude))
-                )
+        if _is_proximity_search(filters):
+            distance = _distance_expression(filters.latitude, filters.longitude)
+            # Narrow candidates with the (geo_cell, longitude) index first so the
+            # exact distance is only computed for rows inside the bounding box
+            query = query.where(
+                _bounding_box_filter(filters.latitude, filters.longitude, filters.radius)
             )
-            query = query.filter(distance <= filters.radius)
-            # Sort by distance
-            query = query.order_by(asc(distance))
+            query = query.where(distance <= filters.radius)
+            computed["distance"] = distance
+        
+        # Date-range availability
+        if filters.available_start is not None or filters.available_end is not None:
+            query = query.where(_availability_filter(filters.available_start, filters.available_end))
+    
+    return query, computed
+
+async def get_listings(
+    db: AsyncSession,
+    filters: Optional[ListingFilters] = None,
+    skip: int = 0,
+    limit: int = 100,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    summary: bool = False,
+) -> List[Listing]:
+    """
+    Get listings with optional filters, sorted and paged by offset or cursor.
+    With ``summary`` only the summary columns are selected and plain rows are
+    returned instead of ORM instances.
+    """
+    query, computed = _filtered_query(filters)
+    sort = resolve_sort(filters, sort)
+    keys, descending = LISTING_SORTS[sort]
+    sort_columns = [computed[key] if key in computed else getattr(Listing, key) for key in keys]
+    
+    if summary:
+        # Rows also carry the sort keys so the next cursor can be built from them
+        columns = LISTING_SUMMARY_COLUMNS + [
+            getattr(Listing, key) for key in keys
+            if key not in computed and key not in LISTING_SUMMARY_COLUMN_NAMES
+        ]
+        query = query.with_only_columns(*columns)
+    
+    # Computed values are returned alongside each row and set on the listing
+    computed_names = list(computed)
+    query = query.add_columns(*[computed[name].label(name) for name in computed_names])
+    
+    values = pagination.decode_cursor(cursor, sort, [LISTING_SORT_KEY_TYPES[key] for key in keys]) if cursor else None
+    
+    if sort == "location_match" and not skip:
+        results = await _location_tier_results(db, query, filters.location, limit, values)
+    else:
+        # Seek past the previous page instead of scanning over it with OFFSET
+        if values:
+            query = query.where(pagination.keyset_filter(sort_columns, values, descending))
+        query = query.order_by(*[desc(column) if descending else asc(column) for column in sort_columns])
+        
+        # Apply pagination
+        results = (await db.execute(query.offset(skip).limit(limit))).all()
+    
+    if summary:
+        return results
+    if not computed_names:
+        return [row[0] for row in results]
     
-    # Apply pagination
-    return query.offset(skip).limit(limit).all()
+    listings = []
+    for db_listing, *computed_values in results:
+        for name, value in zip(computed_names, computed_values):
+            setattr(db_listing, name, value)
+        listings.append(db_listing)
+    return listings
 
-def create_listing(db: Session, listing: ListingCreate, host_id: int) -> Listing:
+async def _location_tier_results(db: AsyncSession, query, location: str, limit: int, values: Optional[list]):
+    """
+    Fetch location matches one rank tier at a time, each ordered by id.
+    Sorting all matches by a computed rank would visit every match; per tier
+    Postgres can walk the id index and stop as soon as the page is full.
+    """
+    start_rank, after_id = values if values else (0, None)
+    results = []
+    for rank, tier_filter in enumerate(_location_tiers(location)):
+        if rank < start_rank:
+            continue
+        tier_query = query.where(tier_filter)
+        if rank == start_rank and after_id is not None:
+            tier_query = tier_query.where(Listing.id > after_id)
+        tier_results = await db.execute(tier_query.order_by(asc(Listing.id)).limit(limit - len(results)))
+        results.extend(tier_results.all())
+        if len(results) >= limit:
+            break
+    return results
+
+async def estimate_listings_count(db: AsyncSession, filters: Optional[ListingFilters] = None) -> int:
+    """Estimated number of listings matching the filters, from planner statistics"""
+    query, _ = _filtered_query(filters)
+    return await pagination.estimate_count(db, query)
+
+# Lower bounds of the facet buckets after the first; the first bucket starts at 0
+PRICE_FACET_BOUNDS = [5000, 10000, 20000, 50000]  # in cents
+SIZE_FACET_BOUNDS = [25, 50, 100, 200, 500]  # in square feet
+
+# Filters each facet leaves out of its own counts, so the sidebar keeps offering
+# the other values of a facet the search is already narrowed by
+FACET_OWN_FILTERS = {
+    "space_type": ["space_type"],
+    "price": ["min_price", "max_price"],
+    "size": ["min_size", "max_size"],
+    "access_type": [],
+}
+
+def _facet_filter_conditions(filters: Optional[ListingFilters]) -> dict:
+    """The SQL condition of each facet's own filters (true when unset)"""
+    conditions = {name: [] for name in FACET_OWN_FILTERS}
+    if filters is not None:
+        if filters.space_type:
+            conditions["space_type"].append(Listing.space_type == filters.space_type)
+        if filters.min_price is not None:
+            conditions["price"].append(Listing.price_per_month >= filters.min_price)
+        if filters.max_price is not None:
+            conditions["price"].append(Listing.price_per_month <= filters.max_price)
+        if filters.min_size is not None:
+            conditions["size"].append(Listing.size >= filters.min_size)
+        if filters.max_size is not None:
+            conditions["size"].append(Listing.size <= filters.max_size)
+    return {name: and_(true(), *clauses) for name, clauses in conditions.items()}
+
+async def get_listing_facets(db: AsyncSession, filters: Optional[ListingFilters] = None) -> dict:
+    """
+    Count matching listings per space type, price bucket, size bucket and access type.
+    Each facet is counted under every filter except its own; the total under all of them.
+    """
+    facet_names = list(FACET_OWN_FILTERS)
+    own_filters = [field for fields in FACET_OWN_FILTERS.values() for field in fields]
+    base_filters = filters.model_copy(update=dict.fromkeys(own_filters)) if filters is not None else None
+    query, _ = _filtered_query(base_filters)
+    conditions = _facet_filter_conditions(filters)
+    dimensions = [
+        Listing.space_type,
+        _bucket(Listing.price_per_month, PRICE_FACET_BOUNDS),
+        _bucket(Listing.size, SIZE_FACET_BOUNDS),
+        Listing.access_type,
+    ]
+    # The other facets' filters are applied per count, so one pass still serves every facet
+    counts_columns = [
+        func.count().filter(and_(*[condition for other, condition in conditions.items() if other != name]))
+        for name in facet_names
+    ] + [func.count().filter(and_(*conditions.values()))]
+    # One pass over the matches: a grouping set per facet plus () for the total.
+    # grouping() has a bit set for every dimension not grouped on in that row.
+    result = await db.execute(
+        query.with_only_columns(*dimensions, func.grouping(*dimensions), *counts_columns)
+        .group_by(func.grouping_sets(*dimensions, tuple_()))
+    )
+    rows = result.all()
+    
+    all_bits = (1 << len(dimensions)) - 1
+    counts = {name: {} for name in facet_names}
+    total = 0
+    for row in rows:
+        values, grouping, facet_counts = row[:len(dimensions)], row[len(dimensions)], row[len(dimensions) + 1:]
+        if grouping == all_bits:
+            total = facet_counts[-1]
+            continue
+        for position, name in enumerate(facet_names):
+            if grouping == all_bits ^ (1 << (len(dimensions) - 1 - position)):
+                counts[name][values[position]] = facet_counts[position]
+    
+    return {
+        "total": total,
+        "space_type": _value_facet(counts["space_type"]),
+        "price": _range_facet(counts["price"], PRICE_FACET_BOUNDS),
+        "size": _range_facet(counts["size"], SIZE_FACET_BOUNDS),
+        "access_type": _value_facet(counts["access_type"]),
+    }
+
+def _bucket(column, bounds: List[int]):
+    """Index of the facet bucket a value falls in"""
+    return case(*[(column < bound, index) for index, bound in enumerate(bounds)], else_=len(bounds))
+
+def _value_facet(counts: dict) -> List[dict]:
+    return [
+        {"value": value, "count": count}
+        for value, count in sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+        if value is not None and count
+    ]
+
+def _range_facet(counts: dict, bounds: List[int]) -> List[dict]:
+    """Buckets as inclusive min/max ranges that can be passed straight back as filters"""
+    lower_bounds = [0] + bounds
+    return [
+        {
+            "min": lower,
+            "max": lower_bounds[index + 1] - 1 if index + 1 < len(lower_bounds) else None,
+            "count": counts.get(index, 0),
+        }
+        for index, lower in enumerate(lower_bounds)
+    ]
+
+def _location_filter(location: str):
+    """Match a normalized location query against city, state and zip code"""
+    kind = locations.classify(location)
+    # Zip and state codes short-circuit to indexed equality lookups
+    if kind == locations.QUERY_ZIP:
+        return Listing.zip_code == location
+    if kind == locations.QUERY_STATE:
+        return func.lower(Listing.state).in_([location, locations.US_STATES[location]])
+    # Substring match on location_key, served by the pg_trgm index
+    return Listing.location_key.like(f"%{locations.escape_like(location)}%", escape="\\")
+
+def _location_tiers(location: str):
+    """Predicates for exact city/state/zip, prefix and substring matches (rank 0, 1, 2)"""
+    exact = or_(
+        func.lower(Listing.city) == location,
+        func.lower(Listing.state) == location,
+        Listing.zip_code == location,
+    )
+    prefix = Listing.location_key.like(f"{locations.escape_like(location)}%", escape="\\")
+    return [exact, and_(prefix, ~exact), and_(~prefix, ~exact)]
+
+def _location_rank(location: str):
+    """Rank location matches: 0 exact city/state/zip, 1 prefix, 2 substring"""
+    exact, prefix, _ = _location_tiers(location)
+    return case((exact, 0), (prefix, 1), else_=2)
+
+def _distance_expression(latitude: float, longitude: float):
+    """SQL expression for the great-circle distance (in miles) from a point to each listing"""
+    lat_rad = math.radians(latitude)
+    cos_angle = (
+        math.cos(lat_rad) *
+        func.cos(func.radians(Listing.latitude)) *
+        func.cos(func.radians(Listing.longitude) - math.radians(longitude)) +
+        math.sin(lat_rad) *
+        func.sin(func.radians(Listing.latitude))
+    )
+    # Clamp so rounding error can't push acos outside its domain for identical points
+    return geo.EARTH_RADIUS_MILES * func.acos(func.least(1.0, func.greatest(-1.0, cos_angle)))
+
+def _bounding_box_filter(latitude: float, longitude: float, radius: float):
+    """Index-friendly bounding box predicate enclosing the search radius"""
+    min_lat, max_lat, lon_ranges = geo.bounding_box(latitude, longitude, radius)
+    return and_(
+        Listing.geo_cell.in_(geo.cells_between(min_lat, max_lat)),
+        Listing.latitude.between(min_lat, max_lat),
+        or_(*[Listing.longitude.between(min_lon, max_lon) for min_lon, max_lon in lon_ranges]),
+    )
+
+def _search_vector(title, description, features):
+    """
+    Weighted tsvector of the listing text (must match the migration backfill).
+    Arguments may be plain values or SQL expressions such as bind parameters.
+    """
+    def weighted(text, weight: str):
+        # Inlined: setweight() takes a "char", which a varchar bind parameter doesn't cast to
+        return func.setweight(
+            func.to_tsvector(TEXT_SEARCH_CONFIG, func.coalesce(text, "")), literal_column(f"'{weight}'")
+        )
+    return (
+        weighted(title, "A")
+        .op("||")(weighted(func.array_to_string(cast(features, ARRAY(String)), " "), "B"))
+        .op("||")(weighted(description, "C"))
+    )
+
+def _set_derived_fields(db_listing: Listing) -> None:
+    """Keep the precomputed search columns in sync with the listing data"""
+    db_listing.geo_cell = geo.geo_cell(db_listing.latitude)
+    db_listing.location_key = locations.location_key(db_listing.city, db_listing.state, db_listing.zip_code)
+    db_listing.search_vector = _search_vector(db_listing.title, db_listing.description, db_listing.features)
+
+# Multi-row insert for bulk imports. The search document is built per row from
+# separate copies of the text columns; insert parameters can't be reused in SQL.
+_bulk_insert = insert(Listing).values(
+    search_vector=_search_vector(
+        bindparam("search_title", type_=String),
+        bindparam("search_description", type_=Text),
+        bindparam("search_features", type_=ARRAY(String)),
+    )
+)
+
+async def bulk_create_listings(
+    db: AsyncSession, listings: List[ListingCreate], host_id: int
+) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Insert a batch of listings in a single multi-row statement and commit.
+    If the database rejects the batch, its rows are inserted one at a time so
+    that only the offending ones fail. Returns the number created and the
+    (index in ``listings``, error) of each row that failed.
+    """
+    rows = []
+    for listing in listings:
+        row = listing.model_dump()
+        row.update(
+            host_id=host_id,
+            geo_cell=geo.geo_cell(listing.latitude),
+            location_key=locations.location_key(listing.city, listing.state, listing.zip_code),
+            search_title=listing.title,
+            search_description=listing.description,
+            search_features=listing.features,
+        )
+        rows.append(row)
+    
+    failed = {}
+    try:
+        await db.execute(_bulk_insert, rows)
+        await db.commit()
+    except DBAPIError:
+        await db.rollback()
+        for index, row in enumerate(rows):
+            try:
+                async with db.begin_nested():
+                    await db.execute(_bulk_insert, [row])
+            except DBAPIError as e:
+                failed[index] = f"Could not create listing: {str(e.orig)}"
+        await db.commit()
+    
+    created = len(rows) - len(failed)
+    if created:
+        search_cache.invalidate()
+        facets_cache.invalidate()
+    for index, listing in enumerate(listings):
+        if listing.is_active and index not in failed:
+            location_index.add_location(listing.city, listing.state, listing.zip_code)
+    return created, sorted(failed.items())
+
+async def create_listing(db: AsyncSession, listing: ListingCreate, host_id: int) -> Listing:
     """Create a new listing"""
     db_listing = Listing(**listing.model_dump(), host_id=host_id)
+    _set_derived_fields(db_listing)
     
     try:
         db.add(db_listing)
-        db.commit()
-        db.refresh(db_listing)
+        await db.commit()
+        search_cache.invalidate()
+        facets_cache.invalidate()
+        if db_listing.is_active:
+            location_index.add_location(db_listing.city, db_listing.state, db_listing.zip_code)
+        await db.refresh(db_listing)
         return db_listing
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Could not create listing: {str(e)}"
         )
 
-def update_listing(db: Session, listing_id: int, listing_update: ListingUpdate, user_id: int) -> Listing:
+async def update_listing(db: AsyncSession, listing_id: int, listing_update: ListingUpdate, user_id: int) -> Listing:
     """Update a listing"""
-    db_listing = get_listing(db, listing_id)
+    db_listing = await get_listing(db, listing_id)
     if db_listing is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -102,24 +558,34 @@ def update_listing(db: Session, listing_id: int, listing_update: ListingUpdate,
         )
     
     # Update listing data
+    old_location = (db_listing.city, db_listing.state, db_listing.zip_code)
+    was_active = db_listing.is_active
     update_data = listing_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_listing, key, value)
+    _set_derived_fields(db_listing)
+    new_location = (db_listing.city, db_listing.state, db_listing.zip_code)
     
     try:
-        db.commit()
-        db.refresh(db_listing)
+        await db.commit()
+        search_cache.invalidate()
+        facets_cache.invalidate()
+        if was_active and (old_location != new_location or not db_listing.is_active):
+            location_index.add_location(*old_location, delta=-1)
+        if db_listing.is_active and (old_location != new_location or not was_active):
+            location_index.add_location(*new_location)
+        await db.refresh(db_listing)
         return db_listing
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Could not update listing: {str(e)}"
         )
 
-def delete_listing(db: Session, listing_id: int, user_id: int) -> bool:
+async def delete_listing(db: AsyncSession, listing_id: int, user_id: int) -> bool:
     """Delete a listing"""
-    db_listing = get_listing(db, listing_id)
+    db_listing = await get_listing(db, listing_id)
     if db_listing is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -134,12 +600,19 @@ def delete_listing(db: Session, listing_id: int, user_id: int) -> bool:
             detail="Not authorized to delete this listing"
         )
     
+    was_active = db_listing.is_active
+    location = (db_listing.city, db_listing.state, db_listing.zip_code)
+    
     try:
-        db.delete(db_listing)
-        db.commit()
+        await db.delete(db_listing)
+        await db.commit()
+        search_cache.invalidate()
+        facets_cache.invalidate()
+        if was_active:
+            location_index.add_location(*location, delta=-1)
         return True
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting listing: {str(e)}"
@@ -0,0 +1,236 @@
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException, status
+from typing import List, Optional
+
+from app.core.realtime import message_hub
+from app.crud import pagination
+from app.models.models import Booking, Conversation, Listing, Message, User
+from app.schemas.messages import ConversationGroup, MessageCreate, MessageResponse
+
+# Rebuilds every inbox row from the messages table, for backfills and seeded data
+REBUILD_CONVERSATIONS_SQL = text("""
+    INSERT INTO conversations (user_id, other_user_id, last_message_id, unread_count)
+    SELECT p.user_id, p.other_user_id, max(m.id),
+           count(*) FILTER (WHERE m.receiver_id = p.user_id AND m.sender_id <> p.user_id AND NOT coalesce(m.is_read, false))
+    FROM messages m
+    CROSS JOIN LATERAL (VALUES (m.sender_id, m.receiver_id), (m.receiver_id, m.sender_id)) AS p (user_id, other_user_id)
+    GROUP BY p.user_id, p.other_user_id
+    ON CONFLICT (user_id, other_user_id) DO UPDATE
+    SET last_message_id = excluded.last_message_id, unread_count = excluded.unread_count
+""")
+
+def conversation_key(user_id: int, other_user_id: int) -> str:
+    """Key shared by the messages between two users, whichever of them sent them"""
+    low, high = sorted((user_id, other_user_id))
+    return f"{low}:{high}"
+
+async def get_message(db: AsyncSession, message_id: int) -> Optional[Message]:
+    """Get a message by ID"""
+    return await db.get(Message, message_id)
+
+def _conversations_upsert(message: Message):
+    rows = [
+        {"user_id": message.sender_id, "other_user_id": message.receiver_id, "last_message_id": message.id, "unread_count": 0},
+        {"user_id": message.receiver_id, "other_user_id": message.sender_id, "last_message_id": message.id, "unread_count": 1},
+    ]
+    # Both rows in one statement, locked in user id order, so two users messaging
+    # each other at once cannot deadlock; concurrent sends may also commit out of
+    # order, so keep the newest message either way
+    statement = insert(Conversation).values(sorted(rows, key=lambda row: row["user_id"]))
+    return statement.on_conflict_do_update(
+        constraint="uq_conversations_user_id_other_user_id",
+        set_={
+            "last_message_id": func.greatest(Conversation.last_message_id, statement.excluded.last_message_id),
+            "unread_count": Conversation.unread_count + statement.excluded.unread_count,
+        },
+    )
+
+async def _check_attachments(db: AsyncSession, message: MessageCreate, sender_id: int) -> None:
+    """Raise unless the listing and booking a message refers to exist and concern both of its users"""
+    participants = {sender_id, message.receiver_id}
+    if message.listing_id is not None:
+        listing = await db.get(Listing, message.listing_id)
+        if listing is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Listing not found"
+            )
+        if listing.host_id not in participants:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Messages about a listing must be to or from its host"
+            )
+    if message.booking_id is not None:
+        booking = await db.get(Booking, message.booking_id)
+        if booking is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Booking not found"
+            )
+        host_id = await db.scalar(select(Listing.host_id).where(Listing.id == booking.listing_id))
+        if participants != {booking.renter_id, host_id}:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Messages about a booking must be between its renter and host"
+            )
+        if message.listing_id is not None and message.listing_id != booking.listing_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The booking is not for this listing"
+            )
+
+async def create_message(db: AsyncSession, message: MessageCreate, sender_id: int) -> Message:
+    """Send a message and update both participants' inbox rows in the same transaction"""
+    if await db.get(User, message.receiver_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Receiver not found"
+        )
+    if message.receiver_id == sender_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot send a message to yourself"
+        )
+
+    await _check_attachments(db, message, sender_id)
+
+    db_message = Message(
+        **message.model_dump(exclude={"is_read"}),
+        sender_id=sender_id,
+        is_read=False,
+        conversation_key=conversation_key(sender_id, message.receiver_id),
+    )
+    db.add(db_message)
+    try:
+        await db.flush()
+        await db.execute(_conversations_upsert(db_message))
+        await db.commit()
+    except IntegrityError as e:
+        # The listing or booking was deleted after it was checked
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not send message: {str(e.orig)}"
+        )
+    await db.refresh(db_message)
+    await message_hub.publish(
+        [sender_id, message.receiver_id],
+        {"type": "message", "message": MessageResponse.model_validate(db_message).model_dump(mode="json")},
+    )
+    return db_message
+
+async def get_conversations(db: AsyncSession, user_id: int, limit: int = 20, cursor: Optional[str] = None) -> List[ConversationGroup]:
+    """Get a page of a user's inbox, most recent conversation first"""
+    query = (
+        select(Conversation, User, Message)
+        .join(User, User.id == Conversation.other_user_id)
+        .join(Message, Message.id == Conversation.last_message_id)
+        .where(Conversation.user_id == user_id)
+    )
+    if cursor:
+        values = pagination.decode_cursor(cursor, "recent", [int])
+        query = query.where(pagination.keyset_filter([Conversation.last_message_id], values, descending=True))
+    result = await db.execute(query.order_by(Conversation.last_message_id.desc()).limit(limit))
+    return [
+        ConversationGroup(
+            other_user_id=other_user.id,
+            other_user_name=other_user.full_name or other_user.username,
+            other_user_avatar=other_user.avatar,
+            last_message=MessageResponse.model_validate(last_message),
+            unread_count=conversation.unread_count,
+        )
+        for conversation, other_user, last_message in result.all()
+    ]
+
+def next_conversations_cursor(conversations: List[ConversationGroup], limit: int) -> Optional[str]:
+    """Cursor for the inbox page after ``conversations``, or None on the last page"""
+    if not conversations or len(conversations) < limit:
+        return None
+    return pagination.encode_cursor("recent", [conversations[-1].last_message.id])
+
+async def get_unread_count(db: AsyncSession, user_id: int) -> int:
+    """Unread messages across all of a user's conversations"""
+    result = await db.execute(
+        select(func.coalesce(func.sum(Conversation.unread_count), 0)).where(Conversation.user_id == user_id)
+    )
+    return int(result.scalar())
+
+async def get_conversation_messages(
+    db: AsyncSession, user_id: int, other_user_id: int, limit: int = 50, cursor: Optional[str] = None
+) -> List[Message]:
+    """Get a page of the messages between two users, newest first"""
+    query = select(Message).where(Message.conversation_key == conversation_key(user_id, other_user_id))
+    if cursor:
+        values = pagination.decode_cursor(cursor, "newest", [int])
+        query = query.where(pagination.keyset_filter([Message.id], values, descending=True))
+    result = await db.execute(query.order_by(Message.id.desc()).limit(limit))
+    return result.scalars().all()
+
+def next_messages_cursor(messages: List[Message], limit: int) -> Optional[str]:
+    """Cursor for the history page after ``messages``, or None on the last page"""
+    return pagination.next_cursor(messages, limit, "newest", ["id"])
+
+async def mark_conversation_read(db: AsyncSession, user_id: int, other_user_id: int) -> int:
+    """Mark every message from ``other_user_id`` to ``user_id`` read; returns how many were unread"""
+    result = await db.execute(
+        update(Message)
+        .where(
+            Message.conversation_key == conversation_key(user_id, other_user_id),
+            Message.receiver_id == user_id,
+            Message.is_read.isnot(True),
+        )
+        .values(is_read=True)
+        .returning(Message.id)
+        .execution_options(synchronize_session=False)
+    )
+    marked = result.scalars().all()
+    # Subtract what was marked rather than resetting, so a message that arrives
+    # while this runs stays counted
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.user_id == user_id, Conversation.other_user_id == other_user_id)
+        .values(unread_count=func.greatest(Conversation.unread_count - len(marked), 0))
+    )
+    await db.commit()
+    if marked:
+        await message_hub.publish(
+            [other_user_id, user_id], {"type": "read", "reader_id": user_id, "up_to_message_id": max(marked)}
+        )
+    return len(marked)
+
+async def mark_message_read(db: AsyncSession, message_id: int, user_id: int) -> Message:
+    """Mark one received message read"""
+    db_message = await get_message(db, message_id)
+    if db_message is None or user_id not in (db_message.sender_id, db_message.receiver_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Message not found"
+        )
+    if db_message.receiver_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the receiver can mark a message read"
+        )
+    # Only the request that flips the flag decrements the counter
+    result = await db.execute(
+        update(Message)
+        .where(Message.id == message_id, Message.is_read.isnot(True))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.user_id == user_id, Conversation.other_user_id == db_message.sender_id)
+            .values(unread_count=func.greatest(Conversation.unread_count - 1, 0))
+        )
+    await db.commit()
+    await db.refresh(db_message)
+    if result.rowcount:
+        await message_hub.publish(
+            [db_message.sender_id, user_id], {"type": "read", "reader_id": user_id, "message_id": message_id}
+        )
+    return db_message
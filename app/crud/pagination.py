@@ -0,0 +1,126 @@
+"""
+Keyset (cursor) pagination helpers shared by the CRUD modules.
+
+A cursor is an opaque, URL-safe token holding the sort order name and the
+sort key values of the last row on the page. The next page is fetched with
+an indexed ``WHERE (k1, k2) > (v1, v2)`` seek instead of ``OFFSET``.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Mapping, Optional, Sequence, Type
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+# Range of the INTEGER columns used as sort keys
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+def _check_value(value: Any, key_type: Type) -> Any:
+    """``value`` as ``key_type``, or ValueError when a cursor key has the wrong type"""
+    if key_type is int:
+        if isinstance(value, bool) or not isinstance(value, int) or not INT32_MIN <= value <= INT32_MAX:
+            raise ValueError(value)
+        return value
+    if key_type is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(value)
+        return float(value)
+    if not isinstance(value, key_type):
+        raise ValueError(value)
+    return value
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Build an opaque cursor from the sort key values of the last row"""
+    payload = json.dumps({"s": sort, "k": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, key_types: Sequence[Type]) -> List[Any]:
+    """
+    Decode a cursor, rejecting tokens that are malformed, from another sort order
+    or whose key values are not of ``key_types`` (int, float or datetime)
+    """
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(v) for v in payload["k"]]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise invalid_cursor
+
+    if payload.get("s") != sort:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pagination cursor does not match the requested sort order"
+        )
+    if len(values) != len(key_types):
+        raise invalid_cursor
+    try:
+        return [_check_value(value, key_type) for value, key_type in zip(values, key_types)]
+    except ValueError:
+        raise invalid_cursor
+
+def keyset_filter(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """Row-value seek predicate for the page after ``values``"""
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
+
+def next_cursor(rows: Sequence[Any], limit: int, sort: str, keys: Sequence[str]) -> Optional[str]:
+    """Cursor for the page after ``rows``, or None when this was the last page"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(sort, [getattr(last, key) for key in keys])
+
+async def stream_rows(
+    db: AsyncSession, columns: Sequence[Any], id_column: Any, after_id: int = 0, batch_size: int = 1000
+) -> AsyncIterator[List[Mapping]]:
+    """
+    Yield batches of rows ordered by ``id_column`` after ``after_id`` through a
+    server-side cursor, ``batch_size`` rows at a time, so memory stays flat for
+    any table size
+    """
+    result = await db.stream(
+        select(*columns)
+        .where(id_column > after_id)
+        .order_by(id_column)
+        .execution_options(yield_per=batch_size)
+    )
+    async for partition in result.mappings().partitions():
+        yield partition
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` wrapper for a select statement"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+async def estimate_count(db: AsyncSession, statement) -> int:
+    """Estimate the row count of a select from planner statistics instead of COUNT(*)"""
+    plan = (await db.execute(Explain(statement.order_by(None)))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,34 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Sequence
+
+from app.core import pricing
+from app.models.models import Listing
+from app.schemas.bookings import QuoteRequest, QuoteResponse
+
+async def get_listing_prices(db: AsyncSession, listing_ids: Sequence[int]) -> Dict[int, int]:
+    """Monthly prices of the active listings among ``listing_ids``"""
+    result = await db.execute(
+        select(Listing.id, Listing.price_per_month)
+        .where(Listing.id.in_(set(listing_ids)), Listing.is_active == True)
+    )
+    return dict(result.all())
+
+async def get_quotes(db: AsyncSession, requests: List[QuoteRequest]) -> List[QuoteResponse]:
+    """Price every stay with one price lookup, in request order"""
+    prices = await get_listing_prices(db, [request.listing_id for request in requests])
+    
+    # Requests for the same dates share their calendar arithmetic
+    by_dates: Dict[tuple, List[int]] = {}
+    for index, request in enumerate(requests):
+        if request.listing_id in prices:
+            by_dates.setdefault((request.start_date, request.end_date), []).append(index)
+    
+    quotes: List[QuoteResponse] = [
+        QuoteResponse(**request.model_dump(), error="Listing not found") for request in requests
+    ]
+    for (start_date, end_date), indexes in by_dates.items():
+        priced = pricing.quote_many([prices[requests[i].listing_id] for i in indexes], start_date, end_date)
+        for index, quote in zip(indexes, priced):
+            quotes[index] = QuoteResponse(**requests[index].model_dump(), **quote._asdict())
+    return quotes
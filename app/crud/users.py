@@ -1,32 +1,57 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from typing import Optional, List
 
+from app.crud import pagination
+from app.core.passwords import password_hasher
+from app.core.principals import principal_cache
 from app.models.models import User
 from app.schemas.users import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
 
-def get_user(db: Session, user_id: int) -> Optional[User]:
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
     """Get a user by ID"""
-    return db.query(User).filter(User.id == user_id).first()
+    return await db.get(User, user_id)
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """Get a user by username"""
-    return db.query(User).filter(User.username == username).first()
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get a user by email"""
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    """Get a list of users"""
-    return db.query(User).offset(skip).limit(limit).all()
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[User]:
+    """Get a page of users ordered by ID, by offset or cursor"""
+    query = select(User)
+    if cursor:
+        values = pagination.decode_cursor(cursor, "id", [int])
+        query = query.where(pagination.keyset_filter([User.id], values))
+    result = await db.execute(query.order_by(User.id).offset(skip).limit(limit))
+    return result.scalars().all()
 
-def create_user(db: Session, user: UserCreate) -> User:
+def next_users_cursor(users: List[User], limit: int) -> Optional[str]:
+    """Cursor for the page after ``users``, or None on the last page"""
+    return pagination.next_cursor(users, limit, "id", ["id"])
+
+async def estimate_users_count(db: AsyncSession) -> int:
+    """Estimated number of users, from planner statistics"""
+    return await pagination.estimate_count(db, select(User))
+
+# Columns included in exports; password hashes never leave the database
+USER_EXPORT_COLUMNS = [column for column in User.__table__.columns if column.key != "hashed_password"]
+
+def stream_users(db: AsyncSession, after_id: int = 0, batch_size: int = 1000):
+    """Yield every user as batches of row mappings, ordered by id, after ``after_id``"""
+    return pagination.stream_rows(db, USER_EXPORT_COLUMNS, User.id, after_id, batch_size)
+
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
     """Create a new user"""
     # Check if username already exists
-    db_user = get_user_by_username(db, username=user.username)
+    db_user = await get_user_by_username(db, username=user.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -34,15 +59,17 @@ def create_user(db: Session, user: UserCreate) -> User:
         )
     
     # Check if email already exists
-    db_user = get_user_by_email(db, email=user.email)
+    db_user = await get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create the user
-    hashed_password = get_password_hash(user.password)
+    # Create the user. Ending the read transaction first returns the
+    # connection to the pool instead of holding it while bcrypt runs.
+    await db.commit()
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -56,20 +83,20 @@ def create_user(db: Session, user: UserCreate) -> User:
     
     try:
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         return db_user
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Could not create user: {str(e)}"
         )
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate) -> User:
+async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate) -> User:
     """Update a user's information"""
     # Get the user
-    db_user = get_user(db, user_id)
+    db_user = await get_user(db, user_id)
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,12 +108,13 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> User:
     
     # Handle password change separately
     if 'password' in update_data:
-        hashed_password = get_password_hash(update_data.pop('password'))
+        await db.commit()  # don't hold the pooled connection while bcrypt runs
+        hashed_password = await password_hasher.hash(update_data.pop('password'))
         setattr(db_user, 'hashed_password', hashed_password)
     
     # Handle email change (check if new email already exists)
     if 'email' in update_data and update_data['email'] != db_user.email:
-        existing_user = get_user_by_email(db, update_data['email'])
+        existing_user = await get_user_by_email(db, update_data['email'])
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -97,21 +125,23 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> User:
         setattr(db_user, key, value)
     
     try:
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        principal_cache.invalidate(user_id)
+        await db.refresh(db_user)
         return db_user
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Could not update user: {str(e)}"
         )
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """Authenticate a user by username and password"""
-    user = get_user_by_username(db, username)
+    user = await get_user_by_username(db, username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    await db.commit()  # don't hold the pooled connection while bcrypt runs
+    if not await password_hasher.verify(password, user.hashed_password):
         return None
     return user
\ No newline at end of file
@@ -1,25 +1,90 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.pool_metrics import InstrumentedAsyncQueuePool, instrument_pool
+from app.db.query_metrics import instrument_queries
+from app.db.replicas import CONNECTION_ERRORS, ReplicaSet
 
-# Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL)
+def async_database_url(url: str) -> str:
+    """The DATABASE_URL with its driver switched to asyncpg"""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+def _server_settings() -> dict:
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        return {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    return {}
+
+# Pool settings shared by the primary and replica engines
+ENGINE_OPTIONS = dict(
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={"server_settings": _server_settings()},
+)
+
+# Async engine used by the application
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL), pool_logging_name="primary", **ENGINE_OPTIONS
+)
+instrument_pool(async_engine.sync_engine)
+instrument_queries(async_engine.sync_engine)
+
+# Read replicas for read-only endpoints (empty: everything uses the primary)
+replica_set = ReplicaSet.from_urls(
+    [async_database_url(url) for url in settings.DATABASE_REPLICA_URLS],
+    settings.DB_REPLICA_STRATEGY,
+    ENGINE_OPTIONS,
+)
+
+# Create AsyncSessionLocal class. Objects stay usable after commit, since
+# reloading expired attributes would need another awaited round trip.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
-# Create SessionLocal class
+# Synchronous engine and sessions for scripts and benchmarks
+engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create Base class
 Base = declarative_base()
 
-def get_db() -> Session:
+async def get_db() -> AsyncIterator[AsyncSession]:
     """
     Dependency for getting a database session.
     Ensures session is closed after use.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """
+    Session for reads that may lag behind the primary: on a replica when one is
+    available, otherwise on the primary
+    """
+    replica = replica_set.choose()
+    db = await replica_set.connect(replica) if replica is not None else None
+    if db is None:
+        replica = None
+        db = AsyncSessionLocal()
+    async with db:
+        try:
+            yield db
+        except CONNECTION_ERRORS:
+            if replica is not None:
+                replica_set.mark_down(replica)
+            raise
+
+async def get_read_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for a read-only database session, see ``read_session``"""
+    async with read_session() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Prometheus metrics for SQLAlchemy connection pools.
+
+Open and checked-out connection counts are tracked from pool events, so
+they are exact at scrape time without locking the pool. Checkout wait is
+timed by the pool class itself, since SQLAlchemy has no event for the start
+of a checkout. Metrics are labelled with the pool's logging name.
+"""
+import threading
+import time
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+db_pool_checkout_seconds = Histogram(
+    'db_pool_checkout_seconds', 'Time spent waiting for a pooled database connection', ['pool'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_checkout_timeouts = Counter(
+    'db_pool_checkout_timeouts_total', 'Checkouts that gave up waiting for a pooled connection', ['pool']
+)
+db_pool_connections = Gauge(
+    'db_pool_connections', 'Open pooled database connections', ['pool', 'state'], multiprocess_mode='livesum'
+)
+db_pool_overflow = Gauge(
+    'db_pool_overflow', 'Open connections beyond the pool size', ['pool'], multiprocess_mode='livesum'
+)
+
+def _pool_name(pool: Pool) -> str:
+    return getattr(pool, "logging_name", None) or "default"
+
+class _CheckoutTimingMixin:
+    def connect(self):
+        name = _pool_name(self)
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            db_pool_checkout_timeouts.labels(pool=name).inc()
+            raise
+        finally:
+            db_pool_checkout_seconds.labels(pool=name).observe(time.perf_counter() - start)
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """QueuePool that records checkout wait time"""
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait time"""
+
+class _PoolStats:
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+        self.open = 0
+        self.in_use = 0
+        self._lock = threading.Lock()
+
+    def update(self, opened: int = 0, checked_out: int = 0) -> None:
+        with self._lock:
+            self.open += opened
+            self.in_use += checked_out
+            db_pool_connections.labels(pool=self.name, state="in_use").set(self.in_use)
+            db_pool_connections.labels(pool=self.name, state="idle").set(max(self.open - self.in_use, 0))
+            db_pool_overflow.labels(pool=self.name).set(max(self.open - self.size, 0))
+
+_stats: Dict[str, _PoolStats] = {}
+
+def instrument_pool(engine: Engine) -> None:
+    """Publish connection counts for an engine's pool (pass ``async_engine.sync_engine`` for async engines)"""
+    name = _pool_name(engine.pool)
+    stats = _stats.setdefault(name, _PoolStats(name, engine.pool.size()))
+    stats.update()
+    # Listeners on the engine carry over when the pool is recreated by dispose()
+    event.listen(engine, "connect", lambda *args: stats.update(opened=1))
+    event.listen(engine, "close", lambda *args: stats.update(opened=-1))
+    event.listen(engine, "checkout", lambda *args: stats.update(checked_out=1))
+    event.listen(engine, "checkin", lambda *args: stats.update(checked_out=-1))
@@ -0,0 +1,34 @@
+"""
+SQL statement timing for the per-request counters in app/core/request_timing.py.
+
+Cursor events fire in the task that awaited the query, so the request's
+context variable is visible here. Statements outside a request (startup,
+background refreshes) are not recorded.
+"""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.request_timing import current_timings
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start"].pop()
+    timings = current_timings()
+    if timings is not None:
+        timings.record_query(statement, time.perf_counter() - start)
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+def instrument_queries(engine: Engine) -> None:
+    """Record statements on ``engine`` (``async_engine.sync_engine`` for async engines) per request"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,111 @@
+"""
+Read replica routing.
+
+Read-only endpoints take their session from ``get_read_db``, which picks a
+healthy replica from DATABASE_REPLICA_URLS (round robin, or the replica with
+the fewest checked-out connections) and falls back to the primary when none
+is available. A replica that cannot be reached drops out of rotation until
+the background health check reaches it again. Writes, and reads that must
+see the request's own writes, use ``get_db`` and the primary.
+"""
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from prometheus_client import Gauge
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.pool_metrics import instrument_pool
+from app.db.query_metrics import instrument_queries
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_ROUND_ROBIN = "round_robin"
+STRATEGY_LEAST_CONNECTIONS = "least_connections"
+
+# Errors that mean the replica itself is unusable, as opposed to a failing query
+CONNECTION_ERRORS = (OSError, exc.InterfaceError, exc.OperationalError)
+
+# With several workers, 0 if any worker has taken the replica out of rotation
+db_replica_healthy = Gauge(
+    'db_replica_healthy', 'Whether a read replica is in rotation', ['replica'], multiprocess_mode='livemin'
+)
+
+class Replica:
+    def __init__(self, name: str, url: str, **engine_options: Any):
+        self.name = name
+        self.engine = create_async_engine(url, pool_logging_name=name, **engine_options)
+        self.sessionmaker = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+        self.healthy = True
+        instrument_pool(self.engine.sync_engine)
+        instrument_queries(self.engine.sync_engine)
+        db_replica_healthy.labels(replica=name).set(1)
+
+    @property
+    def connections_in_use(self) -> int:
+        return self.engine.pool.checkedout()
+
+    def set_healthy(self, healthy: bool) -> None:
+        if healthy != self.healthy:
+            logger.warning("Read replica %s is %s", self.name, "back in rotation" if healthy else "out of rotation")
+        self.healthy = healthy
+        db_replica_healthy.labels(replica=self.name).set(int(healthy))
+
+class ReplicaSet:
+    """Chooses a healthy replica for each read-only session"""
+
+    def __init__(self, replicas: Sequence[Replica], strategy: str = STRATEGY_ROUND_ROBIN):
+        if strategy not in (STRATEGY_ROUND_ROBIN, STRATEGY_LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self._turn = itertools.count()
+
+    @classmethod
+    def from_urls(cls, urls: Sequence[str], strategy: str, engine_options: Dict[str, Any]) -> "ReplicaSet":
+        return cls([Replica(f"replica{i}", url, **engine_options) for i, url in enumerate(urls)], strategy)
+
+    def choose(self) -> Optional[Replica]:
+        """A healthy replica, or None to use the primary"""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        # Rotate the starting point so ties are spread evenly as well
+        start = next(self._turn) % len(healthy)
+        ordered = healthy[start:] + healthy[:start]
+        if self.strategy == STRATEGY_LEAST_CONNECTIONS:
+            return min(ordered, key=lambda replica: replica.connections_in_use)
+        return ordered[0]
+
+    def mark_down(self, replica: Replica) -> None:
+        replica.set_healthy(False)
+
+    async def check_health(self, timeout: float) -> None:
+        async def check(replica: Replica) -> None:
+            try:
+                async with replica.engine.connect() as connection:
+                    await asyncio.wait_for(connection.execute(text("SELECT 1")), timeout)
+            except (asyncio.TimeoutError, *CONNECTION_ERRORS, exc.DBAPIError):
+                replica.set_healthy(False)
+            else:
+                replica.set_healthy(True)
+        await asyncio.gather(*[check(replica) for replica in self.replicas])
+
+    async def run_health_checks(self, interval: float) -> None:
+        """Periodically probe every replica, returning recovered ones to rotation"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_health(timeout=interval)
+
+    async def connect(self, replica: Replica) -> Optional[AsyncSession]:
+        """A session on ``replica`` with its connection established, or None if it is unreachable"""
+        db = replica.sessionmaker()
+        try:
+            await db.connection()
+        except CONNECTION_ERRORS:
+            await db.close()
+            self.mark_down(replica)
+            return None
+        return db
@@ -1,16 +1,66 @@
-from fastapi import FastAPI, Request, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import uvicorn
-import time
+import asyncio
+import logging
 import prometheus_client
-from prometheus_client import Counter, Histogram, Gauge
 
-from app.api.routes import users, listings
-# Import additional route modules as they're created: bookings, reviews, messages
+from app.api.routes import users, listings, admin, bookings, quotes, messages
+# Import additional route modules as they're created: reviews
 
 from app.core.config import settings
-from app.db.database import get_db
+from app.core.http_metrics import PrometheusMiddleware
+from app.core.metrics import render_metrics
+from app.core.request_timing import RequestTimingMiddleware
+from app.core.location_index import location_index
+from app.core.passwords import password_hasher
+from app.core.profiling import ProfilingMiddleware, request_profiler
+from app.core.realtime import message_hub
+from app.crud import listings as listings_crud
+from app.db.database import get_db, read_session, replica_set
+
+logger = logging.getLogger(__name__)
+
+async def load_location_index() -> None:
+    """Rebuild the location autocomplete index from the database"""
+    async with read_session() as db:
+        counts = await listings_crud.get_location_counts(db)
+    # Building the trie is CPU-bound; keep it off the event loop
+    await run_in_threadpool(location_index.rebuild, counts)
+
+async def refresh_location_index(interval: int) -> None:
+    """Periodically rebuild the index to pick up writes handled by other replicas"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await load_location_index()
+        except Exception:
+            logger.warning("Location index refresh failed", exc_info=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await load_location_index()
+    except Exception:
+        # Don't block startup on the database; suggestions fill in on the next refresh
+        logger.warning("Could not build the location index at startup", exc_info=True)
+    
+    password_hasher.start()
+    
+    background_tasks = []
+    if settings.LOCATION_INDEX_REFRESH_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(refresh_location_index(settings.LOCATION_INDEX_REFRESH_SECONDS)))
+    if replica_set.replicas:
+        background_tasks.append(asyncio.create_task(replica_set.run_health_checks(settings.DB_REPLICA_HEALTH_CHECK_SECONDS)))
+    if settings.REALTIME_BROKER == "postgres":
+        background_tasks.append(asyncio.create_task(message_hub.run_listener(settings.DATABASE_URL)))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    password_hasher.shutdown()
 
 # Initialize FastAPI application
 app = FastAPI(
@@ -20,6 +70,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set up CORS middleware
@@ -29,42 +80,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
-# Initialize Prometheus metrics
-request_counter = Counter(
-    'http_requests_total', 'Total number of requests', ['method', 'endpoint', 'status']
-)
-request_duration = Histogram(
-    'http_request_duration_seconds', 'Request duration in seconds', ['method', 'endpoint']
-)
-active_requests = Gauge(
-    'http_requests_active', 'Number of active requests', ['method', 'endpoint']
-)
+# Sample requests while an admin has armed the profiler
+app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
 
-# Define metrics middleware
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    # Start timer and increment active requests
-    start_time = time.time()
-    method = request.method
-    endpoint = request.url.path
-    active_requests.labels(method=method, endpoint=endpoint).inc()
-    
-    # Process request
-    try:
-        response = await call_next(request)
-        status_code = response.status_code
-    except Exception as e:
-        status_code = 500
-        raise e
-    finally:
-        # Record metrics
-        request_duration.labels(method=method, endpoint=endpoint).observe(time.time() - start_time)
-        request_counter.labels(method=method, endpoint=endpoint, status=status_code).inc()
-        active_requests.labels(method=method, endpoint=endpoint).dec()
-    
-    return response
+# Count queries and time request phases
+app.add_middleware(RequestTimingMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
+# Record request metrics by route template
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
 
 # Health check endpoint
 @app.get("/api/health", tags=["health"])
@@ -85,11 +112,18 @@ async def root():
 # Metrics endpoint
 @app.get("/metrics", include_in_schema=False)
 def metrics():
-    return prometheus_client.generate_latest()
+    return Response(
+        content=render_metrics(),
+        media_type=prometheus_client.CONTENT_TYPE_LATEST,
+    )
 
 # Include API routers
 app.include_router(users.router, prefix="/api")
 app.include_router(listings.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+app.include_router(bookings.router, prefix="/api")
+app.include_router(quotes.router, prefix="/api")
+app.include_router(messages.router, prefix="/api")
 # Add additional routers as they're created
 
 # Serve static files if available
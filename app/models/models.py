@@ -1,5 +1,6 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Text, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Text, ARRAY, Index, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import TSVECTOR, ExcludeConstraint
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 
 from app.db.database import Base
@@ -42,8 +43,10 @@ class Listing(Base):
     state = Column(String, nullable=False)
     zip_code = Column(String, nullable=False)
     country = Column(String, nullable=False)
+    location_key = Column(String, nullable=True)  # normalized "city state zip", see app.core.locations
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
+    geo_cell = Column(Integer, nullable=True)  # latitude band, see app.core.geo
     images = Column(ARRAY(String), nullable=True)
     features = Column(ARRAY(String), nullable=True)
     access_instructions = Column(Text, nullable=True)
@@ -52,12 +55,34 @@ class Listing(Base):
     available_to = Column(DateTime, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Weighted title/features/description document for full-text search; only
+    # used in queries, so it is never loaded
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
 
     # Relationships
     host = relationship("User", back_populates="listings")
     bookings = relationship("Booking", back_populates="listing", cascade="all, delete-orphan")
     reviews = relationship("Review", back_populates="listing", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Bounding-box prefilter for proximity search
+        Index("ix_listings_geo_cell_longitude", "geo_cell", "longitude"),
+        # Keyset pagination seeks, one per sort order
+        Index("ix_listings_created_at_id", "created_at", "id"),
+        Index("ix_listings_price_per_month_id", "price_per_month", "id"),
+        Index("ix_listings_host_id_id", "host_id", "id"),
+        # Location search: trigram substring/prefix matching plus equality lookups
+        Index(
+            "ix_listings_location_key_trgm", "location_key",
+            postgresql_using="gin", postgresql_ops={"location_key": "gin_trgm_ops"},
+        ),
+        Index("ix_listings_lower_city", func.lower(city)),
+        Index("ix_listings_lower_state", func.lower(state)),
+        Index("ix_listings_zip_code", "zip_code"),
+        # Full-text search
+        Index("ix_listings_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
 class Booking(Base):
     __tablename__ = "bookings"
     
@@ -70,8 +95,31 @@ class Booking(Base):
     platform_fee = Column(Integer, nullable=False)  # in cents
     status = Column(String, default="pending")  # pending, confirmed, cancelled, completed
     payment_status = Column(String, default="pending")  # pending, paid, refunded
+    idempotency_key = Column(String, nullable=True)  # client key of the POST that created it
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Availability search: overlap probes per listing over the bookings that hold dates
+        Index(
+            "ix_bookings_listing_id_start_date_active", "listing_id", "start_date", "end_date",
+            postgresql_where=status.in_(["pending", "confirmed"]),
+        ),
+        # No two bookings that hold dates may overlap on one listing. The listing id is
+        # compared as a one-value range so the GiST index needs no btree_gist extension;
+        # an open end_date is an unbounded range.
+        ExcludeConstraint(
+            (func.int4range(listing_id, listing_id, "[]"), "&&"),
+            (func.tsrange(start_date, end_date, "[)"), "&&"),
+            name="ex_bookings_listing_id_period_active",
+            using="gist",
+            where=status.in_(["pending", "confirmed"]),
+        ),
+        UniqueConstraint("renter_id", "idempotency_key", name="uq_bookings_renter_id_idempotency_key"),
+        # Keyset pagination of a renter's and a listing's bookings
+        Index("ix_bookings_renter_id_id", "renter_id", "id"),
+        Index("ix_bookings_listing_id_id", "listing_id", "id"),
+    )
+
     # Relationships
     listing = relationship("Listing", back_populates="bookings")
     renter = relationship("User", foreign_keys=[renter_id], back_populates="bookings")
@@ -107,9 +155,32 @@ class Message(Base):
     message = Column(Text, nullable=False)
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # "low:high" user id pair, the same for both directions, see app.crud.messages
+    conversation_key = Column(String, nullable=True)
+
+    __table_args__ = (
+        # Keyset pagination of a conversation's history
+        Index("ix_messages_conversation_key_id", "conversation_key", "id"),
+    )
 
     # Relationships
     sender = relationship("User", foreign_keys=[sender_id], back_populates="messages_sent")
     receiver = relationship("User", foreign_keys=[receiver_id], back_populates="messages_received")
     listing = relationship("Listing", backref="messages")
-    booking = relationship("Booking", backref="messages")
\ No newline at end of file
+    booking = relationship("Booking", backref="messages")
+
+# One inbox row per participant of a conversation, updated as messages are sent and read
+class Conversation(Base):
+    __tablename__ = "conversations"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    other_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    last_message_id = Column(Integer, ForeignKey("messages.id", ondelete="SET NULL"), nullable=True)
+    unread_count = Column(Integer, nullable=False, default=0)  # messages to user_id not read yet
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "other_user_id", name="uq_conversations_user_id_other_user_id"),
+        # Inbox pages, most recent conversation first
+        Index("ix_conversations_user_id_last_message_id", "user_id", "last_message_id"),
+    )
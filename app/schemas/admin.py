@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from app.core.config import settings
+
+class ProfileRequest(BaseModel):
+    route: str = Field(..., pattern=r"^/", examples=["/api/listings/{listing_id}"])
+    method: Optional[str] = None
+    requests: int = Field(10, ge=1, le=settings.PROFILE_MAX_REQUESTS)
+    interval_ms: float = Field(5.0, ge=1.0, le=1000.0)
+
+class ProfileStatus(BaseModel):
+    route: Optional[str] = None
+    method: Optional[str] = None
+    remaining: int = 0
+    interval_ms: Optional[float] = None
+    output_dir: str
+    profiles: List[str]
@@ -1,6 +1,14 @@
-from pydantic import BaseModel, validator
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, validator
+from typing import List, Optional
+from datetime import datetime, timezone
+
+from app.core.config import settings
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Booking dates are stored as UTC without a time zone
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 class BookingBase(BaseModel):
     listing_id: int
@@ -25,14 +33,31 @@ class BookingBase(BaseModel):
             raise ValueError(f'Payment status must be one of {valid_payment_statuses}')
         return v
 
-class BookingCreate(BookingBase):
-    pass
+class BookingCreate(BaseModel):
+    """A booking request; the price is computed from the listing"""
+    listing_id: int
+    start_date: datetime
+    end_date: Optional[datetime] = None  # None for an open-ended stay
+    
+    @validator('start_date', 'end_date')
+    def normalize_dates(cls, v):
+        return to_naive_utc(v)
+    
+    @validator('end_date')
+    def validate_end_date(cls, v, values):
+        if v is not None and 'start_date' in values and v <= values['start_date']:
+            raise ValueError('end_date must be after start_date')
+        return v
 
 class BookingUpdate(BaseModel):
     end_date: Optional[datetime] = None
     status: Optional[str] = None
     payment_status: Optional[str] = None
     
+    @validator('end_date')
+    def normalize_dates(cls, v):
+        return to_naive_utc(v)
+    
     @validator('status')
     def validate_status(cls, v):
         if v is not None:
@@ -55,4 +80,20 @@ class BookingResponse(BookingBase):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class QuoteRequest(BookingCreate):
+    """A stay to price"""
+
+class QuoteBatchRequest(BaseModel):
+    quotes: List[QuoteRequest] = Field(..., min_length=1, max_length=settings.QUOTE_BATCH_MAX_ITEMS)
+
+class QuoteResponse(BaseModel):
+    listing_id: int
+    start_date: datetime
+    end_date: Optional[datetime] = None
+    total_price: Optional[int] = None  # in cents; None when the listing can't be booked
+    platform_fee: Optional[int] = None  # in cents
+    months: Optional[int] = None  # whole calendar months...
+    days: Optional[int] = None  # ...plus prorated days
+    error: Optional[str] = None
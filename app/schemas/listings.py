@@ -1,14 +1,18 @@
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
+import math
+
+# Largest value of the INTEGER columns
+INT32_MAX = 2**31 - 1
 
 # Base Listing schema with common attributes
 class ListingBase(BaseModel):
     title: str
     description: Optional[str] = None
     space_type: str
-    size: int  # in square feet
-    price_per_month: int  # in cents
+    size: int = Field(..., le=INT32_MAX)  # in square feet
+    price_per_month: int = Field(..., le=INT32_MAX)  # in cents
     address: str
     city: str
     state: str
@@ -41,8 +45,8 @@ class ListingUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     space_type: Optional[str] = None
-    size: Optional[int] = None
-    price_per_month: Optional[int] = None
+    size: Optional[int] = Field(None, le=INT32_MAX)
+    price_per_month: Optional[int] = Field(None, le=INT32_MAX)
     address: Optional[str] = None
     city: Optional[str] = None
     state: Optional[str] = None
@@ -73,11 +77,28 @@ class ListingResponse(ListingBase):
     id: int
     host_id: int
     created_at: datetime
+    distance: Optional[float] = None  # in miles, only set for proximity searches
+    
+    class Config:
+        from_attributes = True
+
+class ListingSummary(BaseModel):
+    """The fields shown in the search results grid"""
+    id: int
+    title: str
+    price_per_month: int  # in cents
+    size: int  # in square feet
+    city: str
+    state: str
+    space_type: str
+    image: Optional[str] = None  # first image URL
+    distance: Optional[float] = None  # in miles, only set for proximity searches
     
     class Config:
         from_attributes = True
 
 class ListingFilters(BaseModel):
+    q: Optional[str] = None  # full-text search over title, description and features
     location: Optional[str] = None
     space_type: Optional[str] = None
     min_price: Optional[int] = None
@@ -87,6 +108,38 @@ class ListingFilters(BaseModel):
     latitude: Optional[float] = None
     longitude: Optional[float] = None
     radius: Optional[float] = None  # in miles
+    available_start: Optional[date] = None  # free from this day...
+    available_end: Optional[date] = None  # ...until this day (exclusive); both or neither
+    
+    @validator('location')
+    def normalize_location(cls, v):
+        # Location matching is case-insensitive; normalizing here also lets
+        # equivalent searches share a cache entry
+        if v is not None:
+            v = " ".join(v.split()).lower() or None
+        return v
+
+class LocationSuggestion(BaseModel):
+    value: str  # pass as the `location` filter
+    label: str
+    kind: str  # city, state or zip
+    count: int  # number of active listings
+
+class FacetValueCount(BaseModel):
+    value: str
+    count: int
+
+class FacetRangeCount(BaseModel):
+    min: int  # inclusive, pass as min_price / min_size
+    max: Optional[int] = None  # inclusive, pass as max_price / max_size; None is unbounded
+    count: int
+
+class ListingFacets(BaseModel):
+    total: int
+    space_type: List[FacetValueCount]
+    price: List[FacetRangeCount]  # price_per_month in cents
+    size: List[FacetRangeCount]  # in square feet
+    access_type: List[FacetValueCount]
 
 class ListingCreateFromFrontend(BaseModel):
     """Special schema for handling frontend form data format"""
@@ -108,4 +161,45 @@ class ListingCreateFromFrontend(BaseModel):
     access_type: Optional[str] = None
     available_from: Optional[datetime] = None
     available_to: Optional[datetime] = None
-    is_active: bool = True
\ No newline at end of file
+    is_active: bool = True
+    
+    def to_listing_create(self) -> ListingCreate:
+        """Convert the form fields to a ListingCreate (raises ValueError on bad input)"""
+        size = int(self.sizeSqFt)
+        price = float(self.pricePerMonthDollars)
+        if not math.isfinite(price):
+            raise ValueError("pricePerMonthDollars must be a finite number")
+        price_per_month = int(price * 100)  # Convert to cents
+        features = self.featuresInput.split(',') if self.featuresInput else []
+        features = [feature.strip() for feature in features if feature.strip()]
+        
+        return ListingCreate(
+            title=self.title,
+            description=self.description,
+            space_type=self.space_type,
+            size=size,
+            price_per_month=price_per_month,
+            address=self.address,
+            city=self.city,
+            state=self.state,
+            zip_code=self.zip_code,
+            country=self.country,
+            latitude=self.latitude,
+            longitude=self.longitude,
+            images=self.imageUrls,
+            features=features,
+            access_instructions=self.access_instructions,
+            access_type=self.access_type,
+            available_from=self.available_from,
+            available_to=self.available_to,
+            is_active=self.is_active
+        )
+
+class BulkImportError(BaseModel):
+    line: int  # line number in the uploaded file
+    error: str
+
+class BulkImportResult(BaseModel):
+    created: int
+    failed: int
+    errors: List[BulkImportError]  # the first BULK_IMPORT_MAX_ERRORS failures
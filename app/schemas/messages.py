@@ -33,4 +33,8 @@ class ConversationGroup(BaseModel):
     other_user_name: str
     other_user_avatar: Optional[str] = None
     last_message: MessageResponse
-    unread_count: int
\ No newline at end of file
+    unread_count: int
+
+# Schema for the unread badge
+class UnreadCount(BaseModel):
+    unread_count: int
@@ -0,0 +1 @@
+# Benchmark scripts; run against a dedicated database, never production
@@ -0,0 +1,116 @@
+"""
+Availability search benchmark: checking each listing's bookings one by one vs.
+the available_start/available_end anti-join, with and without the partial index.
+
+Usage:
+    python -m benchmarks.availability --database-url postgresql://.../storage_bench
+
+The target database must be migrated and hold listings and users (seed it
+with ``python -m benchmarks.load seed``). Every booking in it, with its reviews
+and messages, is replaced at each density.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.crud import listings as listings_crud
+from app.db.database import async_database_url
+from app.models.models import Booking, Listing
+from app.schemas.listings import ListingFilters
+from benchmarks.seed import analyze, reset_bookings, seed_bookings
+
+# Search windows inside the seeded booking calendar: a month, a quarter and half a year
+WINDOWS = [(date(2026, 6, 1), date(2026, 7, 1)), (date(2026, 3, 1), date(2026, 6, 1)), (date(2026, 4, 1), date(2026, 10, 1))]
+
+# Whole catalog, a state and a single city
+LOCATIONS = [None, "tx", "portland"]
+
+
+async def per_listing_search(db: AsyncSession, filters: ListingFilters, limit: int = 100) -> List[Listing]:
+    """The previous client-side approach: page through listings and query each one's bookings"""
+    start = datetime.combine(filters.available_start, datetime.min.time())
+    end = datetime.combine(filters.available_end, datetime.min.time())
+    base = ListingFilters(location=filters.location)
+    available, cursor = [], None
+    while len(available) < limit:
+        page = await listings_crud.get_listings(db, filters=base, limit=limit, sort="id", cursor=cursor)
+        for listing in page:
+            booked = await db.scalar(
+                select(Booking.id).where(
+                    Booking.listing_id == listing.id,
+                    Booking.status.in_(listings_crud.BLOCKING_BOOKING_STATUSES),
+                    Booking.start_date < end,
+                    or_(Booking.end_date.is_(None), Booking.end_date > start),
+                ).limit(1)
+            )
+            if booked is None and (listing.available_from is None or listing.available_from <= start) \
+                    and (listing.available_to is None or listing.available_to >= end):
+                available.append(listing)
+        cursor = listings_crud.next_listings_cursor(page, limit, "id")
+        if cursor is None:
+            break
+    return available[:limit]
+
+
+async def anti_join_search(db: AsyncSession, filters: ListingFilters, limit: int = 100) -> List[Listing]:
+    return await listings_crud.get_listings(db, filters=filters, limit=limit, sort="id")
+
+
+async def measure(session_factory, search: Callable, filters: ListingFilters, repeat: int,
+                  drop_index: bool = False) -> Dict[str, float]:
+    timings = []
+    async with session_factory() as db:
+        if drop_index:
+            # Dropped inside the session's transaction and restored by the rollback
+            await db.execute(text("DROP INDEX ix_bookings_listing_id_start_date_active"))
+        results = await search(db, filters)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await search(db, filters)
+            timings.append((time.perf_counter() - start) * 1000)
+            db.expunge_all()
+        await db.rollback()
+    return {"p50_ms": round(statistics.median(timings), 3), "max_ms": round(max(timings), 3), "rows": len(results)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--bookings-per-listing", type=float, nargs="+", default=[1.0, 2.0, 4.0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+async def run(args) -> None:
+    sync_engine = create_engine(args.database_url)
+    engine = create_async_engine(async_database_url(args.database_url))
+    session_factory = async_sessionmaker(engine, autoflush=False)
+    for per_listing in args.bookings_per_listing:
+        reset_bookings(sync_engine)
+        seed_bookings(sync_engine, per_listing)
+        analyze(sync_engine)
+        for window_start, window_end in WINDOWS:
+            for location in LOCATIONS:
+                filters = ListingFilters(location=location, available_start=window_start, available_end=window_end)
+                result = {
+                    "bookings_per_listing": per_listing,
+                    "window": f"{window_start}/{window_end}",
+                    "location": location,
+                    "per_listing": await measure(session_factory, per_listing_search, filters, args.repeat),
+                    "anti_join_no_index": await measure(session_factory, anti_join_search, filters, args.repeat, drop_index=True),
+                    "anti_join": await measure(session_factory, anti_join_search, filters, args.repeat),
+                }
+                print(json.dumps(result), flush=True)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
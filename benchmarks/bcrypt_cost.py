@@ -0,0 +1,91 @@
+"""
+bcrypt cost factor benchmark: login verify latency on the password hashing pool.
+
+For each cost, runs a burst of concurrent logins against a PasswordHasher
+sized like one API worker's and reports single-verify time, verifies per
+second and p50/p99 latency including queueing. Picks the highest cost whose
+p99 stays under the target; set it as PASSWORD_BCRYPT_ROUNDS.
+
+Usage:
+    python -m benchmarks.bcrypt_cost --workers 2 --concurrency 16 --target-p99-ms 1000
+
+Run it on the hardware the API is deployed on; the numbers scale with core speed.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from app.core.passwords import PasswordHasher, get_password_hash, verify_password
+
+PASSWORD = "correct horse battery staple"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def single_verify_ms(hashed: str, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        verify_password(PASSWORD, hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def burst(hasher: PasswordHasher, hashed: str, concurrency: int, duration: float) -> Dict[str, float]:
+    timings: List[float] = []
+
+    async def login(deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await hasher.verify(PASSWORD, hashed)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    # Warm up the worker processes before timing
+    await asyncio.gather(*[hasher.verify(PASSWORD, hashed) for _ in range(hasher.workers)])
+    start = time.perf_counter()
+    await asyncio.gather(*[login(start + duration) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    return {
+        "verifies_per_second": round(len(timings) / elapsed, 1),
+        "p50_ms": round(statistics.median(timings), 1),
+        "p99_ms": round(percentile(timings, 0.99), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--workers", type=int, default=2, help="hashing processes (PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous logins")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per cost")
+    parser.add_argument("--target-p99-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    recommended = None
+    for rounds in args.rounds:
+        hashed = get_password_hash(PASSWORD, rounds=rounds)
+        hasher = PasswordHasher(workers=args.workers, max_pending=args.concurrency)
+        hasher.start()
+        try:
+            result = {
+                "rounds": rounds,
+                "single_verify_ms": round(single_verify_ms(hashed), 1),
+                **asyncio.run(burst(hasher, hashed, args.concurrency, args.duration)),
+            }
+        finally:
+            hasher.shutdown()
+        if result["p99_ms"] <= args.target_p99_ms:
+            recommended = rounds
+        print(json.dumps(result), flush=True)
+
+    print(json.dumps({"target_p99_ms": args.target_p99_ms, "recommended_rounds": recommended}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Inbox benchmark: GROUP BY over messages per load vs. the conversations table.
+
+Loads the first inbox page (and one conversation's history) for the users
+with the most conversations and for a typical user. The naive inbox groups
+the user's messages by the other participant on every load, then fetches
+each group's last message and user; it is timed as is (messages has no
+sender/receiver indexes) and with those indexes created for the run.
+
+Usage:
+    python -m benchmarks.inbox --database-url postgresql://.../storage_bench
+
+The target database must be migrated and seeded (``python -m benchmarks.load seed``).
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.crud import messages as messages_crud
+from app.db.database import async_database_url
+from app.models.models import Conversation, Message, User
+from app.schemas.messages import ConversationGroup, MessageResponse
+
+PAGE_SIZE = 20
+
+NAIVE_GROUPS_SQL = text("""
+    SELECT CASE WHEN sender_id = :user_id THEN receiver_id ELSE sender_id END AS other_user_id,
+           max(id) AS last_message_id,
+           count(*) FILTER (WHERE receiver_id = :user_id AND NOT is_read) AS unread_count
+    FROM messages
+    WHERE sender_id = :user_id OR receiver_id = :user_id
+    GROUP BY 1
+    ORDER BY last_message_id DESC
+    LIMIT :limit
+""")
+
+
+async def naive_inbox(db: AsyncSession, user_id: int) -> List[ConversationGroup]:
+    """Group the user's messages on every load, then look up each group's message and user"""
+    groups = (await db.execute(NAIVE_GROUPS_SQL, {"user_id": user_id, "limit": PAGE_SIZE})).all()
+    inbox = []
+    for other_user_id, last_message_id, unread_count in groups:
+        last_message = await db.get(Message, last_message_id)
+        other_user = await db.get(User, other_user_id)
+        inbox.append(ConversationGroup(
+            other_user_id=other_user_id,
+            other_user_name=other_user.full_name or other_user.username,
+            other_user_avatar=other_user.avatar,
+            last_message=MessageResponse.model_validate(last_message),
+            unread_count=unread_count,
+        ))
+    return inbox
+
+
+async def conversations_inbox(db: AsyncSession, user_id: int) -> List[ConversationGroup]:
+    return await messages_crud.get_conversations(db, user_id, limit=PAGE_SIZE)
+
+
+async def measure(session_factory, load: Callable, user_id: int, repeat: int, with_indexes: bool = False) -> Dict:
+    timings = []
+    async with session_factory() as db:
+        if with_indexes:
+            # Created inside the session's transaction and dropped by the rollback
+            await db.execute(text("CREATE INDEX bench_messages_sender_id ON messages (sender_id)"))
+            await db.execute(text("CREATE INDEX bench_messages_receiver_id ON messages (receiver_id)"))
+        rows = await load(db, user_id)
+        for _ in range(repeat):
+            db.expunge_all()
+            start = time.perf_counter()
+            await load(db, user_id)
+            timings.append((time.perf_counter() - start) * 1000)
+        await db.rollback()
+    return {"p50_ms": round(statistics.median(timings), 3), "max_ms": round(max(timings), 3), "rows": len(rows)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--users", type=int, default=3, help="busiest users to load")
+    parser.add_argument("--repeat", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+
+async def run(args) -> None:
+    engine = create_async_engine(async_database_url(args.database_url))
+    session_factory = async_sessionmaker(engine, autoflush=False)
+    async with session_factory() as db:
+        per_user = select(Conversation.user_id, func.count().label("conversations")).group_by(Conversation.user_id)
+        busiest = (await db.execute(per_user.order_by(text("conversations DESC")).limit(args.users))).all()
+        counts = sorted((await db.execute(per_user)).all(), key=lambda row: row.conversations)
+        users = list(busiest) + [counts[len(counts) // 2]]
+    for user_id, conversations in users:
+        result = {
+            "user_id": user_id,
+            "conversations": conversations,
+            "naive": await measure(session_factory, naive_inbox, user_id, args.repeat),
+            "naive_indexed": await measure(session_factory, naive_inbox, user_id, args.repeat, with_indexes=True),
+            "conversations_table": await measure(session_factory, conversations_inbox, user_id, args.repeat),
+        }
+        async with session_factory() as db:
+            other_user_id = (await conversations_inbox(db, user_id))[0].other_user_id
+        history = lambda db, user_id: messages_crud.get_conversation_messages(db, user_id, other_user_id)
+        result["history"] = await measure(session_factory, history, user_id, args.repeat)
+        print(json.dumps(result), flush=True)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Listing search benchmark: full ListingResponse rows vs. the summary projection.
+
+Measures query plus JSON serialization time and payload size per page, as
+GET /api/listings does on a cache miss.
+
+Usage:
+    python -m benchmarks.listing_views --database-url postgresql://.../storage_bench
+
+The target database must already be migrated (``alembic upgrade head``).
+Every listing in it is truncated before seeding.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.crud import listings as listings_crud
+from app.db.database import async_database_url
+from app.schemas.listings import ListingFilters, ListingResponse, ListingSummary
+from benchmarks.seed import reset_listings, seed_listings
+
+SEARCHES = [
+    {"name": "browse", "filters": {}, "sort": None},
+    {"name": "newest", "filters": {}, "sort": "newest"},
+    {"name": "location", "filters": {"location": "portland"}, "sort": None},
+    {"name": "proximity", "filters": {"latitude": 45.5152, "longitude": -122.6784, "radius": 25}, "sort": None},
+]
+
+ADAPTERS = {
+    "full": TypeAdapter(List[ListingResponse]),
+    "summary": TypeAdapter(List[ListingSummary]),
+}
+
+
+async def measure(session_factory, search: Dict, view: str, limit: int, repeat: int) -> Dict[str, float]:
+    adapter = ADAPTERS[view]
+    filters = ListingFilters(**search["filters"])
+
+    async def run(db) -> bytes:
+        rows = await listings_crud.get_listings(
+            db, filters=filters, limit=limit, sort=search["sort"], summary=view == "summary"
+        )
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    timings = []
+    async with session_factory() as db:
+        body = await run(db)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await run(db)
+            timings.append((time.perf_counter() - start) * 1000)
+            db.expunge_all()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "bytes": len(body),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the listings already seeded")
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        engine = create_engine(args.database_url)
+        reset_listings(engine)
+        seed_listings(engine, args.listings)
+    asyncio.run(run(args))
+
+
+async def run(args) -> None:
+    engine = create_async_engine(async_database_url(args.database_url))
+    session_factory = async_sessionmaker(engine, autoflush=False)
+    for search in SEARCHES:
+        result = {"search": search["name"]}
+        for view in ADAPTERS:
+            result[view] = await measure(session_factory, search, view, args.limit, args.repeat)
+        print(json.dumps(result), flush=True)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Reproducible load test of the API's hot paths.
+
+Subcommands:
+    seed     fill a dedicated database with synthetic users, listings, bookings, reviews and messages
+    run      drive the API with concurrent clients and report p50/p95/p99 and throughput as JSON
+    compare  compare two ``run`` results and fail on latency or throughput regressions
+
+Usage:
+    DATABASE_URL=postgresql://.../storage_bench alembic upgrade head
+    python -m benchmarks.load seed --database-url postgresql://.../storage_bench --reset
+    DATABASE_URL=postgresql://.../storage_bench python -m benchmarks.load run --output baseline.json
+    # ...change the code, then
+    DATABASE_URL=postgresql://.../storage_bench python -m benchmarks.load run --output current.json
+    python -m benchmarks.load compare baseline.json current.json
+
+``run`` serves the app in-process over ASGI, with its lifespan, using the
+database and settings from the environment; client and app then share one
+event loop, so compare runs made the same way. Pass ``--base-url`` to load a
+running server instead. Every client follows its own seeded sequence of
+requests, so repeated runs issue the same requests. The workload mixes
+listing searches (every combination of the q, location, space_type, price and
+size filters), proximity searches, listing detail, login and ``/users/me``.
+
+Each concurrency level runs ``--repeat`` times and the report keeps the
+median of every rate and percentile, which damps one slow or fast run.
+p95 still moves between reports of the same code: by up to 32% on a
+shared single-CPU machine with 10 s runs. So ``compare`` only flags
+changes beyond ``--max-regression``, 40% by default. Lower it on quieter
+hardware once two baseline runs there compare clean.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.seed import BENCH_PASSWORD, METROS, SPACE_TYPES, bench_username
+
+SEARCH_TERMS = ["climate controlled", "garage", "basement -attic", "secure parking", '"drive-up access"']
+
+Request = Tuple[str, str, str, Optional[dict]]  # scenario, method, path, params
+
+
+def _price_filter(rng: random.Random) -> dict:
+    low = rng.randint(20, 400) * 100
+    return {"min_price": low, "max_price": low + rng.randint(50, 200) * 100}
+
+
+def _size_filter(rng: random.Random) -> dict:
+    low = rng.randint(20, 500)
+    return {"min_size": low, "max_size": low + rng.randint(50, 500)}
+
+
+SEARCH_FILTERS: Dict[str, Callable[[random.Random], dict]] = {
+    "q": lambda rng: {"q": rng.choice(SEARCH_TERMS)},
+    "location": lambda rng: {"location": rng.choice(METROS)[0].lower()},
+    "space_type": lambda rng: {"space_type": rng.choice(SPACE_TYPES)},
+    "price": _price_filter,
+    "size": _size_filter,
+}
+SEARCH_COMBINATIONS = [
+    combination
+    for size in range(len(SEARCH_FILTERS) + 1)
+    for combination in itertools.combinations(SEARCH_FILTERS, size)
+]
+
+# Share of requests per scenario group
+WEIGHTS = {"search": 35, "proximity": 15, "listing_detail": 30, "users_me": 15, "login": 5}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def next_request(rng: random.Random, args) -> Request:
+    """Pick the next request of the mix"""
+    group = rng.choices(list(WEIGHTS), list(WEIGHTS.values()))[0]
+    if group == "search":
+        combination = rng.choice(SEARCH_COMBINATIONS)
+        params = {"limit": 20}
+        for name in combination:
+            params.update(SEARCH_FILTERS[name](rng))
+        return f"search[{'+'.join(combination)}]", "GET", "/api/listings/", params
+    if group == "proximity":
+        _, _, _, latitude, longitude = rng.choice(METROS)
+        params = {
+            "latitude": round(latitude + rng.uniform(-0.1, 0.1), 4),
+            "longitude": round(longitude + rng.uniform(-0.1, 0.1), 4),
+            "radius": rng.choice([5, 10, 25]),
+            "sort": "distance",
+            "limit": 20,
+        }
+        return "proximity", "GET", "/api/listings/", params
+    if group == "listing_detail":
+        return "listing_detail", "GET", f"/api/listings/{rng.randint(1, args.max_listing_id)}", None
+    if group == "login":
+        form = {"username": bench_username(rng.randrange(args.users)), "password": BENCH_PASSWORD}
+        return "login", "POST", "/api/users/login", form
+    return "users_me", "GET", "/api/users/me", None
+
+
+async def login(client: httpx.AsyncClient, user: int) -> str:
+    response = await client.post(
+        "/api/users/login", data={"username": bench_username(user), "password": BENCH_PASSWORD}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def client_loop(client: httpx.AsyncClient, token: str, deadline: float, rng: random.Random, args,
+                      timings: Dict[str, List[float]], errors: Dict[str, int]) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        scenario, method, path, params = next_request(rng, args)
+        start = time.perf_counter()
+        try:
+            if method == "POST":
+                response = await client.post(path, data=params)
+            else:
+                response = await client.get(path, params=params, headers=headers)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        # Searches are reported per filter combination and all together
+        names = [scenario, "search"] if scenario.startswith("search[") else [scenario]
+        for name in names:
+            if ok:
+                timings[name].append((time.perf_counter() - start) * 1000)
+            else:
+                errors[name] += 1
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, args) -> Dict:
+    tokens = [await login(client, user % args.users) for user in range(concurrency)]
+    # Warm up connections, caches and the hashing pool
+    await asyncio.gather(*[
+        client_loop(client, tokens[i], time.perf_counter() + args.warmup, random.Random(-1 - i), args,
+                    defaultdict(list), defaultdict(int))
+        for i in range(concurrency)
+    ])
+    timings: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client_loop(client, tokens[i], start + args.duration, random.Random(args.seed * 1000 + i), args,
+                    timings, errors)
+        for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    requests = sum(len(values) for name, values in timings.items() if name != "search")
+    result = {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(count for name, count in errors.items() if name != "search"),
+        "rps": round(requests / elapsed, 1),
+        "scenarios": {},
+    }
+    for scenario in sorted(set(timings) | set(errors)):
+        values = timings[scenario]
+        result["scenarios"][scenario] = {
+            "requests": len(values),
+            "errors": errors[scenario],
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(statistics.median(values), 2) if values else None,
+            "p95_ms": round(percentile(values, 0.95), 2) if values else None,
+            "p99_ms": round(percentile(values, 0.99), 2) if values else None,
+        }
+    return result
+
+
+async def run_levels(args) -> List[Dict]:
+    async with AsyncExitStack() as stack:
+        if args.base_url:
+            transport = None
+            base_url = args.base_url
+        else:
+            # Imported here so that ``seed`` and ``compare`` don't need the app's settings
+            from app.main import app
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://bench"
+        limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=60)
+        )
+        levels = []
+        for concurrency in args.concurrency:
+            runs = []
+            for _ in range(args.repeat):
+                level = await run_level(client, concurrency, args)
+                print(json.dumps({key: level[key] for key in ("concurrency", "requests", "errors", "rps")}),
+                      file=sys.stderr, flush=True)
+                runs.append(level)
+            levels.append(median_level(runs))
+        return levels
+
+
+def _median(values: List[Optional[float]]) -> Optional[float]:
+    values = [value for value in values if value is not None]
+    return round(statistics.median(values), 2) if values else None
+
+
+def median_level(runs: List[Dict]) -> Dict:
+    """One level from repeated runs: request and error counts summed, rates and percentiles as medians"""
+    level = {
+        "concurrency": runs[0]["concurrency"],
+        "repeat": len(runs),
+        "requests": sum(run["requests"] for run in runs),
+        "errors": sum(run["errors"] for run in runs),
+        "rps": _median([run["rps"] for run in runs]),
+        "scenarios": {},
+    }
+    for scenario in sorted(set().union(*[run["scenarios"] for run in runs])):
+        results = [run["scenarios"][scenario] for run in runs if scenario in run["scenarios"]]
+        level["scenarios"][scenario] = {
+            "requests": sum(result["requests"] for result in results),
+            "errors": sum(result["errors"] for result in results),
+            **{key: _median([result[key] for result in results]) for key in ("rps", "p50_ms", "p95_ms", "p99_ms")},
+        }
+    return level
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> None:
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    levels = asyncio.run(run_levels(args))
+    report = {
+        "started_at": started_at,
+        "commit": git_commit(),
+        "target": args.base_url or "asgi",
+        "config": {
+            "duration": args.duration, "warmup": args.warmup, "repeat": args.repeat, "seed": args.seed,
+            "users": args.users, "max_listing_id": args.max_listing_id,
+        },
+        "levels": levels,
+    }
+    document = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    print(document)
+
+
+def seed(args) -> None:
+    from sqlalchemy import create_engine, select
+
+    from app.models.models import User
+    from benchmarks import seed as synthetic
+
+    engine = create_engine(args.database_url)
+    if args.reset:
+        synthetic.reset_all(engine)
+
+    def host_ids() -> List[int]:
+        with engine.connect() as conn:
+            return conn.execute(select(User.id).where(User.is_host.is_(True))).scalars().all()
+
+    steps = [
+        ("users", lambda: synthetic.seed_users(engine, args.users, seed=args.seed)),
+        ("listings", lambda: synthetic.seed_listings(engine, args.listings, seed=args.seed, host_ids=host_ids())),
+        ("bookings", lambda: synthetic.seed_bookings(engine, args.bookings_per_listing, seed=args.seed)),
+        ("reviews and messages", lambda: synthetic.seed_reviews_and_messages(
+            engine, args.review_fraction, args.messages_per_booking)),
+    ]
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        print(json.dumps({"seeded": name, "seconds": round(time.perf_counter() - start, 1)}), flush=True)
+    synthetic.analyze(engine)
+
+
+def compare(args) -> None:
+    with open(args.baseline) as f:
+        baseline = {level["concurrency"]: level for level in json.load(f)["levels"]}
+    with open(args.current) as f:
+        current = {level["concurrency"]: level for level in json.load(f)["levels"]}
+
+    regressions = 0
+    for concurrency in sorted(set(baseline) & set(current)):
+        before, after = baseline[concurrency], current[concurrency]
+        rows = [("total", before, after, "rps")]
+        rows += [
+            (name, before["scenarios"][name], after["scenarios"][name], "p95_ms")
+            for name in sorted(set(before["scenarios"]) & set(after["scenarios"]))
+        ]
+        for name, old, new, key in rows:
+            if min(old["requests"], new["requests"]) < args.min_requests or not old[key] or not new[key]:
+                continue
+            change = new[key] / old[key] - 1
+            # Lower is better for latency, higher for throughput
+            regressed = change > args.max_regression if key == "p95_ms" else -change > args.max_regression
+            regressions += regressed
+            print(json.dumps({
+                "concurrency": concurrency, "scenario": name, "metric": key,
+                "baseline": old[key], "current": new[key], "change": round(change, 3),
+                "regressed": regressed,
+            }))
+    print(json.dumps({"regressions": regressions, "max_regression": args.max_regression}))
+    sys.exit(1 if regressions else 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="fill a migrated benchmark database")
+    seed_parser.add_argument("--database-url", required=True)
+    seed_parser.add_argument("--reset", action="store_true", help="truncate users, listings and their rows first")
+    seed_parser.add_argument("--users", type=int, default=10_000)
+    seed_parser.add_argument("--listings", type=int, default=100_000)
+    seed_parser.add_argument("--bookings-per-listing", type=float, default=2.0)
+    seed_parser.add_argument("--review-fraction", type=float, default=0.6, help="of completed bookings")
+    seed_parser.add_argument("--messages-per-booking", type=int, default=3)
+    seed_parser.add_argument("--seed", type=int, default=42)
+
+    run_parser = commands.add_parser("run", help="run the load test")
+    run_parser.add_argument("--base-url", help="load a running server instead of the in-process app")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    run_parser.add_argument("--duration", type=float, default=20.0, help="seconds per concurrency level")
+    run_parser.add_argument("--warmup", type=float, default=3.0)
+    run_parser.add_argument("--repeat", type=int, default=3, help="runs per level; the report keeps their medians")
+    run_parser.add_argument("--users", type=int, default=10_000, help="seeded users to log in as")
+    run_parser.add_argument("--max-listing-id", type=int, default=100_000)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--output", help="also write the report to this file")
+
+    compare_parser = commands.add_parser("compare", help="compare two run reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--max-regression", type=float, default=0.4,
+                                help="allowed relative p95 increase or throughput drop, above run-to-run noise")
+    compare_parser.add_argument("--min-requests", type=int, default=30,
+                                help="skip scenarios with fewer requests in either run")
+
+    args = parser.parse_args()
+    {"seed": seed, "run": run, "compare": compare}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Location search benchmark: three leading-wildcard ILIKEs vs. location_key matching.
+
+Usage:
+    python -m benchmarks.location_search --database-url postgresql://.../storage_bench
+
+The target database must already be migrated (``alembic upgrade head``).
+Every listing in it is truncated before seeding.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.crud import listings as listings_crud
+from app.db.database import async_database_url
+from app.models.models import Listing
+from app.schemas.listings import ListingFilters
+from benchmarks.seed import reset_listings, seed_listings
+
+# Exact city, prefix, substring, state code, zip code and a miss
+QUERIES = ["portland", "salt", "antonio", "tx", "78262", "new york ny", "atlantis"]
+
+
+async def ilike_search(db: AsyncSession, location: str, limit: int = 100) -> List[Listing]:
+    """The previous implementation: OR of three leading-wildcard ILIKEs"""
+    result = await db.execute(
+        select(Listing)
+        .where(Listing.is_active == True)
+        .where(
+            or_(
+                Listing.city.ilike(f"%{location}%"),
+                Listing.state.ilike(f"%{location}%"),
+                Listing.zip_code.ilike(f"%{location}%")
+            )
+        )
+        .order_by(Listing.id)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def location_key_search(db: AsyncSession, location: str, limit: int = 100) -> List[Listing]:
+    return await listings_crud.get_listings(db, filters=ListingFilters(location=location), limit=limit)
+
+
+async def measure(session_factory, search: Callable, location: str, repeat: int) -> Dict[str, float]:
+    timings = []
+    async with session_factory() as db:
+        await search(db, location)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await search(db, location)
+            timings.append((time.perf_counter() - start) * 1000)
+            db.expunge_all()
+    return {"p50_ms": round(statistics.median(timings), 3), "max_ms": round(max(timings), 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the listings already seeded")
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        engine = create_engine(args.database_url)
+        reset_listings(engine)
+        seed_listings(engine, args.listings)
+    asyncio.run(run(args))
+
+
+async def run(args) -> None:
+    engine = create_async_engine(async_database_url(args.database_url))
+    session_factory = async_sessionmaker(engine, autoflush=False)
+    for location in QUERIES:
+        result = {
+            "location": location,
+            "ilike": await measure(session_factory, ilike_search, location, args.repeat),
+            "location_key": await measure(session_factory, location_key_search, location, args.repeat),
+        }
+        print(json.dumps(result), flush=True)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
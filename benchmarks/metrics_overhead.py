@@ -0,0 +1,120 @@
+"""
+Request metrics middleware overhead benchmark.
+
+Calls a small FastAPI app in-process through ASGI, with no server or
+network, and reports the mean time per request with no metrics middleware,
+with the previous ``@app.middleware("http")`` implementation labelled by raw
+path, and with PrometheusMiddleware. The difference to the bare app is the
+per-request cost of the metrics.
+
+Usage:
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI, Request
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+from app.core.http_metrics import PrometheusMiddleware
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/listings/{listing_id}")
+    async def read_listing(listing_id: int):
+        return {"id": listing_id}
+
+    return app
+
+
+def with_http_middleware(app: FastAPI) -> FastAPI:
+    """The metrics middleware as it was before PrometheusMiddleware, on its own registry"""
+    registry = CollectorRegistry()
+    request_counter = Counter(
+        'http_requests_total', 'Total number of requests', ['method', 'endpoint', 'status'], registry=registry
+    )
+    request_duration = Histogram(
+        'http_request_duration_seconds', 'Request duration in seconds', ['method', 'endpoint'], registry=registry
+    )
+    active_requests = Gauge(
+        'http_requests_active', 'Number of active requests', ['method', 'endpoint'], registry=registry
+    )
+
+    @app.middleware("http")
+    async def metrics_middleware(request: Request, call_next):
+        start_time = time.time()
+        method = request.method
+        endpoint = request.url.path
+        active_requests.labels(method=method, endpoint=endpoint).inc()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            request_duration.labels(method=method, endpoint=endpoint).observe(time.time() - start_time)
+            request_counter.labels(method=method, endpoint=endpoint, status=status_code).inc()
+            active_requests.labels(method=method, endpoint=endpoint).dec()
+        return response
+
+    return app
+
+
+def with_asgi_middleware(app: FastAPI) -> FastAPI:
+    app.add_middleware(PrometheusMiddleware)
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    """Mean microseconds per request"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(listing_id: int):
+        path = f"/api/listings/{listing_id}"
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1),
+            "server": ("bench", 80),
+        }
+
+    # Warm up the middleware stack and the route's validation
+    for listing_id in range(100):
+        await app(scope(listing_id), receive, send)
+    start = time.perf_counter()
+    for listing_id in range(requests):
+        await app(scope(listing_id), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    variants = {
+        "none": build_app(),
+        "http_middleware": with_http_middleware(build_app()),
+        "asgi_middleware": with_asgi_middleware(build_app()),
+    }
+    baseline = None
+    for name, app in variants.items():
+        per_request_us = asyncio.run(run(app, args.requests))
+        if baseline is None:
+            baseline = per_request_us
+        print(json.dumps({
+            "middleware": name,
+            "us_per_request": round(per_request_us, 1),
+            "overhead_us": round(per_request_us - baseline, 1),
+        }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
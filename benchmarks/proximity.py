@@ -0,0 +1,121 @@
+"""
+Proximity search benchmark: full-scan distance filter vs. geo_cell prefilter.
+
+Usage:
+    python -m benchmarks.proximity --database-url postgresql://.../storage_bench
+
+The target database must already be migrated (``alembic upgrade head``).
+Every listing in it is truncated between volumes.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import asc, create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import geo
+from app.crud import listings as listings_crud
+from app.db.database import async_database_url
+from app.models.models import Listing
+from app.schemas.listings import ListingFilters
+from benchmarks.seed import METROS, reset_listings, seed_listings
+
+DEFAULT_VOLUMES = [10_000, 100_000, 1_000_000]
+RADII_MILES = [5, 10, 25, 50]
+
+
+async def full_scan_search(db: AsyncSession, filters: ListingFilters, limit: int = 100) -> List[Listing]:
+    """The previous implementation: distance computed and sorted over every active row"""
+    distance = (
+        geo.EARTH_RADIUS_MILES *
+        func.acos(
+            func.cos(func.radians(filters.latitude)) *
+            func.cos(func.radians(Listing.latitude)) *
+            func.cos(func.radians(Listing.longitude) - func.radians(filters.longitude)) +
+            func.sin(func.radians(filters.latitude)) *
+            func.sin(func.radians(Listing.latitude))
+        )
+    )
+    result = await db.execute(
+        select(Listing)
+        .where(Listing.is_active == True)
+        .where(distance <= filters.radius)
+        .order_by(asc(distance))
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def indexed_search(db: AsyncSession, filters: ListingFilters, limit: int = 100) -> List[Listing]:
+    return await listings_crud.get_listings(db, filters=filters, limit=limit)
+
+
+def make_queries(count: int, seed: int = 7) -> List[ListingFilters]:
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        _, _, _, lat, lon = rng.choice(METROS)
+        queries.append(ListingFilters(
+            latitude=rng.gauss(lat, 0.1),
+            longitude=rng.gauss(lon, 0.1),
+            radius=rng.choice(RADII_MILES),
+        ))
+    return queries
+
+
+async def measure(session_factory, search: Callable, queries: List[ListingFilters]) -> Dict[str, float]:
+    timings = []
+    async with session_factory() as db:
+        await search(db, queries[0])  # warm up the connection and plan cache
+        for filters in queries:
+            start = time.perf_counter()
+            await search(db, filters)
+            timings.append((time.perf_counter() - start) * 1000)
+            db.expunge_all()
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--volumes", type=int, nargs="+", default=DEFAULT_VOLUMES)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    queries = make_queries(args.queries)
+
+    for volume in args.volumes:
+        reset_listings(engine)
+        seed_listings(engine, volume)
+        result = {
+            "listings": volume,
+            "queries": len(queries),
+            **asyncio.run(measure_volume(args.database_url, queries)),
+        }
+        print(json.dumps(result), flush=True)
+
+
+async def measure_volume(database_url: str, queries: List[ListingFilters]) -> Dict[str, Dict[str, float]]:
+    engine = create_async_engine(async_database_url(database_url))
+    session_factory = async_sessionmaker(engine, autoflush=False)
+    result = {
+        "full_scan": await measure(session_factory, full_scan_search, queries),
+        "indexed": await measure(session_factory, indexed_search, queries),
+    }
+    await engine.dispose()
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Batch quote benchmark: totals for a page of search results.
+
+Prices one date range at a page of listings through the app in-process
+(ASGI, no server or network), against the database in DATABASE_URL: one
+request per listing, the same requests concurrently, and one
+``POST /api/quotes/batch`` for the whole page. Also times the pricing
+arithmetic alone, per listing and with the shared date term.
+
+Usage:
+    DATABASE_URL=postgresql://.../storage_bench python -m benchmarks.quotes --page-size 100
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime
+
+import httpx
+
+from app.core import pricing
+from app.main import app
+
+START_DATE = datetime(2026, 6, 1)
+END_DATE = datetime(2026, 9, 15)
+
+
+def _body(listing_ids):
+    return {"quotes": [
+        {"listing_id": listing_id, "start_date": START_DATE.isoformat(), "end_date": END_DATE.isoformat()}
+        for listing_id in listing_ids
+    ]}
+
+
+async def measure(call, repeat: int) -> float:
+    await call()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+async def run(args) -> None:
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            page = await client.get("/api/listings/", params={"limit": args.page_size, "view": "summary"})
+            listing_ids = [listing["id"] for listing in page.json()]
+
+            async def one_by_one():
+                for listing_id in listing_ids:
+                    (await client.post("/api/quotes/batch", json=_body([listing_id]))).raise_for_status()
+
+            async def concurrent():
+                responses = await asyncio.gather(*[
+                    client.post("/api/quotes/batch", json=_body([listing_id])) for listing_id in listing_ids
+                ])
+                for response in responses:
+                    response.raise_for_status()
+
+            async def batch():
+                (await client.post("/api/quotes/batch", json=_body(listing_ids))).raise_for_status()
+
+            result = {
+                "listings": len(listing_ids),
+                "sequential_requests_ms": await measure(one_by_one, args.repeat),
+                "concurrent_requests_ms": await measure(concurrent, args.repeat),
+                "batch_request_ms": await measure(batch, args.repeat),
+            }
+
+    prices = [15000 + i for i in range(len(listing_ids))]
+    iterations = 2000
+    start = time.perf_counter()
+    for _ in range(iterations):
+        [pricing.quote(price, START_DATE, END_DATE) for price in prices]
+    result["pricing_per_listing_us"] = round((time.perf_counter() - start) / iterations * 1e6, 1)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        pricing.quote_many(prices, START_DATE, END_DATE)
+    result["pricing_shared_term_us"] = round((time.perf_counter() - start) / iterations * 1e6, 1)
+    print(json.dumps(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+WebSocket load test: thousands of idle connections plus active conversations.
+
+Opens ``--idle`` connections for users who receive nothing and ``--active``
+connections for users who are sent messages, spread round-robin over the
+``--base-url`` servers. Senders then POST ``--messages`` messages to the
+active users at ``--rate`` per second, each through a different server than
+the one its receiver is connected to, so with two or more servers (or
+workers behind one port) every event crosses processes through Postgres
+LISTEN/NOTIFY. Reports connect time, POST latency, delivery latency from
+before the POST to the event arriving, lost events, idle connections that
+were dropped, and the servers' resident memory before and after connecting.
+
+Usage:
+    SECRET_KEY=... python -m benchmarks.realtime --database-url postgresql://.../storage_bench \\
+        --base-url http://127.0.0.1:5000 --base-url http://127.0.0.1:5001 \\
+        --server-pid 1234 --server-pid 1235 --idle 5000 --active 200 --messages 2000
+
+The servers must share SECRET_KEY and the seeded database (``python -m
+benchmarks.load seed``) with this script, which mints the users' tokens.
+Each connection uses a file descriptor on both sides; raise ``ulimit -n``
+for large runs.
+"""
+import argparse
+import asyncio
+import json
+import time
+from itertools import cycle
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from websockets.asyncio.client import ClientConnection, connect
+
+from app.core.security import create_access_token
+from app.db.database import async_database_url
+from app.models.models import User
+
+CONNECT_CONCURRENCY = 100
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(values)
+    at = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+    return {"count": len(values), "p50_ms": at(0.5), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": round(ordered[-1], 2)}
+
+
+def rss_mb(pids: List[int]) -> Optional[float]:
+    """Resident memory of the server processes, from /proc"""
+    if not pids:
+        return None
+    total_kb = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/status") as status_file:
+            total_kb += next(int(line.split()[1]) for line in status_file if line.startswith("VmRSS:"))
+    return round(total_kb / 1024, 1)
+
+
+def ws_url(base_url: str, token: str) -> str:
+    return base_url.replace("http", "ws", 1).rstrip("/") + f"/api/messages/ws?token={token}"
+
+
+def token_for(user_id: int) -> str:
+    return create_access_token({"sub": str(user_id)})
+
+
+async def open_connections(base_urls: List[str], user_ids: List[int], timings: List[float]) -> List[ClientConnection]:
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    servers = cycle(base_urls)
+
+    async def open_one(base_url: str, user_id: int) -> ClientConnection:
+        async with semaphore:
+            start = time.perf_counter()
+            # Protocol pings are left to the server so idle clients cost nothing here
+            websocket = await connect(ws_url(base_url, token_for(user_id)), ping_interval=None, max_queue=None)
+            timings.append((time.perf_counter() - start) * 1000)
+            return websocket
+
+    return await asyncio.gather(*[open_one(next(servers), user_id) for user_id in user_ids])
+
+
+async def receive(websocket: ClientConnection, user_id: int, sent_at: Dict[int, float], latencies: List[float]) -> None:
+    async for raw in websocket:
+        event = json.loads(raw)
+        if event["type"] == "message" and event["message"]["receiver_id"] == user_id:
+            sequence = int(event["message"]["message"].split()[-1])
+            latencies.append((time.perf_counter() - sent_at[sequence]) * 1000)
+
+
+async def run(args) -> None:
+    engine = create_async_engine(async_database_url(args.database_url))
+    needed = args.active + args.senders + 1
+    async with engine.connect() as connection:
+        user_ids = (await connection.execute(select(User.id).order_by(User.id).limit(needed + args.idle))).scalars().all()
+    await engine.dispose()
+    if len(user_ids) < needed:
+        raise SystemExit(f"Need at least {needed} users in the database")
+    receivers, senders = user_ids[:args.active], user_ids[args.active:args.active + args.senders]
+    # Idle connections go to users nobody messages, several per user if there are few
+    idle_pool = user_ids[args.active + args.senders:]
+    idle_users = [idle_pool[i % len(idle_pool)] for i in range(args.idle)]
+
+    report = {"servers": len(args.base_url), "idle": args.idle, "active": args.active, "rss_mb_before": rss_mb(args.server_pid)}
+    connect_timings: List[float] = []
+    started = time.perf_counter()
+    idle = await open_connections(args.base_url, idle_users, connect_timings)
+    active = await open_connections(args.base_url, receivers, connect_timings)
+    report["connect_seconds"] = round(time.perf_counter() - started, 2)
+    report["connect"] = percentiles(connect_timings)
+    await asyncio.sleep(1)
+    report["rss_mb_connected"] = rss_mb(args.server_pid)
+
+    sent_at: Dict[int, float] = {}
+    delivery: List[float] = []
+    post_timings: List[float] = []
+    receivers_tasks = [
+        asyncio.create_task(receive(websocket, user_id, sent_at, delivery)) for websocket, user_id in zip(active, receivers)
+    ]
+    # The receiver of connection i is on server i % n; send through the next one
+    clients = [httpx.AsyncClient(base_url=base_url, timeout=30) for base_url in args.base_url]
+    sender_tokens = {sender_id: token_for(sender_id) for sender_id in senders}
+    semaphore = asyncio.Semaphore(args.senders)
+
+    async def send(sequence: int) -> None:
+        index = sequence % len(receivers)
+        sender_id = senders[sequence % len(senders)]
+        client = clients[(index + 1) % len(clients)]
+        async with semaphore:
+            sent_at[sequence] = time.perf_counter()
+            response = await client.post(
+                "/api/messages/",
+                json={"receiver_id": receivers[index], "message": f"load test {sequence}"},
+                headers={"Authorization": f"Bearer {sender_tokens[sender_id]}"},
+            )
+            post_timings.append((time.perf_counter() - sent_at[sequence]) * 1000)
+            response.raise_for_status()
+
+    sends = []
+    started = time.perf_counter()
+    for sequence in range(args.messages):
+        sends.append(asyncio.create_task(send(sequence)))
+        await asyncio.sleep(max(0.0, started + (sequence + 1) / args.rate - time.perf_counter()))
+    await asyncio.gather(*sends)
+    report["send_seconds"] = round(time.perf_counter() - started, 2)
+    deadline = time.perf_counter() + args.drain_seconds
+    while len(delivery) < args.messages and time.perf_counter() < deadline:
+        await asyncio.sleep(0.1)
+
+    report["post"] = percentiles(post_timings)
+    report["delivery"] = percentiles(delivery)
+    report["lost"] = args.messages - len(delivery)
+    report["idle_dropped"] = sum(1 for websocket in idle if websocket.close_code is not None)
+    report["rss_mb_after"] = rss_mb(args.server_pid)
+    if args.server_pid and report["rss_mb_before"] is not None:
+        report["rss_kb_per_connection"] = round(
+            (report["rss_mb_connected"] - report["rss_mb_before"]) * 1024 / (args.idle + args.active), 1
+        )
+
+    for task in receivers_tasks:
+        task.cancel()
+    await asyncio.gather(*[websocket.close() for websocket in idle + active], return_exceptions=True)
+    for client in clients:
+        await client.aclose()
+    print(json.dumps(report, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", required=True, help="database the servers use, to pick user ids")
+    parser.add_argument("--base-url", action="append", required=True, help="a running server; repeat for several")
+    parser.add_argument("--server-pid", type=int, action="append", default=[], help="server process to measure RSS of")
+    parser.add_argument("--idle", type=int, default=2000)
+    parser.add_argument("--active", type=int, default=100)
+    parser.add_argument("--senders", type=int, default=20, help="concurrent senders")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=100, help="messages sent per second")
+    parser.add_argument("--drain-seconds", type=float, default=10, help="how long to wait for the last events")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
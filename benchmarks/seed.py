@@ -0,0 +1,262 @@
+"""
+Synthetic data for benchmarks.
+
+Listings are spread around a set of US metro areas so that proximity and
+location searches see a realistic density instead of a uniform scatter.
+Bookings are laid out per listing as a sequence of stays with gaps between
+them; reviews and messages are derived from the bookings. Everything is
+deterministic for a given seed.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.engine import Engine
+
+from app.core import geo, locations
+from app.core.passwords import get_password_hash
+from app.crud.listings import _search_vector
+from app.crud.messages import REBUILD_CONVERSATIONS_SQL
+from app.models.models import Booking, Listing, User
+
+METROS = [
+    # city, state, zip prefix, latitude, longitude
+    ("New York", "NY", "100", 40.7128, -74.0060),
+    ("Los Angeles", "CA", "900", 34.0522, -118.2437),
+    ("Chicago", "IL", "606", 41.8781, -87.6298),
+    ("Houston", "TX", "770", 29.7604, -95.3698),
+    ("Phoenix", "AZ", "850", 33.4484, -112.0740),
+    ("Philadelphia", "PA", "191", 39.9526, -75.1652),
+    ("San Antonio", "TX", "782", 29.4241, -98.4936),
+    ("San Diego", "CA", "921", 32.7157, -117.1611),
+    ("Dallas", "TX", "752", 32.7767, -96.7970),
+    ("Seattle", "WA", "981", 47.6062, -122.3321),
+    ("Denver", "CO", "802", 39.7392, -104.9903),
+    ("Boston", "MA", "021", 42.3601, -71.0589),
+    ("Portland", "OR", "972", 45.5152, -122.6784),
+    ("Portland", "ME", "041", 43.6591, -70.2568),
+    ("Atlanta", "GA", "303", 33.7490, -84.3880),
+    ("Miami", "FL", "331", 25.7617, -80.1918),
+    ("Minneapolis", "MN", "554", 44.9778, -93.2650),
+    ("Austin", "TX", "787", 30.2672, -97.7431),
+    ("Nashville", "TN", "372", 36.1627, -86.7816),
+    ("Salt Lake City", "UT", "841", 40.7608, -111.8910),
+]
+
+SPACE_TYPES = [
+    "garage", "basement", "attic", "shed", "storage_unit",
+    "warehouse", "closet", "room", "outdoor", "other",
+]
+ACCESS_TYPES = ["24/7", "scheduled", "weekdays", "by appointment"]
+FEATURES = [
+    "climate controlled", "security camera", "ground floor", "drive-up access",
+    "lockable", "dry", "lighting", "power outlet", "shelving", "gated",
+]
+# Roughly 0.3 degrees of spread, i.e. a metro area about 40 miles across
+METRO_SPREAD_DEGREES = 0.3
+
+# Every seeded user can log in with this password
+BENCH_PASSWORD = "benchmark-password"
+BOOKINGS_START = datetime(2026, 1, 1)
+BOOKING_MONTHS = [1, 1, 2, 3, 3, 6, 12]
+BOOKING_STATUSES = ["confirmed", "completed", "pending", "cancelled"]
+BOOKING_STATUS_WEIGHTS = [50, 25, 15, 10]
+PLATFORM_FEE_PERCENT = 10
+
+
+def ensure_host(engine: Engine, username: str = "bench_host") -> int:
+    """Return the id of the benchmark host user, creating it if needed"""
+    with engine.begin() as conn:
+        host_id = conn.execute(
+            text("SELECT id FROM users WHERE username = :username"), {"username": username}
+        ).scalar()
+        if host_id is None:
+            host_id = conn.execute(
+                insert(User).returning(User.id),
+                {
+                    "username": username,
+                    "email": f"{username}@example.com",
+                    "hashed_password": "!",  # unusable, the host never logs in
+                    "is_host": True,
+                    "is_admin": False,
+                },
+            ).scalar()
+    return host_id
+
+
+def bench_username(i: int) -> str:
+    return f"bench_user_{i}"
+
+
+def generate_users(count: int, hashed_password: str, rng: random.Random) -> Iterator[Dict]:
+    """Yield user rows, about a fifth of them hosts"""
+    for i in range(count):
+        username = bench_username(i)
+        yield {
+            "username": username,
+            "email": f"{username}@example.com",
+            "hashed_password": hashed_password,
+            "full_name": f"Bench User {i}",
+            "is_host": rng.random() < 0.2,
+            "is_admin": False,
+        }
+
+
+def seed_users(engine: Engine, count: int, batch_size: int = 5000, seed: int = 42) -> None:
+    """Insert ``count`` users sharing BENCH_PASSWORD (hashed once, at the configured cost)"""
+    rng = random.Random(seed)
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+    _insert_batches(engine, User, generate_users(count, hashed_password, rng), batch_size)
+
+
+def generate_listings(count: int, host_ids: Sequence[int], rng: random.Random) -> Iterator[Dict]:
+    """Yield listing rows clustered around the metro areas"""
+    for i in range(count):
+        host_id = rng.choice(host_ids)
+        city, state, zip_prefix, lat, lon = rng.choice(METROS)
+        latitude = rng.gauss(lat, METRO_SPREAD_DEGREES / 2)
+        longitude = rng.gauss(lon, METRO_SPREAD_DEGREES / 2)
+        space_type = rng.choice(SPACE_TYPES)
+        zip_code = f"{zip_prefix}{rng.randint(0, 99):02d}"
+        yield {
+            "host_id": host_id,
+            "title": f"{space_type.replace('_', ' ').title()} in {city} #{i}",
+            "description": f"Clean {space_type.replace('_', ' ')} available for long-term storage.",
+            "space_type": space_type,
+            "size": rng.randint(20, 1000),
+            "price_per_month": rng.randint(20, 600) * 100,
+            "address": f"{rng.randint(1, 9999)} Main St",
+            "city": city,
+            "state": state,
+            "zip_code": zip_code,
+            "country": "United States",
+            "location_key": locations.location_key(city, state, zip_code),
+            "latitude": latitude,
+            "longitude": longitude,
+            "geo_cell": geo.geo_cell(latitude),
+            "images": [f"https://example.com/images/{i}.jpg"],
+            "features": rng.sample(FEATURES, rng.randint(0, 4)),
+            "access_type": rng.choice(ACCESS_TYPES),
+            "is_active": rng.random() > 0.05,
+        }
+
+
+def seed_listings(engine: Engine, count: int, batch_size: int = 5000, seed: int = 42,
+                  host_ids: Optional[Sequence[int]] = None) -> None:
+    """Insert ``count`` synthetic listings in batches, owned by ``host_ids`` or the benchmark host"""
+    rng = random.Random(seed)
+    if not host_ids:
+        host_ids = [ensure_host(engine)]
+    _insert_batches(engine, Listing, generate_listings(count, host_ids, rng), batch_size)
+    # Full-text documents, as the API would have built them on create
+    with engine.begin() as conn:
+        conn.execute(
+            update(Listing)
+            .where(Listing.search_vector.is_(None))
+            .values(search_vector=_search_vector(Listing.title, Listing.description, Listing.features))
+        )
+        conn.execute(text("ANALYZE listings"))
+
+
+def generate_bookings(listings: Sequence[Tuple[int, int]], renter_ids: Sequence[int], per_listing: float,
+                      rng: random.Random) -> Iterator[Dict]:
+    """
+    Yield bookings for (listing id, monthly price) pairs: each listing gets on average
+    ``per_listing`` stays, one after another from BOOKINGS_START with gaps between them
+    """
+    for listing_id, price in listings:
+        cursor = BOOKINGS_START + timedelta(days=rng.randint(0, 90))
+        for _ in range(rng.randint(0, round(per_listing * 2))):
+            months = rng.choice(BOOKING_MONTHS)
+            end = cursor + timedelta(days=30 * months)
+            total_price = price * months
+            yield {
+                "listing_id": listing_id,
+                "renter_id": rng.choice(renter_ids),
+                "start_date": cursor,
+                "end_date": end,
+                "total_price": total_price,
+                "platform_fee": total_price * PLATFORM_FEE_PERCENT // 100,
+                "status": rng.choices(BOOKING_STATUSES, BOOKING_STATUS_WEIGHTS)[0],
+                "payment_status": "paid",
+                "created_at": cursor - timedelta(days=rng.randint(1, 30)),
+            }
+            cursor = end + timedelta(days=rng.randint(0, 60))
+
+
+def seed_bookings(engine: Engine, per_listing: float, batch_size: int = 5000, seed: int = 42) -> None:
+    """Insert bookings for every active listing, with seeded users as renters"""
+    rng = random.Random(seed)
+    with engine.connect() as conn:
+        renter_ids = conn.execute(select(User.id).where(User.is_host.is_(False))).scalars().all()
+        listings = conn.execute(
+            select(Listing.id, Listing.price_per_month).where(Listing.is_active.is_(True)).order_by(Listing.id)
+        ).all()
+    _insert_batches(engine, Booking, generate_bookings(listings, renter_ids, per_listing, rng), batch_size)
+
+
+def seed_reviews_and_messages(engine: Engine, review_fraction: float = 0.6, messages_per_booking: int = 3) -> None:
+    """
+    Derive reviews of completed bookings (renter reviews host) and message threads for
+    every booking in SQL, then the inbox rows; ids pick which bookings get a review, so
+    reruns match. The last message about a pending booking is left unread.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO reviews (booking_id, reviewer_id, reviewed_id, listing_id, rating, comment, is_public, created_at)
+            SELECT b.id, b.renter_id, l.host_id, l.id, 3 + b.id % 3,
+                   'Synthetic review for booking ' || b.id, true, b.end_date + interval '3 days'
+            FROM bookings b JOIN listings l ON l.id = b.listing_id
+            WHERE b.status = 'completed' AND b.id % 100 < :percent
+        """), {"percent": round(review_fraction * 100)})
+        conn.execute(text("""
+            INSERT INTO messages (sender_id, receiver_id, listing_id, booking_id, message, is_read, created_at, conversation_key)
+            SELECT CASE WHEN n % 2 = 1 THEN b.renter_id ELSE l.host_id END,
+                   CASE WHEN n % 2 = 1 THEN l.host_id ELSE b.renter_id END,
+                   l.id, b.id, 'Synthetic message ' || n || ' about booking ' || b.id,
+                   NOT (b.status = 'pending' AND n = :count),
+                   b.created_at + n * interval '1 hour',
+                   least(b.renter_id, l.host_id) || ':' || greatest(b.renter_id, l.host_id)
+            FROM bookings b JOIN listings l ON l.id = b.listing_id
+            CROSS JOIN generate_series(1, :count) AS n
+            ORDER BY b.created_at, n
+        """), {"count": messages_per_booking})
+        conn.execute(REBUILD_CONVERSATIONS_SQL)
+
+
+def analyze(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for table in ("users", "listings", "bookings", "reviews", "messages", "conversations"):
+            conn.execute(text(f"ANALYZE {table}"))
+
+
+def _insert_batches(engine: Engine, model, rows: Iterator[Dict], batch_size: int) -> None:
+    batch: List[Dict] = []
+    with engine.begin() as conn:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.execute(insert(model), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(model), batch)
+        conn.execute(text(f"ANALYZE {model.__tablename__}"))
+
+
+def reset_all(engine: Engine) -> None:
+    """Remove every user, listing, booking, review and message from the benchmark database"""
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE users, listings, bookings, reviews, messages RESTART IDENTITY CASCADE"))
+
+
+def reset_listings(engine: Engine) -> None:
+    """Remove every listing (and dependent rows) from the benchmark database"""
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE listings RESTART IDENTITY CASCADE"))
+
+
+def reset_bookings(engine: Engine) -> None:
+    """Remove every booking (and the reviews and messages of bookings) from the benchmark database"""
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE bookings RESTART IDENTITY CASCADE"))
@@ -0,0 +1,117 @@
+"""
+Concurrent-request throughput benchmark against a running API server.
+
+Runs a mixed authenticated workload (current user, listing detail and
+uncached listing searches) with a fixed number of concurrent clients and
+reports requests per second and latency percentiles per endpoint.
+
+Usage:
+    uvicorn app.main:app --workers 1 --port 8000 &
+    python -m benchmarks.throughput --base-url http://localhost:8000 --token <JWT>
+
+Mint a token for an existing user with
+``python -c "from app.core.security import create_access_token; print(create_access_token({'sub': '1'}))"``
+using the server's SECRET_KEY.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+CITIES = ["portland", "denver", "austin", "seattle", "phoenix", "chicago"]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def next_request(rng: random.Random, max_listing_id: int):
+    """Pick the next (endpoint name, path, params) of the mixed workload"""
+    roll = rng.random()
+    if roll < 0.4:
+        return "users_me", "/api/users/me", None
+    if roll < 0.8:
+        return "listing_detail", f"/api/listings/{rng.randint(1, max_listing_id)}", None
+    # A random price floor keeps searches out of the response cache
+    params = {"location": rng.choice(CITIES), "min_price": rng.randint(0, 50000), "limit": 20}
+    return "listing_search", "/api/listings/", params
+
+
+async def worker(client: httpx.AsyncClient, deadline: float, seed: int, max_listing_id: int,
+                 timings: Dict[str, List[float]], errors: Dict[str, int]) -> None:
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        name, path, params = next_request(rng, max_listing_id)
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, params=params)
+            ok = response.status_code < 500
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            timings[name].append((time.perf_counter() - start) * 1000)
+        else:
+            errors[name] += 1
+
+
+async def run(args) -> Dict:
+    timings: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    headers = {"Authorization": f"Bearer {args.token}"}
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, limits=limits, timeout=60) as client:
+        # Warm up connections and server caches
+        await asyncio.gather(*[
+            worker(client, time.perf_counter() + args.warmup, seed, args.max_listing_id, defaultdict(list), defaultdict(int))
+            for seed in range(args.concurrency)
+        ])
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            worker(client, start + args.duration, 1000 + seed, args.max_listing_id, timings, errors)
+            for seed in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+
+    all_timings = [value for values in timings.values() for value in values]
+    result = {
+        "concurrency": args.concurrency,
+        "requests": len(all_timings),
+        "errors": sum(errors.values()),
+        "rps": round(len(all_timings) / elapsed, 1),
+        "endpoints": {},
+    }
+    for name, values in sorted(timings.items()):
+        result["endpoints"][name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "p50_ms": round(statistics.median(values), 2),
+            "p95_ms": round(percentile(values, 0.95), 2),
+            "p99_ms": round(percentile(values, 0.99), 2),
+        }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", required=True)
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--max-listing-id", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        level = argparse.Namespace(**{**vars(args), "concurrency": concurrency})
+        print(json.dumps(asyncio.run(run(level))), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""add listing location_key with trigram and equality indexes
+
+Revision ID: 2ef8b43cf617
+Revises: 80cb4afe5559
+Create Date: 2025-04-25 11:28:40.716094
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2ef8b43cf617'
+down_revision = '80cb4afe5559'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('listings', sa.Column('location_key', sa.String(), nullable=True))
+    # Must match app.core.locations.location_key
+    op.execute(
+        "UPDATE listings SET location_key = "
+        "lower(regexp_replace(trim(city || ' ' || state || ' ' || zip_code), '\\s+', ' ', 'g'))"
+    )
+
+    # pg_trgm ships with the standard Postgres images; where it is unavailable the
+    # substring match still works, it just falls back to a sequential scan
+    bind = op.get_bind()
+    has_trgm = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if has_trgm:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            'ix_listings_location_key_trgm', 'listings', ['location_key'], unique=False,
+            postgresql_using='gin', postgresql_ops={'location_key': 'gin_trgm_ops'},
+        )
+
+    op.create_index('ix_listings_lower_city', 'listings', [sa.text('lower(city)')], unique=False)
+    op.create_index('ix_listings_lower_state', 'listings', [sa.text('lower(state)')], unique=False)
+    op.create_index('ix_listings_zip_code', 'listings', ['zip_code'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_zip_code', table_name='listings')
+    op.drop_index('ix_listings_lower_state', table_name='listings')
+    op.drop_index('ix_listings_lower_city', table_name='listings')
+    op.execute("DROP INDEX IF EXISTS ix_listings_location_key_trgm")
+    op.drop_column('listings', 'location_key')
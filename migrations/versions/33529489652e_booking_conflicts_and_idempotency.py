@@ -0,0 +1,41 @@
+"""add booking overlap exclusion constraint and idempotency keys
+
+Revision ID: 33529489652e
+Revises: c4cfa9a98de0
+Create Date: 2026-10-18 13:40:05.917362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '33529489652e'
+down_revision = 'c4cfa9a98de0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('bookings', sa.Column('idempotency_key', sa.String(), nullable=True))
+    op.create_unique_constraint(
+        'uq_bookings_renter_id_idempotency_key', 'bookings', ['renter_id', 'idempotency_key']
+    )
+    # Fails if pending/confirmed bookings already overlap; cancel the duplicates first.
+    # Building the constraint's index locks bookings against writes until it finishes.
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT ex_bookings_listing_id_period_active "
+        "EXCLUDE USING gist (int4range(listing_id, listing_id, '[]') WITH &&, tsrange(start_date, end_date, '[)') WITH &&) "
+        "WHERE (status IN ('pending', 'confirmed'))"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index('ix_bookings_renter_id_id', 'bookings', ['renter_id', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_bookings_listing_id_id', 'bookings', ['listing_id', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_listing_id_id', table_name='bookings')
+    op.drop_index('ix_bookings_renter_id_id', table_name='bookings')
+    op.drop_constraint('ex_bookings_listing_id_period_active', 'bookings')
+    op.drop_constraint('uq_bookings_renter_id_idempotency_key', 'bookings', type_='unique')
+    op.drop_column('bookings', 'idempotency_key')
@@ -0,0 +1,28 @@
+"""add listing indexes for keyset pagination
+
+Revision ID: 80cb4afe5559
+Revises: d87296df049d
+Create Date: 2025-04-23 14:05:52.193846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '80cb4afe5559'
+down_revision = 'd87296df049d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_listings_created_at_id', 'listings', ['created_at', 'id'], unique=False)
+    op.create_index('ix_listings_price_per_month_id', 'listings', ['price_per_month', 'id'], unique=False)
+    op.create_index('ix_listings_host_id_id', 'listings', ['host_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_host_id_id', table_name='listings')
+    op.drop_index('ix_listings_price_per_month_id', table_name='listings')
+    op.drop_index('ix_listings_created_at_id', table_name='listings')
@@ -0,0 +1,56 @@
+"""add listing search_vector with full-text GIN index
+
+Revision ID: 99eb783cc02f
+Revises: 2ef8b43cf617
+Create Date: 2025-04-28 09:14:22.301845
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '99eb783cc02f'
+down_revision = '2ef8b43cf617'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+# Must match app.crud.listings._search_vector
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(array_to_string(features, ' '), '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.add_column('listings', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text("SELECT max(id) FROM listings")).scalar() or 0
+
+    # Commit each batch so the backfill never holds row locks on the whole table,
+    # and build the index without blocking writes
+    with op.get_context().autocommit_block():
+        for start in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+            bind.execute(
+                sa.text(
+                    f"UPDATE listings SET search_vector = {SEARCH_VECTOR_SQL} "
+                    "WHERE id >= :start AND id < :end"
+                ),
+                {"start": start, "end": start + BACKFILL_BATCH_SIZE},
+            )
+        op.create_index(
+            'ix_listings_search_vector', 'listings', ['search_vector'], unique=False,
+            postgresql_using='gin', postgresql_concurrently=True,
+        )
+        # Selectivity estimates for @@ come from the column statistics
+        op.execute("ANALYZE listings")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_search_vector', table_name='listings')
+    op.drop_column('listings', 'search_vector')
@@ -0,0 +1,80 @@
+"""add message conversation_key and conversations inbox table
+
+Revision ID: 9d1051b95249
+Revises: 33529489652e
+Create Date: 2026-10-18 16:02:31.448190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d1051b95249'
+down_revision = '33529489652e'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+# Must match app.crud.messages.conversation_key
+CONVERSATION_KEY_SQL = "least(sender_id, receiver_id) || ':' || greatest(sender_id, receiver_id)"
+
+# Must match app.crud.messages.REBUILD_CONVERSATIONS_SQL
+REBUILD_CONVERSATIONS_SQL = """
+    INSERT INTO conversations (user_id, other_user_id, last_message_id, unread_count)
+    SELECT p.user_id, p.other_user_id, max(m.id),
+           count(*) FILTER (WHERE m.receiver_id = p.user_id AND m.sender_id <> p.user_id AND NOT coalesce(m.is_read, false))
+    FROM messages m
+    CROSS JOIN LATERAL (VALUES (m.sender_id, m.receiver_id), (m.receiver_id, m.sender_id)) AS p (user_id, other_user_id)
+    GROUP BY p.user_id, p.other_user_id
+    ON CONFLICT (user_id, other_user_id) DO UPDATE
+    SET last_message_id = excluded.last_message_id, unread_count = excluded.unread_count
+"""
+
+
+def upgrade() -> None:
+    op.add_column('messages', sa.Column('conversation_key', sa.String(), nullable=True))
+    op.create_table(
+        'conversations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('other_user_id', sa.Integer(), nullable=False),
+        sa.Column('last_message_id', sa.Integer(), nullable=True),
+        sa.Column('unread_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['other_user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['last_message_id'], ['messages.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'other_user_id', name='uq_conversations_user_id_other_user_id'),
+    )
+    op.create_index('ix_conversations_user_id_last_message_id', 'conversations', ['user_id', 'last_message_id'], unique=False)
+
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text("SELECT max(id) FROM messages")).scalar() or 0
+
+    # Commit each batch so the backfill never holds row locks on the whole table,
+    # and build the index without blocking writes
+    with op.get_context().autocommit_block():
+        for start in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+            bind.execute(
+                sa.text(
+                    f"UPDATE messages SET conversation_key = {CONVERSATION_KEY_SQL} "
+                    "WHERE id >= :start AND id < :end"
+                ),
+                {"start": start, "end": start + BACKFILL_BATCH_SIZE},
+            )
+        op.create_index(
+            'ix_messages_conversation_key_id', 'messages', ['conversation_key', 'id'], unique=False,
+            postgresql_concurrently=True,
+        )
+        bind.execute(sa.text(REBUILD_CONVERSATIONS_SQL))
+        op.execute("ANALYZE messages")
+        op.execute("ANALYZE conversations")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_key_id', table_name='messages')
+    op.drop_index('ix_conversations_user_id_last_message_id', table_name='conversations')
+    op.drop_table('conversations')
+    op.drop_column('messages', 'conversation_key')
@@ -0,0 +1,32 @@
+"""add partial index on active bookings for availability search
+
+Revision ID: c4cfa9a98de0
+Revises: 99eb783cc02f
+Create Date: 2026-10-18 10:12:47.518230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4cfa9a98de0'
+down_revision = '99eb783cc02f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Only pending and confirmed bookings block dates; cancelled and completed
+    # ones, most of the table over time, stay out of the index
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bookings_listing_id_start_date_active', 'bookings',
+            ['listing_id', 'start_date', 'end_date'], unique=False,
+            postgresql_where=sa.text("status IN ('pending', 'confirmed')"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_listing_id_start_date_active', table_name='bookings')
@@ -0,0 +1,35 @@
+"""add listing geo_cell for indexed proximity search
+
+Revision ID: d87296df049d
+Revises: 6d17d8734165
+Create Date: 2025-04-22 09:41:07.552310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd87296df049d'
+down_revision = '6d17d8734165'
+branch_labels = None
+depends_on = None
+
+# Must match app.core.geo.GEO_CELLS_PER_DEGREE
+GEO_CELLS_PER_DEGREE = 10
+
+
+def upgrade() -> None:
+    op.add_column('listings', sa.Column('geo_cell', sa.Integer(), nullable=True))
+    op.execute(
+        f"UPDATE listings SET geo_cell = floor((latitude + 90.0) * {GEO_CELLS_PER_DEGREE}) "
+        "WHERE latitude IS NOT NULL"
+    )
+    op.create_index(
+        'ix_listings_geo_cell_longitude', 'listings', ['geo_cell', 'longitude'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_geo_cell_longitude', table_name='listings')
+    op.drop_column('listings', 'geo_cell')
@@ -9,6 +9,10 @@ alembic upgrade head
 echo "Starting FastAPI application..."
 if [ "$ENVIRONMENT" = "production" ]; then
   echo "Running in production mode"
+  # Workers share metrics through this directory; stale files would replay old counters
+  export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-multiproc}"
+  mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+  rm -f "$PROMETHEUS_MULTIPROC_DIR"/*.db
   gunicorn -k uvicorn.workers.UvicornWorker -b 0.0.0.0:5000 app.main:app --workers 4
 else
   echo "Running in development mode"
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.database import async_database_url
+from app.models.models import User
+
+
+@pytest.fixture(scope="session")
+def database_url():
+    """Migrated PostgreSQL database for the tests that need one; skips them when it is not set"""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    return async_database_url(url)
+
+
+@pytest.fixture
+def engine(database_url):
+    # NullPool: tests run their scenarios with asyncio.run, and an asyncpg
+    # connection cannot be reused from another event loop
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def session_factory(engine):
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@pytest.fixture
+def make_user(session_factory):
+    """Creates users for a test; they are deleted afterwards, with everything that cascades from them"""
+    created = []
+
+    async def create(is_host: bool) -> User:
+        name = f"test_{uuid.uuid4().hex[:12]}"
+        async with session_factory() as db:
+            user = User(username=name, email=f"{name}@example.com", hashed_password="x", is_host=is_host)
+            db.add(user)
+            await db.commit()
+            return user
+
+    def make_user(is_host: bool = False) -> User:
+        user = asyncio.run(create(is_host))
+        created.append(user.id)
+        return user
+
+    yield make_user
+
+    async def cleanup():
+        async with session_factory() as db:
+            await db.execute(delete(User).where(User.id.in_(created)))
+            await db.commit()
+
+    if created:
+        asyncio.run(cleanup())
+
+
+@pytest.fixture
+def host(make_user) -> User:
+    return make_user(is_host=True)
@@ -0,0 +1,125 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.core.principals import Principal
+from app.crud import bookings
+from app.models.models import Booking, Listing
+from app.schemas.bookings import BookingCreate, BookingUpdate
+
+
+def test_status_transitions():
+    bookings.check_transition("pending", "confirmed", {bookings.HOST})
+    bookings.check_transition("confirmed", "cancelled", {bookings.RENTER})
+    bookings.check_transition("pending", "confirmed", set(), is_admin=True)
+    with pytest.raises(HTTPException) as exc_info:
+        bookings.check_transition("pending", "confirmed", {bookings.RENTER})
+    assert exc_info.value.status_code == 403
+    with pytest.raises(HTTPException) as exc_info:
+        bookings.check_transition("cancelled", "confirmed", {bookings.HOST}, is_admin=True)
+    assert exc_info.value.status_code == 409
+
+
+# Connections the concurrent scenarios may hold at once, below Postgres' default max_connections
+MAX_CONCURRENT_SESSIONS = 50
+
+
+async def _attempt(session_factory, semaphore, request, renter_id, idempotency_key=None):
+    async with semaphore, session_factory() as db:
+        try:
+            db_booking, created = await bookings.create_booking(db, request, renter_id, idempotency_key)
+        except HTTPException as e:
+            return e.status_code
+        return db_booking.id, created
+
+
+@pytest.fixture
+def listing(session_factory, host):
+    async def create():
+        async with session_factory() as db:
+            listing = Listing(
+                host_id=host.id, title="Popular unit", space_type="storage_unit", size=100, price_per_month=15000,
+                address="1 Main St", city="Austin", state="TX", zip_code="78701", country="US",
+            )
+            db.add(listing)
+            await db.commit()
+            return listing
+    return asyncio.run(create())
+
+
+def test_concurrent_bookings_for_overlapping_dates_have_one_winner(session_factory, listing, make_user):
+    renter_ids = [make_user().id for _ in range(10)]
+
+    async def scenario():
+        rng = random.Random(7)
+        # Every window contains June 2026, so any two of them overlap
+        requests = [
+            BookingCreate(
+                listing_id=listing.id,
+                start_date=datetime(2026, 5, 1) + timedelta(days=rng.randint(0, 31)),
+                end_date=datetime(2026, 7, 1) + timedelta(days=rng.randint(0, 31)),
+            )
+            for _ in range(300)
+        ]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SESSIONS)
+        results = await asyncio.gather(*[
+            _attempt(session_factory, semaphore, request, rng.choice(renter_ids)) for request in requests
+        ])
+        winners = [result for result in results if isinstance(result, tuple)]
+        assert len(winners) == 1
+        assert sorted(set(result for result in results if not isinstance(result, tuple))) == [409]
+        async with session_factory() as db:
+            count = await db.scalar(select(func.count()).select_from(Booking).where(Booking.listing_id == listing.id))
+        assert count == 1
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_retries_with_one_idempotency_key_create_one_booking(session_factory, listing, make_user):
+    renter = make_user()
+
+    async def scenario():
+        request = BookingCreate(listing_id=listing.id, start_date=datetime(2026, 6, 1), end_date=datetime(2026, 9, 1))
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SESSIONS)
+        results = await asyncio.gather(*[
+            _attempt(session_factory, semaphore, request, renter.id, idempotency_key="retry-me") for _ in range(50)
+        ])
+        assert len({booking_id for booking_id, _ in results}) == 1
+        assert sum(created for _, created in results) == 1
+
+    asyncio.run(scenario())
+
+
+def test_update_cannot_extend_a_booking_past_the_offered_period(session_factory, host, make_user):
+    renter = make_user()
+    principal = Principal(renter.id, renter.username, False, False)
+
+    async def scenario():
+        async with session_factory() as db:
+            listing = Listing(
+                host_id=host.id, title="Summer unit", space_type="garage", size=100, price_per_month=15000,
+                address="1 Main St", city="Austin", state="TX", zip_code="78701", country="US",
+                available_to=datetime(2026, 9, 1),
+            )
+            db.add(listing)
+            await db.commit()
+            request = BookingCreate(listing_id=listing.id, start_date=datetime(2026, 6, 1), end_date=datetime(2026, 7, 1))
+            db_booking, _ = await bookings.create_booking(db, request, renter.id)
+
+        for end_date in (datetime(2026, 9, 2), None):
+            async with session_factory() as db:
+                with pytest.raises(HTTPException) as exc_info:
+                    await bookings.update_booking(db, db_booking.id, BookingUpdate(end_date=end_date), principal)
+                assert exc_info.value.status_code == 400
+        async with session_factory() as db:
+            updated = await bookings.update_booking(
+                db, db_booking.id, BookingUpdate(end_date=datetime(2026, 9, 1)), principal
+            )
+            assert updated.end_date == datetime(2026, 9, 1)
+            assert updated.total_price > db_booking.total_price
+
+    asyncio.run(scenario())
@@ -0,0 +1,49 @@
+from app.core.cache import ResponseCache
+
+
+def make_cache(**kwargs):
+    options = {"max_entries": 2, "max_bytes": 1024, "ttl_seconds": 60}
+    options.update(kwargs)
+    return ResponseCache("test", **options)
+
+
+def test_hit_after_set():
+    cache = make_cache()
+    cache.set("a", b"[]", {"X-Next-Cursor": "abc"}, cache.generation)
+    cached = cache.get("a")
+    assert cached.body == b"[]"
+    assert cached.headers == {"X-Next-Cursor": "abc"}
+
+
+def test_lru_eviction():
+    cache = make_cache()
+    cache.set("a", b"1", {}, cache.generation)
+    cache.set("b", b"2", {}, cache.generation)
+    cache.get("a")
+    cache.set("c", b"3", {}, cache.generation)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_byte_budget():
+    cache = make_cache(max_entries=10, max_bytes=10)
+    cache.set("a", b"123456", {}, cache.generation)
+    cache.set("b", b"123456", {}, cache.generation)
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_invalidate_drops_entries():
+    cache = make_cache()
+    cache.set("a", b"1", {}, cache.generation)
+    cache.invalidate()
+    assert cache.get("a") is None
+
+
+def test_response_built_before_write_is_not_cached():
+    cache = make_cache()
+    generation = cache.generation
+    cache.invalidate()
+    cache.set("a", b"stale", {}, generation)
+    assert cache.get("a") is None
@@ -0,0 +1,66 @@
+import asyncio
+import uuid
+
+from app.crud import listings
+from app.schemas.listings import ListingCreate, ListingFilters
+
+
+def test_range_facet_buckets_are_inclusive_and_contiguous():
+    buckets = listings._range_facet({0: 3, 2: 1}, [5000, 10000])
+    assert buckets == [
+        {"min": 0, "max": 4999, "count": 3},
+        {"min": 5000, "max": 9999, "count": 0},
+        {"min": 10000, "max": None, "count": 1},
+    ]
+
+
+def test_value_facet_drops_empty_and_missing_values():
+    assert listings._value_facet({"shed": 2, "attic": 2, "garage": 0, None: 4, "room": 3}) == [
+        {"value": "room", "count": 3}, {"value": "attic", "count": 2}, {"value": "shed", "count": 2},
+    ]
+
+
+def test_facet_counts_bucket_boundaries_and_own_filters(session_factory, host):
+    token = f"facettest{uuid.uuid4().hex[:12]}"
+    # (price in cents, size, space type, access type, active) around the bucket bounds
+    rows = [
+        (4999, 24, "garage", "24/7", True),
+        (5000, 25, "garage", "24/7", True),
+        (9999, 49, "shed", "scheduled", True),
+        (10000, 50, "shed", None, True),
+        (50000, 500, "attic", "24/7", True),
+        (20000, 200, "garage", "scheduled", False),
+    ]
+
+    async def scenario():
+        async with session_factory() as db:
+            for price, size, space_type, access_type, is_active in rows:
+                await listings.create_listing(db, ListingCreate(
+                    title=f"{token} unit", space_type=space_type, size=size, price_per_month=price,
+                    address="1 Main St", city="Austin", state="TX", zip_code="78701", country="US",
+                    access_type=access_type, is_active=is_active,
+                ), host.id)
+        async with session_factory() as db:
+            return (
+                await listings.get_listing_facets(db, ListingFilters(q=token)),
+                await listings.get_listing_facets(db, ListingFilters(q=token, space_type="garage", min_price=5000)),
+            )
+
+    unfiltered, filtered = asyncio.run(scenario())
+    assert unfiltered["total"] == 5
+    assert unfiltered["space_type"] == [
+        {"value": "garage", "count": 2}, {"value": "shed", "count": 2}, {"value": "attic", "count": 1},
+    ]
+    assert [bucket["count"] for bucket in unfiltered["price"]] == [1, 2, 1, 0, 1]
+    assert [bucket["count"] for bucket in unfiltered["size"]] == [1, 2, 1, 0, 0, 1]
+    assert unfiltered["access_type"] == [{"value": "24/7", "count": 3}, {"value": "scheduled", "count": 1}]
+
+    # Only the $50.00 garage matches both filters
+    assert filtered["total"] == 1
+    # Space types are counted without the space type filter, prices without the price filter
+    assert filtered["space_type"] == [
+        {"value": "shed", "count": 2}, {"value": "attic", "count": 1}, {"value": "garage", "count": 1},
+    ]
+    assert [bucket["count"] for bucket in filtered["price"]] == [1, 1, 0, 0, 0]
+    assert [bucket["count"] for bucket in filtered["size"]] == [0, 1, 0, 0, 0, 0]
+    assert filtered["access_type"] == [{"value": "24/7", "count": 1}]
@@ -0,0 +1,34 @@
+from app.core import geo
+
+
+def test_bounding_box_contains_radius():
+    lat, lon, radius = 45.5152, -122.6784, 25
+    min_lat, max_lat, lon_ranges = geo.bounding_box(lat, lon, radius)
+    assert len(lon_ranges) == 1
+    min_lon, max_lon = lon_ranges[0]
+
+    # Points on the circle in every compass direction must fall inside the box
+    assert geo.haversine_miles(lat, lon, max_lat, lon) >= radius
+    assert geo.haversine_miles(lat, lon, min_lat, lon) >= radius
+    assert geo.haversine_miles(lat, lon, lat, max_lon) >= radius
+    assert geo.haversine_miles(lat, lon, lat, min_lon) >= radius
+
+
+def test_bounding_box_wraps_antimeridian():
+    _, _, lon_ranges = geo.bounding_box(0.0, 179.9, 50)
+    assert len(lon_ranges) == 2
+    assert lon_ranges[0][1] == 180.0
+    assert lon_ranges[1][0] == -180.0
+
+
+def test_bounding_box_near_pole_covers_all_longitudes():
+    _, max_lat, lon_ranges = geo.bounding_box(89.9, 10.0, 50)
+    assert max_lat == 90.0
+    assert lon_ranges == [(-180.0, 180.0)]
+
+
+def test_cells_between_covers_range():
+    cells = geo.cells_between(45.0, 45.35)
+    assert cells[0] == geo.geo_cell(45.0)
+    assert cells[-1] == geo.geo_cell(45.35)
+    assert len(cells) == 4
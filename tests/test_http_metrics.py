@@ -0,0 +1,59 @@
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.http_metrics import UNMATCHED, PrometheusMiddleware
+
+app = FastAPI()
+app.add_middleware(PrometheusMiddleware)
+
+@app.get("/things/{thing_id}")
+async def read_thing(thing_id: int):
+    if thing_id == 0:
+        raise HTTPException(status_code=404)
+    return {"id": thing_id}
+
+router = APIRouter(prefix="/widgets")
+
+@router.get("/{widget_id}")
+async def read_widget(widget_id: int):
+    return {"id": widget_id}
+
+app.include_router(router, prefix="/api")
+client = TestClient(app)
+
+
+def requests_total(endpoint, status):
+    value = REGISTRY.get_sample_value(
+        "http_requests_total", {"method": "GET", "endpoint": endpoint, "status": str(status)}
+    )
+    return value or 0
+
+
+def test_labels_by_route_template():
+    before_ok = requests_total("/things/{thing_id}", 200)
+    before_missing = requests_total("/things/{thing_id}", 404)
+    for thing_id in (0, 1, 2, 3):
+        client.get(f"/things/{thing_id}")
+    assert requests_total("/things/{thing_id}", 200) == before_ok + 3
+    assert requests_total("/things/{thing_id}", 404) == before_missing + 1
+    assert requests_total("/things/1", 200) == 0
+
+
+def test_unmatched_paths_share_a_label():
+    before = requests_total(UNMATCHED, 404)
+    client.get("/nope/1")
+    client.get("/nope/2")
+    assert requests_total(UNMATCHED, 404) == before + 2
+
+
+def test_included_router_keeps_its_prefix():
+    before = requests_total("/api/widgets/{widget_id}", 200)
+    client.get("/api/widgets/7")
+    assert requests_total("/api/widgets/{widget_id}", 200) == before + 1
+
+
+def test_docs_use_their_path():
+    before = requests_total("/openapi.json", 200)
+    client.get("/openapi.json")
+    assert requests_total("/openapi.json", 200) == before + 1
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.crud import listings
+from app.models.models import Booking, Listing
+from app.schemas.listings import ListingFilters
+
+
+def test_text_search_defaults_to_relevance_sort():
+    assert listings.resolve_sort(ListingFilters(q="climate controlled")) == "relevance"
+    with pytest.raises(HTTPException) as exc_info:
+        listings.resolve_sort(ListingFilters(), "relevance")
+    assert exc_info.value.status_code == 400
+
+
+def test_availability_filter_needs_an_ordered_window():
+    with pytest.raises(HTTPException) as exc_info:
+        listings._filtered_query(ListingFilters(available_start=date(2026, 6, 1)))
+    assert exc_info.value.status_code == 400
+    with pytest.raises(HTTPException):
+        listings._filtered_query(ListingFilters(available_start=date(2026, 6, 1), available_end=date(2026, 6, 1)))
+
+    query, _ = listings._filtered_query(ListingFilters(available_start=date(2026, 6, 1), available_end=date(2026, 7, 1)))
+    sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}))
+    # Inlined so the partial index on active bookings matches
+    assert "bookings.status IN ('pending', 'confirmed')" in sql
+
+
+def test_availability_filter_excludes_booked_and_unoffered_listings(session_factory, host, make_user):
+    renter = make_user()
+    # Window searched: June 2026, as [2026-06-01, 2026-07-01)
+    bookings_by_listing = {
+        "free": [],
+        "pending_overlap": [("pending", datetime(2026, 6, 10), datetime(2026, 6, 20))],
+        "confirmed_overlap": [("confirmed", datetime(2026, 5, 20), datetime(2026, 6, 2))],
+        "cancelled_overlap": [("cancelled", datetime(2026, 6, 1), datetime(2026, 7, 1))],
+        "completed_overlap": [("completed", datetime(2026, 5, 1), datetime(2026, 6, 15))],
+        "ends_at_start": [("confirmed", datetime(2026, 5, 1), datetime(2026, 6, 1))],
+        "starts_at_end": [("pending", datetime(2026, 7, 1), datetime(2026, 8, 1))],
+        "open_ended_before": [("confirmed", datetime(2026, 3, 1), None)],
+        "open_ended_after": [("pending", datetime(2026, 8, 1), None)],
+    }
+    offered = {
+        "offered_too_late": (datetime(2026, 6, 15), None),
+        "offered_too_briefly": (None, datetime(2026, 6, 20)),
+        "offered_exactly": (datetime(2026, 6, 1), datetime(2026, 7, 1)),
+    }
+
+    async def scenario():
+        async with session_factory() as db:
+            by_title = {}
+            for title in list(bookings_by_listing) + list(offered):
+                available_from, available_to = offered.get(title, (None, None))
+                by_title[title] = Listing(
+                    host_id=host.id, title=title, space_type="garage", size=100, price_per_month=10000,
+                    address="1 Main St", city="Austin", state="TX", zip_code="78701", country="US",
+                    available_from=available_from, available_to=available_to,
+                )
+            db.add_all(by_title.values())
+            await db.flush()
+            db.add_all([
+                Booking(
+                    listing_id=by_title[title].id, renter_id=renter.id, start_date=start, end_date=end,
+                    total_price=10000, platform_fee=1000, status=booking_status,
+                )
+                for title, bookings in bookings_by_listing.items()
+                for booking_status, start, end in bookings
+            ])
+            await db.commit()
+        query, _ = listings._filtered_query(
+            ListingFilters(available_start=date(2026, 6, 1), available_end=date(2026, 7, 1))
+        )
+        async with session_factory() as db:
+            result = await db.execute(query.where(Listing.host_id == host.id))
+            return sorted(listing.title for listing in result.scalars())
+
+    assert asyncio.run(scenario()) == [
+        "cancelled_overlap", "completed_overlap", "ends_at_start", "free",
+        "offered_exactly", "open_ended_after", "starts_at_end",
+    ]
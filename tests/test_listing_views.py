@@ -0,0 +1,41 @@
+import asyncio
+import uuid
+
+from pydantic import TypeAdapter
+
+from app.crud import listings
+from app.schemas.listings import ListingCreate, ListingFilters, ListingSummary
+
+
+def test_summary_view_pages_like_the_full_view(session_factory, host):
+    token = f"viewtest{uuid.uuid4().hex[:12]}"
+
+    async def scenario():
+        async with session_factory() as db:
+            for price, images in [(3000, ["first.jpg", "second.jpg"]), (1000, None), (2000, [])]:
+                await listings.create_listing(db, ListingCreate(
+                    title=f"{token} unit", space_type="shed", size=40, price_per_month=price,
+                    address="1 Main St", city="Austin", state="TX", zip_code="78701", country="US", images=images,
+                ), host.id)
+        async with session_factory() as db:
+            filters = ListingFilters(q=token)
+            full = await listings.get_listings(db, filters, limit=10, sort="price_desc")
+            pages = []
+            cursor = None
+            for _ in range(2):
+                rows = await listings.get_listings(db, filters, limit=2, sort="price_desc", cursor=cursor, summary=True)
+                pages.append(TypeAdapter(list[ListingSummary]).validate_python(rows))
+                cursor = listings.next_listings_cursor(rows, 2, "price_desc")
+            return full, pages, cursor
+
+    full, pages, last_cursor = asyncio.run(scenario())
+    summaries = pages[0] + pages[1]
+    assert [len(page) for page in pages] == [2, 1]
+    assert last_cursor is None
+    assert [summary.id for summary in summaries] == [listing.id for listing in full]
+    assert [summary.price_per_month for summary in summaries] == [3000, 2000, 1000]
+    assert [summary.image for summary in summaries] == ["first.jpg", None, None]
+    assert summaries[0].model_dump(exclude={"id"}) == {
+        "title": full[0].title, "price_per_month": 3000, "size": 40, "city": "Austin", "state": "TX",
+        "space_type": "shed", "image": "first.jpg", "distance": None,
+    }
@@ -0,0 +1,32 @@
+from app.core.location_index import LocationIndex
+
+
+def build_index():
+    index = LocationIndex(top_k=5)
+    index.rebuild([
+        ("Portland", "OR", "97201", 30),
+        ("Portland", "OR", "97202", 10),
+        ("Portland", "ME", "04101", 5),
+        ("Phoenix", "AZ", "85001", 20),
+    ])
+    return index
+
+
+def test_suggest_ranks_by_count():
+    suggestions = build_index().suggest("port")
+    assert [(s.label, s.count) for s in suggestions] == [("Portland, OR", 40), ("Portland, ME", 5)]
+
+
+def test_suggest_zip_and_state_name():
+    index = build_index()
+    assert [s.value for s in index.suggest("9720")] == ["97201", "97202"]
+    assert [(s.kind, s.value, s.count) for s in index.suggest("oreg")] == [("state", "or", 40)]
+
+
+def test_incremental_updates():
+    index = build_index()
+    index.suggest("p")
+    index.add_location("Portland", "ME", "04101", delta=50)
+    assert index.suggest("portland", limit=1)[0].label == "Portland, ME"
+    index.add_location("Phoenix", "AZ", "85001", delta=-20)
+    assert index.suggest("ph") == []
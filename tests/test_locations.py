@@ -0,0 +1,17 @@
+from app.core import locations
+
+
+def test_location_key_is_normalized():
+    assert locations.location_key(" Salt  Lake City", "UT", "84101") == "salt lake city ut 84101"
+
+
+def test_classify():
+    assert locations.classify("97201") == locations.QUERY_ZIP
+    assert locations.classify("97201-1234") == locations.QUERY_ZIP
+    assert locations.classify("or") == locations.QUERY_STATE
+    assert locations.classify("portland") == locations.QUERY_TEXT
+    assert locations.classify("9720") == locations.QUERY_TEXT
+
+
+def test_escape_like():
+    assert locations.escape_like("50%_off\\") == "50\\%\\_off\\\\"
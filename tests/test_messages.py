@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.crud import messages
+from app.models.models import Booking, Listing
+from app.schemas.messages import MessageCreate
+
+
+def test_conversation_key_is_the_same_both_ways():
+    assert messages.conversation_key(42, 7) == messages.conversation_key(7, 42) == "7:42"
+
+
+def test_inbox_counters_follow_sends_and_reads(session_factory, make_user):
+    alice, bob = make_user(), make_user()
+
+    async def scenario():
+        # Both directions at once must not deadlock on the two inbox rows
+        await asyncio.gather(*[
+            _send(session_factory, sender.id, receiver.id, f"message {i}")
+            for i in range(10) for sender, receiver in ((alice, bob), (bob, alice))
+        ])
+        async with session_factory() as db:
+            inbox = await messages.get_conversations(db, bob.id)
+            assert [(row.other_user_id, row.unread_count) for row in inbox] == [(alice.id, 10)]
+            history = await messages.get_conversation_messages(db, bob.id, alice.id, limit=15)
+            assert inbox[0].last_message.id == history[0].id
+            older = await messages.get_conversation_messages(
+                db, bob.id, alice.id, cursor=messages.next_messages_cursor(history, 15)
+            )
+            assert len(older) == 5
+
+            received = next(message for message in history if message.receiver_id == bob.id)
+            await messages.mark_message_read(db, received.id, bob.id)
+            await messages.mark_message_read(db, received.id, bob.id)
+            assert await messages.get_unread_count(db, bob.id) == 9
+            assert await messages.mark_conversation_read(db, bob.id, alice.id) == 9
+            assert await messages.get_unread_count(db, bob.id) == 0
+            assert await messages.get_unread_count(db, alice.id) == 10
+
+    asyncio.run(scenario())
+
+
+def test_messages_about_listings_and_bookings_must_concern_both_users(session_factory, host, make_user):
+    renter, stranger = make_user(), make_user()
+
+    async def scenario():
+        async with session_factory() as db:
+            listing = Listing(
+                host_id=host.id, title="Garage", space_type="garage", size=100, price_per_month=10000,
+                address="1 Main St", city="Austin", state="TX", zip_code="78701", country="US",
+            )
+            db.add(listing)
+            await db.flush()
+            booking = Booking(
+                listing_id=listing.id, renter_id=renter.id, start_date=datetime(2026, 6, 1),
+                end_date=datetime(2026, 7, 1), total_price=10000, platform_fee=1000, status="pending",
+            )
+            db.add(booking)
+            await db.commit()
+
+        rejected = [
+            (renter, host, {"listing_id": 2**31 - 1}, 404),
+            (renter, host, {"booking_id": 2**31 - 1}, 404),
+            (stranger, renter, {"listing_id": listing.id}, 403),
+            (stranger, host, {"booking_id": booking.id}, 403),
+        ]
+        for sender, receiver, attachment, status_code in rejected:
+            with pytest.raises(HTTPException) as exc_info:
+                await _send(session_factory, sender.id, receiver.id, "about this", **attachment)
+            assert exc_info.value.status_code == status_code
+
+        await _send(session_factory, stranger.id, host.id, "is it dry?", listing_id=listing.id)
+        await _send(session_factory, host.id, renter.id, "see you", listing_id=listing.id, booking_id=booking.id)
+
+    asyncio.run(scenario())
+
+
+async def _send(session_factory, sender_id, receiver_id, text, **attachment):
+    async with session_factory() as db:
+        await messages.create_message(db, MessageCreate(receiver_id=receiver_id, message=text, **attachment), sender_id)
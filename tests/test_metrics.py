@@ -0,0 +1,18 @@
+import os
+
+from app.core.metrics import remove_dead_worker_files
+
+DEAD_PID = 2 ** 22 + 1  # above the default pid_max, so never a running process
+
+
+def test_removes_live_gauges_of_dead_workers(tmp_path):
+    names = [
+        f"gauge_livesum_{DEAD_PID}.db",
+        f"gauge_livesum_{os.getpid()}.db",
+        f"gauge_all_{DEAD_PID}.db",
+        f"counter_{DEAD_PID}.db",
+    ]
+    for name in names:
+        (tmp_path / name).touch()
+    remove_dead_worker_files(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == sorted(names[1:])
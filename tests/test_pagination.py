@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.crud import pagination
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 4, 23, 14, 5, 52, 193846)
+    cursor = pagination.encode_cursor("newest", [created_at, 42])
+    assert pagination.decode_cursor(cursor, "newest", [datetime, int]) == [created_at, 42]
+
+
+def test_cursor_rejects_other_sort_order():
+    cursor = pagination.encode_cursor("price_asc", [1500, 7])
+    with pytest.raises(HTTPException) as exc_info:
+        pagination.decode_cursor(cursor, "newest", [datetime, int])
+    assert exc_info.value.status_code == 400
+
+
+def test_cursor_rejects_garbage():
+    with pytest.raises(HTTPException) as exc_info:
+        pagination.decode_cursor("not-a-cursor", "id", [int])
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.parametrize("key_types, values", [
+    ([int], ["abc"]),
+    ([int], [True]),
+    ([int], [2**40]),
+    ([int], [1.5]),
+    ([datetime, int], ["2025-04-23", 7]),
+    ([float, int], [None, 7]),
+])
+def test_cursor_rejects_values_of_the_wrong_type(key_types, values):
+    with pytest.raises(HTTPException) as exc_info:
+        pagination.decode_cursor(pagination.encode_cursor("s", values), "s", key_types)
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid pagination cursor"
+
+
+def test_cursor_float_keys_accept_integers():
+    assert pagination.decode_cursor(pagination.encode_cursor("distance", [3, 7]), "distance", [float, int]) == [3.0, 7]
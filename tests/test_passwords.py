@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.passwords import PasswordHasher, get_password_hash
+
+HASHED = get_password_hash("secret123", rounds=4)
+
+
+def test_verify_on_threadpool():
+    hasher = PasswordHasher(workers=0, max_pending=2)
+    assert asyncio.run(hasher.verify("secret123", HASHED))
+    assert not asyncio.run(hasher.verify("wrong", HASHED))
+
+
+def test_rejects_when_saturated():
+    hasher = PasswordHasher(workers=0, max_pending=1, retry_after_seconds=3)
+
+    async def burst():
+        return await asyncio.gather(
+            hasher.verify("secret123", HASHED),
+            hasher.verify("secret123", HASHED),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(burst())
+    assert first is True
+    assert isinstance(second, HTTPException)
+    assert second.status_code == 503
+    assert second.headers["Retry-After"] == "3"
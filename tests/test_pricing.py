@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from app.core import pricing
+
+
+def test_stay_term_counts_calendar_months_then_days():
+    assert pricing.stay_term(datetime(2026, 1, 15), datetime(2026, 3, 15)) == (2, 0)
+    assert pricing.stay_term(datetime(2026, 1, 15), datetime(2026, 3, 20)) == (2, 5)
+    assert pricing.stay_term(datetime(2026, 1, 31), datetime(2026, 2, 28)) == (1, 0)
+    assert pricing.stay_term(datetime(2026, 6, 1), datetime(2026, 6, 11, 12)) == (0, 11)
+    assert pricing.stay_term(datetime(2026, 6, 1), None) == (1, 0)
+
+
+def test_quote_prorates_partial_months():
+    # 2 months plus 14 days at 12/365 of the monthly price: 20000 + 4602.7
+    assert pricing.quote(10000, datetime(2026, 1, 1), datetime(2026, 3, 15)) == pricing.Quote(24603, 2460, 2, 14)
+    assert pricing.quote(10000, datetime(2026, 6, 1), datetime(2026, 6, 4)) == pricing.Quote(986, 99, 0, 3)
+
+
+def test_quote_many_matches_single_quotes():
+    start, end = datetime(2026, 2, 10), datetime(2026, 7, 2)
+    prices = [4500, 12999, 100000]
+    assert pricing.quote_many(prices, start, end) == [pricing.quote(price, start, end) for price in prices]
@@ -0,0 +1,47 @@
+from app.core.principals import Principal, PrincipalCache
+
+
+def make_cache(**kwargs):
+    options = {"max_entries": 2, "ttl_seconds": 60}
+    options.update(kwargs)
+    return PrincipalCache("test", **options)
+
+
+def test_hit_after_set():
+    cache = make_cache()
+    cache.set(Principal(1, "ann", True, False), cache.generation)
+    assert cache.get(1) == Principal(1, "ann", True, False)
+    assert cache.get(2) is None
+
+
+def test_expired_entry_is_a_miss():
+    cache = make_cache(ttl_seconds=-1)
+    cache.set(Principal(1, "ann", True, False), cache.generation)
+    assert cache.get(1) is None
+
+
+def test_lru_eviction():
+    cache = make_cache()
+    for user_id in (1, 2):
+        cache.set(Principal(user_id, "u", False, False), cache.generation)
+    cache.get(1)
+    cache.set(Principal(3, "u", False, False), cache.generation)
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+
+
+def test_invalidate_drops_entry_and_inflight_load():
+    cache = make_cache()
+    cache.set(Principal(1, "ann", False, False), cache.generation)
+    generation = cache.generation
+    cache.invalidate(1)
+    assert cache.get(1) is None
+    cache.set(Principal(1, "ann", False, False), generation)
+    assert cache.get(1) is None
+
+
+def test_claims_round_trip():
+    principal = Principal(7, "ann", True, False)
+    payload = {"sub": "7", **principal.claims()}
+    assert Principal.from_claims(7, payload) == principal
+    assert Principal.from_claims(7, {"sub": "7"}) is None
@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.profiling import ProfilingMiddleware, RequestProfiler
+
+
+def build_client(profiler):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+    @app.get("/slow/{item_id}")
+    async def slow_item(item_id: int):
+        await asyncio.sleep(0.05)
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+def test_profiles_next_requests_to_route(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    client = build_client(profiler)
+    profiler.arm("/slow/{item_id}", method=None, requests=1, interval=0.002)
+    client.get("/slow/1")
+    client.get("/slow/2")
+    assert not profiler.armed
+    [name] = profiler.profiles()
+    stacks = (tmp_path / name).read_text()
+    assert "slow_item" in stacks
+    assert "[await]" in stacks
+
+
+def test_disarmed_profiler_writes_nothing(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    client = build_client(profiler)
+    client.get("/slow/1")
+    profiler.arm("/slow/{item_id}", method="POST", requests=1, interval=0.002)
+    client.get("/slow/1")
+    assert profiler.armed
+    assert profiler.profiles() == []
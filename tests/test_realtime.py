@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.realtime import SLOW_CONSUMER_CLOSE_CODE, MessageHub
+
+
+class FakeWebSocket:
+    """Records what the hub sends; the client side is driven through ``incoming``"""
+
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+        self.incoming = asyncio.Queue()
+
+    async def send_text(self, message):
+        self.sent.append(json.loads(message))
+
+    async def receive_text(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise WebSocketDisconnect()
+        return message
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def test_deliver_reaches_only_the_recipients_connections():
+    hub = MessageHub(queue_size=10, channel="test")
+    alice_phone, alice_laptop, bob = hub.connect(object(), 1), hub.connect(object(), 1), hub.connect(object(), 2)
+    hub.deliver([1], '{"type":"message"}')
+    assert alice_phone.queue.qsize() == alice_laptop.queue.qsize() == 1
+    assert bob.queue.empty()
+    hub.disconnect(alice_phone)
+    hub.disconnect(alice_laptop)
+    assert 1 not in hub.connections
+
+
+def test_slow_consumer_is_disconnected_instead_of_buffering():
+    hub = MessageHub(queue_size=3, channel="test")
+    slow = hub.connect(object(), 1)
+    for i in range(3):
+        hub.deliver([1], f'{{"n":{i}}}')
+    assert not slow.overflowed
+    hub.deliver([1], '{"n":3}')
+    assert slow.overflowed
+    assert 1 not in hub.connections
+    # Its backlog is dropped and the send loop told to close the connection
+    assert slow.queue.qsize() == 1
+    assert slow.queue.get_nowait() is None
+
+
+def test_serve_sends_events_and_answers_pings_until_the_client_leaves():
+    async def scenario():
+        hub = MessageHub(queue_size=10, channel="test")
+        websocket = FakeWebSocket()
+        serving = asyncio.create_task(hub.serve(websocket, 7))
+        await asyncio.sleep(0)
+        # No broker connection, so publish delivers in this process
+        await hub.publish([7, 8], {"type": "message", "message": {"id": 1}})
+        await websocket.incoming.put("ping")
+        await asyncio.sleep(0.01)
+        await websocket.incoming.put(None)
+        await asyncio.wait_for(serving, 1)
+        assert websocket.sent == [{"type": "message", "message": {"id": 1}}, {"type": "pong"}]
+        assert hub.connections == {}
+
+    asyncio.run(scenario())
+
+
+def test_serve_closes_a_connection_that_fell_behind():
+    async def scenario():
+        hub = MessageHub(queue_size=2, channel="test")
+        websocket = FakeWebSocket()
+        serving = asyncio.create_task(hub.serve(websocket, 7))
+        await asyncio.sleep(0)
+        # Delivered synchronously, before the send loop gets to run
+        for i in range(5):
+            hub.deliver([7], f'{{"n":{i}}}')
+        await asyncio.wait_for(serving, 1)
+        assert websocket.closed_with == SLOW_CONSUMER_CLOSE_CODE
+        assert websocket.sent == []
+
+    asyncio.run(scenario())
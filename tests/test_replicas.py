@@ -0,0 +1,23 @@
+from types import SimpleNamespace
+
+from app.db.replicas import STRATEGY_LEAST_CONNECTIONS, ReplicaSet
+
+
+def make_replica(name, in_use=0, healthy=True):
+    return SimpleNamespace(name=name, connections_in_use=in_use, healthy=healthy)
+
+
+def test_round_robin_skips_unhealthy():
+    a, b, c = make_replica("a"), make_replica("b", healthy=False), make_replica("c")
+    replicas = ReplicaSet([a, b, c])
+    assert [replicas.choose().name for _ in range(4)] == ["a", "c", "a", "c"]
+
+
+def test_least_connections():
+    replicas = ReplicaSet([make_replica("a", in_use=3), make_replica("b", in_use=1)], STRATEGY_LEAST_CONNECTIONS)
+    assert [replicas.choose().name for _ in range(3)] == ["b", "b", "b"]
+
+
+def test_no_healthy_replica_uses_primary():
+    assert ReplicaSet([make_replica("a", healthy=False)]).choose() is None
+    assert ReplicaSet([]).choose() is None
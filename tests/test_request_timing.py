@@ -0,0 +1,44 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.request_timing import (
+    RepeatedStatementError, RequestTimingMiddleware, RequestTimings, TimedRoute, collect_queries, phase,
+)
+
+
+def test_strict_mode_rejects_repeated_statements():
+    with collect_queries(threshold=2) as timings:
+        for _ in range(2):
+            timings.record_query("SELECT * FROM reviews WHERE listing_id = $1", 0.001)
+        timings.record_query("SELECT * FROM listings WHERE id = $1", 0.001)
+        with pytest.raises(RepeatedStatementError):
+            timings.record_query("SELECT * FROM reviews WHERE listing_id = $1", 0.001)
+    assert timings.queries == 4
+
+
+def test_server_timing_header():
+    timings = RequestTimings()
+    timings.record_query("SELECT 1", 0.004)
+    timings.record_query("SELECT 2", 0.002)
+    timings.add_phase("auth", 0.0005)
+    timings.endpoint_finished = 10.0
+    assert timings.server_timing(now=10.003) == 'db;dur=6.0;desc="2 queries", auth;dur=0.5, serialize;dur=3.0'
+
+
+def test_middleware_adds_header():
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/things/{thing_id}")
+    async def read_thing(thing_id: int):
+        with phase("auth"):
+            pass
+        return {"id": thing_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(RequestTimingMiddleware)
+    response = TestClient(app).get("/things/1")
+    assert response.json() == {"id": 1}
+    names = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+    assert names == ["db", "auth", "serialize"]
@@ -0,0 +1,158 @@
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.api.routes import listings as listings_routes
+from app.core import streaming
+from app.core.config import settings
+from app.core.principals import Principal
+from app.core.security import get_current_user
+from app.db.database import get_db
+from app.models.models import Listing
+from app.schemas.listings import ListingCreateFromFrontend
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _records(record_format: str, text: str, chunk_size: int = 7, **kwargs):
+    async def collect():
+        chunks = _chunks(text.encode(), chunk_size)
+        if record_format == streaming.FORMAT_CSV:
+            return [record async for record in streaming.iter_csv_records(chunks, **kwargs)]
+        return [record async for record in streaming.iter_records(record_format, chunks)]
+    return asyncio.run(collect())
+
+
+def test_csv_quoting_and_multiline_fields():
+    text = (
+        'title,description,size\r\n'
+        '"Garage, large","Dry\nand ""secure""",100\r\n'
+        'Shed,,20\n'
+        '\n'
+        'Attic,"one"\n'
+    )
+    records = _records(streaming.FORMAT_CSV, text)
+    assert records == [
+        streaming.Record(2, {"title": "Garage, large", "description": 'Dry\nand "secure"', "size": "100"}),
+        streaming.Record(4, {"title": "Shed", "size": "20"}),
+        streaming.Record(6, None, "Expected 3 columns, got 2"),
+    ]
+
+
+def test_csv_stray_quote_is_capped_and_reading_resumes():
+    rows = "".join(f"Unit {i},desc {i}\n" for i in range(20000))
+    text = 'title,description\nBroken "quote,x\n' + rows
+    start = time.perf_counter()
+    records = _records(streaming.FORMAT_CSV, text, chunk_size=4096, max_record_size=1000)
+    assert time.perf_counter() - start < 2
+    assert records[0].line == 2
+    assert records[0].error.startswith("Record longer than 1000 characters")
+    # Rows after the capped record are read again
+    assert sum(1 for record in records if record.data) > 19900
+    assert records[-1].data == {"title": "Unit 19999", "description": "desc 19999"}
+
+
+def test_csv_unterminated_quote_at_end():
+    records = _records(streaming.FORMAT_CSV, 'title\n"open\nstill open\n')
+    assert records == [streaming.Record(2, None, "Unterminated quoted field")]
+
+
+def test_ndjson_errors_are_reported_per_line():
+    text = '{"title": "a"}\n\n{"title": \n[1, 2]\n{"title": "b"}'
+    records = _records(streaming.FORMAT_NDJSON, text)
+    assert [(record.line, record.data) for record in records] == [
+        (1, {"title": "a"}), (3, None), (4, None), (5, {"title": "b"}),
+    ]
+    assert records[1].error.startswith("Invalid JSON")
+    assert records[2].error == "Expected a JSON object"
+
+
+def test_frontend_price_must_be_finite():
+    form = ListingCreateFromFrontend(
+        title="Unit", space_type="garage", sizeSqFt="10", pricePerMonthDollars="inf",
+        address="1 Main St", city="Austin", state="TX", zip_code="78701",
+    )
+    with pytest.raises(ValueError):
+        form.to_listing_create()
+
+
+def test_row_encoder_gzip_ndjson_across_batches():
+    encoder = streaming.RowEncoder(streaming.FORMAT_NDJSON, ["id", "created_at"], compress=True)
+    data = encoder.encode([{"id": 1, "created_at": datetime(2026, 1, 2, 3, 4)}])
+    data += encoder.encode([]) + encoder.encode([{"id": 2, "created_at": None}]) + encoder.finish()
+    assert gzip.decompress(data).decode().splitlines() == [
+        '{"id":1,"created_at":"2026-01-02T03:04:00"}', '{"id":2,"created_at":null}',
+    ]
+
+
+def test_row_encoder_csv_header_once_and_for_empty_exports():
+    encoder = streaming.RowEncoder(streaming.FORMAT_CSV, ["id", "features"])
+    data = encoder.encode([{"id": 1, "features": ["Dry", "Gated"]}]) + encoder.encode([{"id": 2, "features": None}])
+    assert (data + encoder.finish()).decode().splitlines() == ["id,features", "1,Dry|Gated", "2,"]
+    empty = streaming.RowEncoder(streaming.FORMAT_CSV, ["id", "features"])
+    assert empty.finish().decode().splitlines() == ["id,features"]
+
+
+def test_csv_export_reads_back_through_the_import_reader():
+    rows = [{"title": 'Garage "A", dry', "description": "two\nlines", "features": ["Dry", "Gated"]}]
+    data = streaming.csv_bytes(rows, ["title", "description", "features"], header=True)
+    records = _records(streaming.FORMAT_CSV, data.decode())
+    assert records == [
+        streaming.Record(2, {"title": 'Garage "A", dry', "description": "two\nlines", "features": "Dry|Gated"}),
+    ]
+
+
+def _listing_row(title: str, **fields) -> dict:
+    row = {
+        "title": title, "space_type": "garage", "size": 100, "price_per_month": 5000,
+        "address": "1 Main St", "city": "Austin", "state": "TX", "zip_code": "78701", "country": "US",
+    }
+    row.update(fields)
+    return row
+
+
+def test_bulk_import_reports_the_lines_that_fail(monkeypatch, session_factory, host):
+    async def get_test_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(listings_routes.router, prefix="/api")
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_current_user] = lambda: Principal(host.id, host.username, True, False)
+    monkeypatch.setattr(settings, "BULK_IMPORT_BATCH_SIZE", 3)
+
+    lines = [
+        _listing_row("one"),
+        _listing_row("two", price_per_month=99999999999),  # out of INTEGER range
+        _listing_row("three"),
+        _listing_row("four"),
+        _listing_row("bad\u0000title"),  # passes validation, rejected by Postgres
+        _listing_row("six"),
+        _listing_row("seven", space_type="castle"),
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n{broken\n"
+
+    async def imported_titles():
+        async with session_factory() as db:
+            return sorted((await db.execute(select(Listing.title).where(Listing.host_id == host.id))).scalars())
+
+    response = TestClient(app).post(
+        "/api/listings/bulk", content=body.encode(), headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["created"], result["failed"]) == (4, 4)
+    assert [error["line"] for error in result["errors"]] == [2, 7, 8, 5]
+    assert "price_per_month" in result["errors"][0]["error"]
+    assert result["errors"][3]["error"].startswith("Could not create listing")
+    assert asyncio.run(imported_titles()) == ["four", "one", "six", "three"]